@@ -0,0 +1,66 @@
+"""Lookup latency of the near-duplicate resume index at scale.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_near_duplicate --entries 200000
+
+The bulk of the index is filled with random signatures (cheap to generate);
+a set of real synthetic resumes is added on top and queried with lightly
+edited copies, so both hits and bucket collisions are exercised.
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.sample_data import JD, make_resume
+from utils.gemini import DEFAULT_MODEL
+from utils.near_duplicate import NUM_PERM, NearDuplicateIndex, minhash_signature, scope_key
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=200_000)
+    parser.add_argument("--resumes", type=int, default=1_000)
+    parser.add_argument("--jds", type=int, default=50)
+    args = parser.parse_args()
+
+    index = NearDuplicateIndex()
+    rng = np.random.default_rng(0)
+    jd_keys = [scope_key(f"{JD} #{n}", DEFAULT_MODEL, "full") for n in range(args.jds)]
+
+    start = time.perf_counter()
+    for n in range(args.entries - args.resumes):
+        index.add_signature(jd_keys[n % args.jds], rng.integers(0, 2 ** 31 - 1, NUM_PERM, dtype=np.uint32),
+                            {"JD Match": "0%"}, persist=False)
+    resumes = [make_resume(n) for n in range(args.resumes)]
+    for n, resume in enumerate(resumes):
+        index.add_signature(scope_key(JD, DEFAULT_MODEL, "full"), minhash_signature(resume), {"JD Match": f"{n % 100}%"}, persist=False)
+    print(f"indexed {len(index):,} entries in {time.perf_counter() - start:.1f}s")
+
+    edited = [resume + "\n- Built dbt services integrating airflow for 7 internal teams" for resume in resumes]
+    signatures = [minhash_signature(resume) for resume in edited]
+
+    lookups = []
+    hits = 0
+    key = scope_key(JD, DEFAULT_MODEL, "full")
+    for signature in signatures:
+        start = time.perf_counter()
+        hits += index.lookup_signature(key, signature) is not None
+        lookups.append((time.perf_counter() - start) * 1000)
+
+    full = []
+    for resume in edited[:200]:
+        start = time.perf_counter()
+        index.lookup(resume, JD, DEFAULT_MODEL, "full")
+        full.append((time.perf_counter() - start) * 1000)
+
+    lookups.sort()
+    print(f"hit rate on edited resumes: {hits / len(signatures):.1%}")
+    print(f"bucket lookup ms: p50={statistics.median(lookups):.3f} p99={lookups[int(len(lookups) * 0.99)]:.3f}")
+    print(f"lookup incl. signature ms: p50={statistics.median(full):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Latency and output tokens per response mode (full, compact, score only).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_output_modes --analyses 20
+    python -m benchmarks.bench_output_modes --live --analyses 5   # real Gemini, needs GOOGLE_API_KEY
+
+The fake backend charges a fixed latency per call plus time per input and
+output token (defaults roughly match gemini-2.0-flash), so the difference
+between modes comes from the output tokens each one produces.
+"""
+import argparse
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+from benchmarks.sample_data import JD, make_resume
+from utils.fake_gemini import FakeGeminiClient
+from utils.gemini import DEFAULT_MODEL, create_client, generate
+from utils.output_modes import OUTPUT_MODES
+from utils.packing import Candidate, build_packed_prompt
+from utils.rate_limit import RateLimiter
+from utils.results import parse_json_response
+from utils.usage import UsageLedger
+
+
+def run(mode, client, resumes: list, pack_size: int, args) -> dict:
+    ledger = UsageLedger(session_budget=0, daily_budget=0, global_budget=0)
+    limiter = RateLimiter(rpm=args.rpm, tpm=0) if args.live else None
+    latencies = []
+    parsed = 0
+    if pack_size == 1:
+        prompts = [(mode.prompt.format(text=resume, jd=JD), 1) for resume in resumes]
+    else:
+        candidates = [Candidate(str(index), resume) for index, resume in enumerate(resumes)]
+        prompts = [
+            (build_packed_prompt(candidates[start:start + pack_size], JD, mode),
+             len(candidates[start:start + pack_size]))
+            for start in range(0, len(candidates), pack_size)
+        ]
+
+    for prompt, analyses in prompts:
+        start = time.perf_counter()
+        response, error = generate(client, prompt, args.model, config=mode.config(analyses),
+                                   ledger=ledger, rate_limiter=limiter)
+        latencies.append(time.perf_counter() - start)
+        if error:
+            continue
+        try:
+            result = parse_json_response(response)
+            results = result if isinstance(result, list) else [result]
+            parsed += sum(1 for item in results if isinstance(item, dict) and "JD Match" in item)
+        except ValueError:
+            pass
+
+    output_tokens = ledger.by_model[args.model]["output_tokens"]
+    return {
+        "mode": mode.label,
+        "pack": pack_size,
+        "requests": len(prompts),
+        "ok": parsed,
+        "out_tokens": output_tokens / len(resumes),
+        "mean_s": statistics.mean(latencies),
+        "p50_s": statistics.median(latencies),
+        "per_analysis_s": sum(latencies) / len(resumes),
+    }
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--analyses", type=int, default=20)
+    parser.add_argument("--resume-chars", type=int, default=3000)
+    parser.add_argument("--pack-sizes", type=int, nargs="+", default=[1, 6])
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--latency-per-1k", type=float, default=0.05, help="Seconds per 1k input tokens")
+    parser.add_argument("--latency-per-1k-output", type=float, default=5.0, help="Seconds per 1k output tokens")
+    parser.add_argument("--live", action="store_true", help="Call the real Gemini API instead of the fake")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--rpm", type=int, default=15, help="Request rate for --live runs")
+    args = parser.parse_args()
+
+    client = create_client() if args.live else FakeGeminiClient(
+        latency=args.latency,
+        latency_per_1k_tokens=args.latency_per_1k,
+        latency_per_1k_output_tokens=args.latency_per_1k_output,
+    )
+    if client is None:
+        parser.error("--live needs GOOGLE_API_KEY")
+    resumes = [make_resume(index, args.resume_chars) for index in range(args.analyses)]
+
+    print(f"{'mode':<11} {'pack':>4} {'requests':>8} {'ok':>4} {'out tok':>8} {'mean s':>7} "
+          f"{'p50 s':>6} {'s/analysis':>10} {'saved':>6}")
+    for pack_size in args.pack_sizes:
+        baseline = None
+        for mode in OUTPUT_MODES.values():
+            row = run(mode, client, resumes, pack_size, args)
+            baseline = baseline or row["per_analysis_s"]
+            saved = 1 - row["per_analysis_s"] / baseline
+            print(f"{row['mode']:<11} {row['pack']:>4} {row['requests']:>8} {row['ok']:>4} "
+                  f"{row['out_tokens']:>8.0f} {row['mean_s']:>7.2f} {row['p50_s']:>6.2f} "
+                  f"{row['per_analysis_s']:>10.2f} {saved:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Candidates per minute against pack size, using the local fake Gemini backend.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_packing --candidates 48 --rpm 15
+
+Wall time is measured against the fake backend; throughput under the RPM
+ceiling is then min(wall-clock rate, rpm * candidates per request).
+"""
+import argparse
+import time
+from functools import partial
+
+from benchmarks.sample_data import JD, make_resume
+from utils.fake_gemini import FakeGeminiClient
+from utils.gemini import generate
+from utils.packing import Candidate, PackingScheduler
+
+
+def run(pack_size: int, candidates: list, args) -> dict:
+    client = FakeGeminiClient(
+        latency=args.latency,
+        latency_per_1k_tokens=args.latency_per_1k,
+        malformed_rate=args.malformed_rate,
+        seed=pack_size,
+    )
+    scheduler = PackingScheduler(partial(generate, client), max_pack_size=pack_size,
+                                 token_budget=args.token_budget)
+
+    start = time.perf_counter()
+    results = scheduler.run(candidates, JD)
+    wall = time.perf_counter() - start
+
+    stats = scheduler.stats
+    rate_limited_seconds = stats.requests * 60 / args.rpm
+    return {
+        "pack_size": pack_size,
+        "requests": stats.requests,
+        "malformed": stats.malformed_packs,
+        "single": stats.single_requests,
+        "ok": len(results),
+        "wall_s": wall,
+        "cpm": len(results) / max(wall, rate_limited_seconds) * 60,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=48)
+    parser.add_argument("--resume-chars", type=int, default=1500)
+    parser.add_argument("--pack-sizes", type=int, nargs="+", default=[1, 2, 4, 6, 8])
+    parser.add_argument("--rpm", type=int, default=15)
+    parser.add_argument("--token-budget", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--latency-per-1k", type=float, default=0.01)
+    parser.add_argument("--malformed-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    candidates = [Candidate(str(i), make_resume(i, args.resume_chars)) for i in range(args.candidates)]
+
+    print(f"{'pack':>4} {'requests':>8} {'malformed':>9} {'single':>6} {'ok':>4} {'wall s':>7} {'cand/min':>9}")
+    for pack_size in args.pack_sizes:
+        row = run(pack_size, candidates, args)
+        print(f"{row['pack_size']:>4} {row['requests']:>8} {row['malformed']:>9} {row['single']:>6} "
+              f"{row['ok']:>4} {row['wall_s']:>7.2f} {row['cpm']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Local pre-ranking throughput for 1k, 10k and 100k resumes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_prerank --sizes 1000 10000 100000
+
+Reports the time to build the hashed term matrix (once per pool) and to
+score every candidate against a JD with BM25 and cosine similarity.
+"""
+import argparse
+import time
+
+from benchmarks.sample_data import JD, make_resume
+from utils.prerank import CandidatePool
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--top-k", type=int, default=25)
+    args = parser.parse_args()
+
+    texts = [make_resume(i) for i in range(max(args.sizes))]
+
+    print(f"{'resumes':>8} {'build s':>8} {'bm25 ms':>8} {'cosine ms':>9} {'top-k ms':>8}")
+    for size in args.sizes:
+        start = time.perf_counter()
+        pool = CandidatePool(texts[:size])
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pool.bm25(JD)
+        bm25 = (time.perf_counter() - start) * 1000
+
+        pool.cosine(JD)  # first call caches document norms
+        start = time.perf_counter()
+        pool.cosine(JD)
+        cosine = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        pool.top_k(JD, args.top_k)
+        top_k = (time.perf_counter() - start) * 1000
+
+        print(f"{size:>8} {build:>8.2f} {bm25:>8.1f} {cosine:>9.1f} {top_k:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
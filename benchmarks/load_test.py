@@ -0,0 +1,296 @@
+"""Concurrent-session load test of the Resume Analyzer page on the fake Gemini backend.
+
+Run from the repository root:
+
+    python -m benchmarks.load_test --levels 1 2 4 8 16 --flows 3
+
+Starts one headless `streamlit run` server for the page (using the local fake
+Gemini backend) and drives it with simulated browser sessions speaking
+Streamlit's websocket protocol. Each simulated recruiter opens a session,
+uploads a generated PDF, pastes a job description, clicks Analyze, waits for
+the result and downloads the report. For each concurrency level the script
+reports throughput, flow latency percentiles, and the server's CPU use and
+resident memory.
+
+Caches and logs go to a temporary directory and the RPM/token limits are
+lifted, so the numbers measure the app itself rather than the Gemini quota.
+Needs the `websockets` and `httpx` packages; CPU and RSS are read from /proc.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.Common_pb2 import FileURLsRequest, FileUploaderState, UploadedFileInfo
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from benchmarks.sample_data import JD, make_resume, make_resume_pdf
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE = os.path.join(ROOT, "pages", "Resume_Analyzer.py")
+
+UPLOAD_LABEL = "Upload your resume (PDF format)"
+JD_LABEL = "Paste the job description here"
+BACKGROUND_LABEL = "Run analysis in the background"
+ANALYZE_PREFIX = "🚀"
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def process_cpu_seconds(pid: int) -> float:
+    """User + system CPU time of a process, from /proc/<pid>/stat"""
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            fields = stat.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return float("nan")
+
+
+def process_rss_mb(pid: int) -> float:
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return float("nan")
+
+
+def resume_pdf(index: int, length: int) -> bytes:
+    contact = f"candidate{index}@example.com  +1 555 010 {index % 10000:04d}"
+    return make_resume_pdf(contact + "\n" + make_resume(index, length))
+
+
+class BrowserSession:
+    """Just enough of the Streamlit frontend protocol to fill in and submit the page"""
+
+    def __init__(self, base_url: str, http: httpx.AsyncClient):
+        self.base_url = base_url
+        self.http = http
+        self.ws = None
+        self.session_id = ""
+        self.page_script_hash = ""
+        self.elements = {}
+        self.errors = []
+
+    async def __aenter__(self):
+        url = self.base_url.replace("http", "ws", 1) + "/_stcore/stream"
+        self.ws = await websockets.connect(url, subprotocols=["streamlit"], max_size=None)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.ws.close()
+
+    async def _send(self, message: BackMsg):
+        await self.ws.send(message.SerializeToString())
+
+    async def _receive(self) -> ForwardMsg:
+        message = ForwardMsg()
+        message.ParseFromString(await self.ws.recv())
+        if message.HasField("new_session"):
+            self.session_id = message.new_session.initialize.session_id or self.session_id
+            self.page_script_hash = message.new_session.page_script_hash or self.page_script_hash
+        return message
+
+    async def rerun(self, widgets: list = ()):
+        """Run the script with the given widget states and collect the widgets it renders"""
+        message = BackMsg()
+        message.rerun_script.page_script_hash = self.page_script_hash
+        message.rerun_script.widget_states.widgets.extend(widgets)
+        await self._send(message)
+
+        self.elements = {}
+        while True:
+            reply = await self._receive()
+            if reply.HasField("delta") and reply.delta.HasField("new_element"):
+                element = reply.delta.new_element
+                kind = element.WhichOneof("type")
+                if kind == "exception":
+                    self.errors.append(element.exception.message)
+                elif kind in ("button", "download_button", "file_uploader", "text_area", "checkbox"):
+                    widget = getattr(element, kind)
+                    self.elements.setdefault(kind, []).append(widget)
+            elif reply.HasField("script_finished"):
+                if reply.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return
+
+    def widget(self, kind: str, label: str = None, prefix: str = None):
+        for widget in self.elements.get(kind, []):
+            if widget.label == label or (prefix and widget.label.startswith(prefix)):
+                return widget
+        raise LookupError(f"No {kind} labelled {label or prefix!r} on the page")
+
+    async def upload(self, name: str, data: bytes, mime: str) -> UploadedFileInfo:
+        """Ask the server for an upload URL and PUT the file there, as the browser does"""
+        message = BackMsg()
+        message.file_urls_request.CopyFrom(FileURLsRequest(
+            request_id=uuid.uuid4().hex, file_names=[name], session_id=self.session_id
+        ))
+        await self._send(message)
+        while True:
+            reply = await self._receive()
+            if reply.HasField("file_urls_response"):
+                urls = reply.file_urls_response.file_urls[0]
+                break
+
+        upload_url = urls.upload_url if urls.upload_url.startswith("http") else self.base_url + urls.upload_url
+        response = await self.http.put(upload_url, files={"file": (name, data, mime)})
+        response.raise_for_status()
+        return UploadedFileInfo(name=name, size=len(data), file_id=urls.file_id, file_urls=urls)
+
+
+async def run_flow(index: int, base_url: str, http: httpx.AsyncClient, args) -> dict:
+    """One recruiter: open the page, upload, paste a JD, analyze and download the report"""
+    start = time.perf_counter()
+    try:
+        async with BrowserSession(base_url, http) as session:
+            await session.rerun()
+
+            info = await session.upload(f"resume_{index}.pdf", resume_pdf(index, args.resume_chars),
+                                        "application/pdf")
+            upload = WidgetState(id=session.widget("file_uploader", UPLOAD_LABEL).id)
+            upload.file_uploader_state_value.CopyFrom(FileUploaderState(uploaded_file_info=[info]))
+            jd = WidgetState(id=session.widget("text_area", JD_LABEL).id, string_value=JD)
+            background = WidgetState(id=session.widget("checkbox", BACKGROUND_LABEL).id,
+                                     bool_value=args.background)
+            widgets = [upload, jd, background]
+            await session.rerun(widgets)
+
+            analyze_start = time.perf_counter()
+            click = WidgetState(id=session.widget("button", prefix=ANALYZE_PREFIX).id, trigger_value=True)
+            await session.rerun(widgets + [click])
+            # Background analyses are picked up by later reruns, as the page's polling fragment does
+            while not session.elements.get("download_button") and not session.errors:
+                if time.perf_counter() - analyze_start > args.timeout:
+                    raise TimeoutError("no result before the timeout")
+                await asyncio.sleep(args.poll)
+                await session.rerun(widgets)
+            analyzed = time.perf_counter()
+
+            report = session.elements["download_button"][0]
+            if report.url:
+                (await http.get(base_url + report.url if report.url.startswith("/") else report.url)
+                 ).raise_for_status()
+            if session.errors:
+                raise RuntimeError(session.errors[0])
+    except Exception as e:
+        print(f"flow {index} failed: {e!r}", file=sys.stderr)
+        return {"flow": time.perf_counter() - start, "analyze": 0.0, "ok": False}
+    return {"flow": time.perf_counter() - start, "analyze": analyzed - analyze_start, "ok": True}
+
+
+async def run_level(sessions: int, base_url: str, server_pid: int, args, offset: int) -> dict:
+    async with httpx.AsyncClient(timeout=args.timeout) as http:
+        async def session(number: int) -> list:
+            return [await run_flow(offset + number * args.flows + flow, base_url, http, args)
+                    for flow in range(args.flows)]
+
+        cpu_start, wall_start = process_cpu_seconds(server_pid), time.perf_counter()
+        results = await asyncio.gather(*(session(number) for number in range(sessions)))
+        wall = time.perf_counter() - wall_start
+        cpu = process_cpu_seconds(server_pid) - cpu_start
+
+    flows = [flow for result in results for flow in result]
+    flow_times = [flow["flow"] for flow in flows if flow["ok"]]
+    analyze_times = [flow["analyze"] for flow in flows if flow["ok"]]
+    return {
+        "sessions": sessions,
+        "flows": len(flows),
+        "errors": sum(not flow["ok"] for flow in flows),
+        "throughput": len(flow_times) / wall,
+        "p50": percentile(flow_times, 50),
+        "p95": percentile(flow_times, 95),
+        "p99": percentile(flow_times, 99),
+        "analyze_p95": percentile(analyze_times, 95),
+        "cpu": cpu / wall,
+        "rss": process_rss_mb(server_pid),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, args) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "SMART_ATS_FAKE_GEMINI": "1",
+        "SMART_ATS_FAKE_LATENCY": str(args.latency),
+        "SMART_ATS_CACHE_DIR": tempfile.mkdtemp(prefix="smart_ats_load_"),
+        "SMART_ATS_RPM_LIMIT": "100000",
+        "SMART_ATS_TPM_LIMIT": "1000000000",
+        "SMART_ATS_SESSION_TOKEN_BUDGET": "0",
+        "SMART_ATS_DAILY_TOKEN_BUDGET": "0",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", PAGE,
+         "--server.headless", "true",
+         "--server.port", str(port),
+         "--server.address", "127.0.0.1",
+         "--server.enableXsrfProtection", "false",
+         "--server.fileWatcherType", "none",
+         "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/_stcore/health").status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        if server.poll() is not None:
+            break
+        time.sleep(0.5)
+    server.kill()
+    raise RuntimeError("Streamlit server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                        help="Concurrent sessions to sweep")
+    parser.add_argument("--flows", type=int, default=3, help="Flows run by each session per level")
+    parser.add_argument("--resume-chars", type=int, default=3000)
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake Gemini latency in seconds")
+    parser.add_argument("--background", action="store_true",
+                        help="Use the page's background analysis mode instead of the foreground call")
+    parser.add_argument("--poll", type=float, default=1.0,
+                        help="Seconds between reruns while a background analysis runs")
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    port = free_port()
+    server = start_server(port, args)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        print(f"{'sessions':>8} {'flows':>5} {'errors':>6} {'flows/s':>8} {'p50 s':>6} {'p95 s':>6} "
+              f"{'p99 s':>6} {'analyze p95':>11} {'cpu':>5} {'rss MB':>7}")
+        for level_number, sessions in enumerate(args.levels):
+            # Fresh resumes per level so results are not served from the analysis cache
+            row = asyncio.run(run_level(sessions, base_url, server.pid, args, offset=level_number * 100_000))
+            print(f"{row['sessions']:>8} {row['flows']:>5} {row['errors']:>6} {row['throughput']:>8.2f} "
+                  f"{row['p50']:>6.2f} {row['p95']:>6.2f} {row['p99']:>6.2f} {row['analyze_p95']:>11.2f} "
+                  f"{row['cpu']:>5.0%} {row['rss']:>7.0f}")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
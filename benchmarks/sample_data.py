@@ -0,0 +1,65 @@
+"""Synthetic resumes and job descriptions for benchmarks and load tests."""
+import random
+
+SKILLS = [
+    "python", "sql", "spark", "airflow", "kafka", "aws", "gcp", "docker", "kubernetes", "terraform",
+    "pandas", "numpy", "scikit-learn", "tensorflow", "pytorch", "tableau", "power bi", "excel",
+    "java", "scala", "go", "react", "typescript", "node.js", "postgresql", "mongodb", "redis",
+    "snowflake", "dbt", "hadoop", "linux", "git", "ci/cd", "fastapi", "django", "flask", "nlp",
+    "computer vision", "statistics", "a/b testing", "machine learning", "deep learning", "etl",
+]
+
+JD = """Senior Data Engineer
+We are looking for a data engineer to build and operate batch and streaming pipelines.
+Requirements: python, sql, spark, airflow, kafka, aws, docker, kubernetes, terraform, dbt, snowflake.
+Nice to have: scala, machine learning, ci/cd, data modelling, monitoring and alerting.
+Responsibilities: design etl workflows, own data quality, mentor junior engineers."""
+
+
+def make_resume(index: int, length: int = 1500, seed: int = 0) -> str:
+    """Build a plausible, deterministic resume of roughly ``length`` characters"""
+    rng = random.Random(seed * 1_000_003 + index)
+    skills = rng.sample(SKILLS, 12)
+    lines = [
+        f"Candidate {index}",
+        "SUMMARY",
+        f"Engineer with {rng.randint(1, 15)} years of experience in {skills[0]} and {skills[1]}.",
+        "SKILLS",
+        ", ".join(skills),
+        "EXPERIENCE",
+    ]
+    while sum(len(line) + 1 for line in lines) < length:
+        a, b = rng.sample(skills, 2)
+        lines.append(f"- Built {a} services integrating {b} for {rng.randint(2, 40)} internal teams")
+    lines += ["EDUCATION", f"BSc Computer Science {rng.randint(2000, 2020)}"]
+    return "\n".join(lines)
+
+
+def make_resume_pdf(text: str, lines_per_page: int = 50) -> bytes:
+    """Minimal text-based PDF (Helvetica, one line per text row) for upload tests"""
+    lines = text.splitlines()
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page_lines in pages:
+        escaped = (line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in page_lines)
+        body = " T* ".join(f"({line})Tj" for line in escaped)
+        stream = f"BT /F1 10 Tf 14 TL 50 800 Td {body} ET".encode("latin-1", "replace")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream.decode('latin-1')}\nendstream")
+        page_ids.append(len(objects) + 1)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
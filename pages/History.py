@@ -0,0 +1,149 @@
+import streamlit as st
+import time
+from dotenv import load_dotenv
+
+from utils.export import COLUMNS, DEFAULT_COLUMNS, FORMATS, export, iter_records
+from utils.history import PAGE_SIZE, history_store
+from utils.results import match_quality
+
+load_dotenv()
+
+st.set_page_config(
+    page_title="History - Smart ATS",
+    page_icon="🗂️",
+    layout="wide",
+)
+
+st.title("🗂️ Analysis History")
+st.markdown("Every analysis is saved locally, so past results can be reopened instead of re-run")
+
+# Filters
+filter_col1, filter_col2 = st.columns(2)
+with filter_col1:
+    resume_filter = st.text_input("Resume ID", key="history_resume",
+                                  help="Show only analyses of this resume (full ID)").strip()
+with filter_col2:
+    jd_filter = st.text_input("Job description ID", key="history_jd",
+                              help="Show only analyses against this job description (full ID)").strip()
+
+# Keyset pagination: a stack of (created, id) cursors, one per page already visited
+filters = (resume_filter, jd_filter)
+if st.session_state.get("history_filters") != filters:
+    st.session_state["history_filters"] = filters
+    st.session_state["history_cursors"] = [None]
+cursors = st.session_state["history_cursors"]
+
+records = history_store.page(before=cursors[-1], resume_hash=resume_filter or None, jd_hash=jd_filter or None)
+
+if not records:
+    st.info("No analyses found. Results from the Resume Analyzer are saved here automatically.")
+else:
+    rows = [
+        {
+            "Date": record.date,
+            "Kind": record.kind.capitalize(),
+            "Resume": record.resume_name or record.resume_hash[:12],
+            "Job Description": record.jd_title,
+            "Score": f"{record.score}%" if record.score is not None else "N/A",
+            "Quality": match_quality(record.score),
+            "Missing Keywords": len(record.missing_keywords),
+            "Model": record.model,
+            "Time (s)": round(record.latency, 1) if record.latency is not None else None,
+        }
+        for record in records
+    ]
+    selection = st.dataframe(
+        rows,
+        use_container_width=True,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=f"history_table_{len(cursors)}"
+    )
+
+    nav_col1, nav_col2, nav_col3 = st.columns([1, 2, 1])
+    with nav_col1:
+        if st.button("⬅️ Newer", disabled=len(cursors) == 1, use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with nav_col2:
+        st.caption(f"Page {len(cursors)} · {PAGE_SIZE} analyses per page")
+    with nav_col3:
+        if st.button("Older ➡️", disabled=len(records) < PAGE_SIZE, use_container_width=True):
+            cursors.append((records[-1].created, records[-1].id))
+            st.rerun()
+
+    selected = selection.selection.rows
+    if selected:
+        record = records[selected[0]]
+        st.divider()
+        st.subheader(f"{record.resume_name or 'Resume'} — {record.jd_title}")
+        st.caption(f"Resume ID `{record.resume_hash}` · Job description ID `{record.jd_hash}`")
+
+        if record.missing_keywords:
+            st.markdown("**Missing keywords:** " + ", ".join(record.missing_keywords))
+        if record.summary:
+            st.markdown(f"**Profile summary:** {record.summary}")
+
+        action_col1, action_col2, action_col3 = st.columns(3)
+        with action_col1:
+            if st.button("📊 Open in Resume Analyzer", type="primary", use_container_width=True):
+                st.session_state["results"] = {
+                    "kind": "analysis",
+                    "result": record.result(),
+                    "model_used": record.model,
+                    "resume_id": record.resume_hash,
+                    "skills": record.skills,
+                    "message": f"🗂️ Loaded from history (analyzed on {record.date})",
+                    "date": record.date,
+                    "created": time.strftime("%Y%m%d_%H%M%S", time.localtime(record.created)),
+                }
+                st.switch_page("pages/Resume_Analyzer.py")
+        # Filters are widget state, so they are changed in callbacks before the next run
+        with action_col2:
+            st.button("📄 All analyses of this resume", use_container_width=True,
+                      on_click=st.session_state.update, kwargs={"history_resume": record.resume_hash})
+        with action_col3:
+            st.button("📋 All analyses for this job", use_container_width=True,
+                      on_click=st.session_state.update, kwargs={"history_jd": record.jd_hash})
+
+# Bulk export of every analysis matching the filters, streamed to files in the cache dir
+st.divider()
+with st.expander("📦 Bulk Export"):
+    st.caption("Exports every analysis matching the filters above, including comparison and screening runs")
+    export_col1, export_col2 = st.columns([1, 3])
+    with export_col1:
+        export_format = st.selectbox("Format", FORMATS, key="export_format",
+                                     help="Parquet is offered when the pyarrow package is installed")
+    with export_col2:
+        export_columns = st.multiselect("Columns", list(COLUMNS), default=DEFAULT_COLUMNS, key="export_columns")
+
+    if st.button("📦 Export", disabled=not export_columns):
+        with st.spinner("Exporting analyses..."):
+            st.session_state["export_result"] = export(
+                iter_records(resume_hash=resume_filter or None, jd_hash=jd_filter or None),
+                export_columns, export_format,
+            )
+
+    exported = st.session_state.get("export_result")
+    if exported:
+        st.success(f"Exported {exported.rows} analyses ({exported.size / 1024 / 1024:.1f} MB)")
+        mime = {".csv": "text/csv", ".jsonl": "application/x-ndjson"}.get(exported.parts[0].suffix,
+                                                                       "application/octet-stream")
+        parts = [part for part in exported.parts if part.exists()]
+        if len(parts) > 1:
+            part = st.selectbox("File", parts, format_func=lambda path: path.name, key="export_part",
+                                help="Large exports are split into several files")
+        else:
+            part = parts[0] if parts else None
+        if part:
+            st.caption(f"Saved to `{part}`")
+            # Only the chosen part is loaded for download, and parts are bounded by SMART_ATS_EXPORT_PART_MB
+            with open(part, "rb") as data:
+                st.download_button(
+                    label=f"📥 Download {part.name}",
+                    data=data,
+                    file_name=part.name,
+                    mime=mime,
+                    on_click="ignore",
+                )
@@ -1,10 +1,28 @@
 import streamlit as st
-from google.genai import Client
-import os
-import PyPDF2 as pdf
 from dotenv import load_dotenv
 import json
 import time
+import uuid
+
+from utils.analysis import SOURCE_CACHE, SOURCE_SHARED, request_analysis
+from utils.background import DONE, FAILED, TIMED_OUT, submit_job
+from utils.config import MAX_JD_CHARS, MAX_PACK_SIZE
+from utils.extraction import load_pdf_resume
+from utils.gemini import DEFAULT_MODEL, MODEL_OPTIONS, create_client
+from utils.history import AnalysisRecord, history_store, preferences_profile
+from utils.incremental import ResumeSnapshot, load_snapshot, plan_update, resume_identity, save_snapshot, snapshot_key
+from utils.lint import ERROR, INFO, lint, load_facts
+from utils.local_scorer import IncrementalScorer
+from utils.multi_jd import build_prompt, parse_batch_response, plan_batches
+from utils.near_duplicate import jd_hash, near_duplicates
+from utils.output_modes import COMPACT, FULL, OUTPUT_MODES, SCORE_ONLY
+from utils.packing import Candidate, PackingScheduler, QuotaExhausted
+from utils.prerank import CandidatePool
+from utils.profiling import RunProfiler
+from utils.results import match_quality, parse_json_response, parse_match_score
+from utils.routing import AUTO_MODEL, model_router
+from utils.scheduler import BATCH, INTERACTIVE
+from utils.text_cleaning import estimate_tokens
 
 load_dotenv()
 
@@ -50,97 +68,476 @@ st.markdown("""
 def initialize_client():
     """Initialize Gemini client with error handling"""
     try:
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
+        gemini_client = create_client()
+        if gemini_client is None:
             st.error("⚠️ GOOGLE_API_KEY not found in environment variables!")
-            return None
-        return Client(api_key=api_key)
+        return gemini_client
     except Exception as e:
         st.error(f"Failed to initialize Gemini Client: {e}")
         return None
 
 
 client = initialize_client()
+preferences = history_store.preferences(preferences_profile(st.user, st.query_params, st.session_state))
+
+
+def get_gemini_response(prompt: str, model_name: str = DEFAULT_MODEL, priority: str = INTERACTIVE,
+                        config=None):
+    """Generate response from Gemini with error handling and retry logic
+
+    Identical requests already in flight from other sessions are joined
+    instead of being sent again. Bulk work passes ``priority=BATCH`` so it
+    queues behind other recruiters' single analyses. ``config`` is passed
+    to generate_content, e.g. an output mode's max_output_tokens.
+    """
+    if model_name == AUTO_MODEL:
+        model_name = route_model(prompt)
+
+    response, error, source = request_analysis(
+        client, prompt, model_name,
+        session_id=st.session_state.setdefault("session_id", uuid.uuid4().hex),
+        hedge=hedge_requests,
+        on_fallback=lambda: st.warning("Trying fallback model..."),
+        priority=priority,
+        config=config
+    )
+    if source == SOURCE_CACHE:
+        st.caption("⚡ Served from the shared analysis cache")
+    elif source == SOURCE_SHARED:
+        st.caption("♻️ Joined an identical analysis that was already in progress")
+    return response, error
+
+
+def load_resume(uploaded_file):
+    """Return the parsed resume for an upload, extracting the PDF only on a cache miss
+
+    Shows page-by-page progress while extracting; returns None if no text
+    could be read.
+    """
+    show_progress = preferences["show_progress"]
+    progress_bar = st.empty()
+    status_text = st.empty()
+
+    def update_progress(page_number: int, total_pages: int):
+        if show_progress:
+            progress_bar.progress(page_number / total_pages)
+            status_text.text(f"Reading page {page_number} of {total_pages}...")
+            time.sleep(0.1)
 
+    try:
+        return load_pdf_resume(uploaded_file.getvalue(), preferences["max_pages"], on_page=update_progress)
+    except Exception as e:
+        st.error(f"Error reading PDF: {e}")
+        return None
+    finally:
+        progress_bar.empty()
+        status_text.empty()
 
-def get_gemini_response(prompt: str, model_name: str = "gemini-2.0-flash-exp"):
-    """Generate response from Gemini with error handling and retry logic"""
-    if client is None:
-        return None, "Client not initialized. Check API key setup."
 
-    try:
-        response = client.models.generate_content(
-            model=model_name,
-            contents=prompt
+def route_model(prompt: str, local_score: int = None) -> str:
+    """Resolve the "auto" model option and show where the request was routed"""
+    decision = model_router.route(prompt, local_score)
+    st.caption(f"🧭 Auto-routed to **{decision.model}**: {decision.reason}")
+    return decision.model
+
+
+@st.fragment
+def job_description_input(live_preview: bool):
+    """JD text area plus a local match preview; edits rerun only this fragment"""
+    st.subheader("📋 Job Description")
+    jd_value = st.text_area(
+        "Paste the job description here",
+        height=300,
+        placeholder="Enter the complete job description including required skills, qualifications, and responsibilities...",
+        label_visibility="collapsed",
+        key="jd_text"
+    )
+
+    chars_count = len(jd_value)
+    st.caption(f"Characters: {chars_count}/5000")
+
+    resume_file = st.session_state.get("resume_upload")
+    if not live_preview or resume_file is None or len(jd_value.strip()) < 20:
+        return
+
+    resume = load_resume(resume_file)
+    if resume is None:
+        return
+
+    scorer = st.session_state.setdefault("local_scorer", IncrementalScorer())
+    preview = scorer.score(resume, jd_value[:MAX_JD_CHARS])
+
+    with st.container(border=True):
+        st.metric(
+            "⚡ Provisional Match (local)",
+            f"{preview.score}%",
+            help="Instant keyword-overlap estimate. Run the full analysis for the AI score."
         )
-        return response.text, None
-    except Exception as e:
-        error_msg = str(e)
-        # Try fallback model if the first one fails
-        if "2.0" in model_name:
+        if preview.missing:
+            st.caption("Keywords from the JD not found in your resume:")
+            st.markdown(
+                " ".join(f'<span class="keyword-tag">{kw}</span>' for kw in preview.missing),
+                unsafe_allow_html=True
+            )
+
+
+def complete_analysis(response, error, context: dict):
+    """Show the error for a finished analysis, or store its result for display"""
+    if error:
+        st.error(f"❌ Error: {error}")
+
+        with st.expander("🔧 Troubleshooting"):
+            st.markdown("""
+            **Common Solutions:**
+            1. Check your GOOGLE_API_KEY in .env file
+            2. Verify API key at [Google AI Studio](https://makersuite.google.com/app/apikey)
+            3. Ensure you have API quota available
+            4. Try a different model from sidebar
+            5. Reduce resume length (under 3 pages)
+            """)
+        return
+
+    try:
+        # Parse JSON response
+        result = parse_json_response(response)
+        if context.get("update") and not context["reused"]:
+            # Section-level answer: apply it to the previous version's result
             try:
-                st.warning("Trying fallback model...")
-                response = client.models.generate_content(
-                    model="gemini-1.5-flash",
-                    contents=prompt
-                )
-                return response.text, None
-            except Exception as e2:
-                return None, f"Both models failed. Error: {str(e2)}"
-        return None, error_msg
+                result = context["update"].merge(result)
+            except ValueError as e:
+                st.warning(f"⚠️ Could not apply the section update ({e}); running a full analysis instead")
+                full_context = {key: value for key, value in context.items() if key not in ("update", "message")}
+                response, error = get_gemini_response(context["full_prompt"], context["model_used"],
+                                                      config=context["config"])
+                complete_analysis(response, error, full_context)
+                return
+        if not context["reused"]:
+            near_duplicates.add(context["text"], context["jd_text"], result,
+                                context["model_choice"], context["output_mode"])
+
+        # The next upload of an edited version only needs its changed sections re-analyzed
+        snapshot = ResumeSnapshot(context["resume_id"], context["sections"], result)
+        save_snapshot(context["snapshot_key"], snapshot)
+        st.session_state.setdefault("resume_snapshots", {})[context["snapshot_key"]] = snapshot
+        record_history(
+            "analysis",
+            [(context["resume_id"], context["resume_name"], context["jd_text"], context["skills"], result)],
+            context["model_used"], context["started"]
+        )
 
+        st.session_state["results"] = {
+            "kind": "analysis",
+            "result": result,
+            "model_used": context["model_used"],
+            "resume_id": context["resume_id"],
+            "skills": context["skills"],
+            "lint": context.get("lint", []),
+            "message": context.get("message", "✅ Analysis completed successfully!"),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "created": time.strftime("%Y%m%d_%H%M%S"),
+        }
+
+    except json.JSONDecodeError as e:
+        st.warning("⚠️ Could not parse AI response as JSON")
+        st.subheader("Raw Response:")
+        st.code(response, language="text")
+        st.error(f"JSON Error: {e}")
+        st.info("The AI didn't return properly formatted JSON. Try again or adjust your inputs.")
+
+
+@st.fragment(run_every=1)
+def show_job_monitor():
+    """Live status of this session's background analyses, polled every second"""
+    jobs = st.session_state.get("jobs", [])
+    st.markdown("---")
+    st.subheader("⏳ Background Analyses")
+
+    for job in reversed(jobs):
+        status = job.poll()
+        name_col, status_col, time_col, action_col = st.columns([4, 1, 1, 1])
+        name_col.markdown(f"**{job.label}**")
+        status_col.caption(status.capitalize())
+        time_col.caption(f"{job.elapsed:.0f}s")
+        if job.active:
+            action_col.button("✖ Cancel", key=f"cancel_{job.id}", on_click=job.cancel)
+
+    # Hand finished jobs to the full script so their results are stored and shown
+    if any(not job.active and not job.context.get("handled") for job in jobs):
+        st.rerun()
 
-def input_pdf_text(uploaded_file):
-    """Extract text from PDF with progress tracking"""
-    try:
-        reader = pdf.PdfReader(uploaded_file)
-        text = ""
-        total_pages = len(reader.pages)
 
-        progress_bar = st.progress(0)
-        status_text = st.empty()
+def show_lint(findings: list):
+    """List resume-check findings with the fix for each"""
+    if not findings:
+        st.success("✅ No common ATS problems found.")
+        return
+    for finding in findings:
+        show = st.error if finding.severity == ERROR else st.info if finding.severity == INFO else st.warning
+        show(f"**{finding.message}**  \n{finding.rule.advice}")
+
+
+def export_name(prefix: str, created: str, extension: str) -> str:
+    """Download file name, with the run's timestamp unless turned off in Settings"""
+    if preferences["include_timestamp"]:
+        return f"{prefix}_{created}.{extension}"
+    return f"{prefix}.{extension}"
+
+
+def record_history(kind: str, pairs: list, model: str, started: float):
+    """Store (resume_hash, resume_name, jd_text, result) analyses in the history database"""
+    latency = time.time() - started
+    history_store.record_many([
+        AnalysisRecord(
+            kind=kind,
+            resume_hash=resume_id,
+            resume_name=resume_name,
+            jd_hash=jd_hash(jd_text[:MAX_JD_CHARS]),
+            jd_title=jd_text.strip().splitlines()[0][:60],
+            model=model,
+            score=parse_match_score(result.get("JD Match")),
+            missing_keywords=result.get("MissingKeywords", []),
+            summary=result.get("Profile Summary", ""),
+            skills=skills,
+            latency=latency,
+        )
+        for resume_id, resume_name, jd_text, skills, result in pairs
+        if "error" not in result
+    ])
 
-        for page_num in range(total_pages):
-            page = reader.pages[page_num]
-            text += str(page.extract_text()) + "\n"
 
-            # Update progress
-            progress = (page_num + 1) / total_pages
-            progress_bar.progress(progress)
-            status_text.text(f"Reading page {page_num + 1} of {total_pages}...")
-            time.sleep(0.1)
+def lint_results(findings: list, message: str) -> dict:
+    return {
+        "kind": "lint",
+        "findings": findings,
+        "message": message,
+        "created": time.strftime("%Y%m%d_%H%M%S"),
+    }
 
-        progress_bar.empty()
-        status_text.empty()
 
-        return text if text.strip() else None
-    except Exception as e:
-        st.error(f"Error reading PDF: {e}")
-        return None
+@st.fragment
+def show_profile_report(report):
+    """Hot functions, time per library and peak memory of the last profiled run"""
+    with st.expander(f"🔬 Profile of the last run: {report.wall_seconds:.2f}s, "
+                     f"peak {report.peak_bytes / 1024 / 1024:.1f} MB allocated"):
+        st.markdown("**Time by library** (own time, excluding callees)")
+        st.dataframe(report.areas, use_container_width=True, hide_index=True)
+        st.markdown("**Hottest functions**")
+        st.dataframe(report.functions, use_container_width=True, hide_index=True)
+        st.markdown("**Largest allocations still held at the end of the run**")
+        st.dataframe(report.allocations, use_container_width=True, hide_index=True)
+        st.download_button(
+            label="📥 Download .prof",
+            data=report.prof_data,
+            file_name=f"smart_ats_{time.strftime('%Y%m%d_%H%M%S')}.prof",
+            mime="application/octet-stream",
+            on_click="ignore",
+            help="Open with python -m pstats or snakeviz"
+        )
 
 
-# Improved prompt template
-input_prompt = """
-Act as an expert ATS (Application Tracking System) with deep knowledge in software engineering, 
-data science, data analytics, and big data engineering.
+@st.fragment
+def show_analysis(analysis: dict):
+    """Single-JD results: metrics, keyword tags, summary and export area"""
+    result = analysis["result"]
 
-Analyze the resume against the job description and provide:
-1. JD Match percentage (be realistic and accurate)
-2. Missing keywords that are critical for the role
-3. A compelling profile summary tailored to the JD
+    # Display results with enhanced UI
+    st.header("📊 Analysis Results")
 
-**IMPORTANT: Respond ONLY with valid JSON in this exact format:**
-{{"JD Match": "XX%", "MissingKeywords": ["keyword1", "keyword2", "keyword3"], "Profile Summary": "A professional summary here"}}
+    findings = analysis.get("lint", [])
+    if findings:
+        with st.expander(f"🩺 Resume check: {len(findings)} formatting issue(s) found locally"):
+            show_lint(findings)
 
-Resume:
-{text}
+    # Metrics in columns
+    metric_col1, metric_col2, metric_col3 = st.columns(3)
 
-Job Description:
-{jd}
+    with metric_col1:
+        match_score = result.get("JD Match", "N/A")
+        st.metric(
+            "📈 ATS Match Score",
+            match_score,
+            help="Percentage match with job description"
+        )
+
+    with metric_col2:
+        missing_keywords = result.get("MissingKeywords", [])
+        st.metric(
+            "🔑 Missing Keywords",
+            len(missing_keywords),
+            help="Critical keywords not found in resume"
+        )
+
+    with metric_col3:
+        # Calculate match quality
+        quality = match_quality(match_score)
+
+        st.metric(
+            "📋 Match Quality",
+            quality,
+            help="Overall resume quality assessment"
+        )
 
-Remember: Output ONLY the JSON object, no additional text.
+    st.divider()
+
+    # Missing Keywords Section
+    st.subheader("🔍 Missing Keywords Analysis")
+    if missing_keywords:
+        st.warning(f"Found {len(missing_keywords)} critical keywords missing from your resume:")
+
+        # Display keywords as styled tags
+        keywords_html = ""
+        for kw in missing_keywords:
+            keywords_html += f'<span class="keyword-tag">{kw}</span> '
+
+        st.markdown(keywords_html, unsafe_allow_html=True)
+
+        st.info("💡 **Tip:** Try to naturally incorporate these keywords into your resume.")
+    else:
+        st.success("✅ Great! Your resume contains all critical keywords.")
+
+    st.divider()
+
+    # Profile Summary
+    st.subheader("✍️ AI-Generated Profile Summary")
+    summary = result.get("Profile Summary", "")
+
+    if summary:
+        st.markdown(f"""
+        <div class="summary-box">
+            <p class="summary-text">{summary}</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+        st.caption("💡 You can use this summary at the top of your resume or LinkedIn profile.")
+    else:
+        st.info("No summary generated.")
+
+    st.divider()
+
+    # Download Results
+    st.subheader("💾 Export Results")
+
+    skills = analysis["skills"]
+    result_text = f"""
+=================================
+SMART ATS ANALYSIS RESULTS
+=================================
+
+Match Score: {match_score}
+Match Quality: {quality}
+
+Missing Keywords ({len(missing_keywords)}):
+{', '.join(missing_keywords) if missing_keywords else 'None'}
+
+Profile Summary:
+{summary}
+
+Detected Skills ({len(skills)}):
+{', '.join(skills) if skills else 'None'}
+
+Resume ID: {analysis["resume_id"][:12]}
+Model Used: {analysis["model_used"]}
+Date: {analysis["date"]}
+
+=================================
+Generated by Smart ATS Analyzer
+=================================
 """
 
+    export_format = preferences["export_format"]
+    col1, col2 = st.columns(2)
+    if export_format in ("TXT", "Both"):
+        col1.download_button(
+            label="📥 Download as TXT",
+            data=result_text,
+            file_name=export_name("ats_analysis", analysis["created"], "txt"),
+            mime="text/plain",
+            on_click="ignore",
+            use_container_width=True
+        )
+
+    if export_format in ("JSON", "Both"):
+        json_data = json.dumps({
+            **result,
+            "Resume ID": analysis["resume_id"],
+            "Detected Skills": skills,
+        }, indent=2)
+        (col2 if export_format == "Both" else col1).download_button(
+            label="📥 Download as JSON",
+            data=json_data,
+            file_name=export_name("ats_analysis", analysis["created"], "json"),
+            mime="application/json",
+            on_click="ignore",
+            use_container_width=True
+        )
+
+
+@st.fragment
+def show_comparison(comparison: dict):
+    """Multi-JD results: summary table, per-JD details and export"""
+    results = comparison["results"]
+    st.header("📊 Comparison Results")
+
+    summary_rows = []
+    for number, title in comparison["jds"]:
+        result = results[number]
+        summary_rows.append({
+            "Job Description": f"JD {number}: {title}",
+            "Match Score": result.get("JD Match", "Error"),
+            "Match Quality": match_quality(result.get("JD Match")),
+            "Missing Keywords": len(result.get("MissingKeywords", [])),
+        })
+    st.dataframe(summary_rows, use_container_width=True, hide_index=True)
+
+    for number, _ in comparison["jds"]:
+        result = results[number]
+        with st.expander(f"JD {number} — {result.get('JD Match', 'Error')}"):
+            if "error" in result:
+                st.error(f"❌ Error: {result['error']}")
+                continue
+
+            missing_keywords = result.get("MissingKeywords", [])
+            if missing_keywords:
+                st.markdown(
+                    " ".join(f'<span class="keyword-tag">{kw}</span>' for kw in missing_keywords),
+                    unsafe_allow_html=True
+                )
+            else:
+                st.success("✅ Your resume contains all critical keywords.")
+
+            if result.get("Profile Summary"):
+                st.markdown(f"""
+                <div class="summary-box">
+                    <p class="summary-text">{result["Profile Summary"]}</p>
+                </div>
+                """, unsafe_allow_html=True)
+
+    st.download_button(
+        label="📥 Download Comparison as JSON",
+        data=json.dumps({f"JD {number}": results[number] for number, _ in comparison["jds"]}, indent=2),
+        file_name=export_name("ats_comparison", comparison["created"], "json"),
+        mime="application/json",
+        on_click="ignore",
+        use_container_width=True
+    )
+
+
+@st.fragment
+def show_screening(screening: dict):
+    """Screening results: ranked candidate table and export"""
+    st.header("📊 Screening Results")
+    st.dataframe(screening["rows"], use_container_width=True, hide_index=True)
+
+    st.download_button(
+        label="📥 Download Screening as JSON",
+        data=json.dumps(screening["rows"], indent=2),
+        file_name=export_name("ats_screening", screening["created"], "json"),
+        mime="application/json",
+        on_click="ignore",
+        use_container_width=True
+    )
+
+
 # Header
 st.title("📊 Resume Analyzer")
 st.markdown("Analyze your resume against job descriptions using AI")
@@ -151,9 +548,75 @@ with st.sidebar:
 
     model_choice = st.selectbox(
         "Select Gemini Model",
-        ["gemini-2.0-flash-exp", "gemini-1.5-flash", "gemini-1.5-pro"],
-        index=0,
-        help="Choose the AI model for analysis"
+        MODEL_OPTIONS + [AUTO_MODEL],
+        index=(MODEL_OPTIONS + [AUTO_MODEL]).index(preferences["default_model"])
+        if preferences["default_model"] in MODEL_OPTIONS + [AUTO_MODEL] else 0,
+        format_func=lambda name: "auto (pick per request)" if name == AUTO_MODEL else name,
+        help="Choose the AI model for analysis. \"auto\" sends short or clear-cut comparisons "
+             "to the fastest model and escalates long or ambiguous ones."
+    )
+
+    analysis_mode = st.radio(
+        "Analysis Mode",
+        ["Single job description", "Compare multiple job descriptions", "Screen multiple resumes"],
+        help="Compare mode sends your resume once together with every job description. "
+             "Screen mode ranks many resumes locally and only sends the best ones to Gemini."
+    )
+    compare_mode = analysis_mode == "Compare multiple job descriptions"
+    screen_mode = analysis_mode == "Screen multiple resumes"
+
+    if screen_mode:
+        shortlist_size = st.slider(
+            "Candidates to analyze with Gemini",
+            min_value=1,
+            max_value=50,
+            value=10,
+            help="Resumes are pre-ranked locally; only this many are sent for full analysis"
+        )
+        ranking_method = st.selectbox("Local ranking method", ["bm25", "cosine"])
+
+    # Compare mode asks for one full answer per job description
+    output_mode = FULL
+    if not compare_mode:
+        output_mode = OUTPUT_MODES[st.selectbox(
+            "Response detail",
+            [FULL.label, COMPACT.label] + ([SCORE_ONLY.label] if screen_mode else []),
+            help="Compact answers have a shorter summary and at most 8 keywords, and come back faster. "
+                 "Score only skips keywords and summary for the quickest bulk screening."
+        )]
+
+    stop_on_lint_errors = st.toggle(
+        "Check the resume before using Gemini",
+        value=False,
+        help="Run the free local resume check first and skip the Gemini call "
+             "when it finds problems an ATS would trip over"
+    )
+
+    run_in_background = st.toggle(
+        "Run analysis in the background",
+        value=True,
+        help="Keep the page responsive while Gemini works, with live status and a Cancel button"
+    )
+
+    hedge_requests = st.toggle(
+        "Hedge slow requests",
+        value=False,
+        help="If Gemini is slower than usual, send one backup request and use whichever answers "
+             "first. Limited to a small share of requests and to spare rate-limit capacity."
+    )
+
+    reuse_near_duplicates = st.toggle(
+        "Reuse results for near-identical resumes",
+        value=True,
+        help="Skip the Gemini call when a lightly edited version of this resume "
+             "was already analysed against the same job description"
+    )
+
+    incremental_updates = st.toggle(
+        "Re-analyze only edited sections",
+        value=True,
+        help="When you upload an edited version of a resume already analyzed against this job "
+             "description, only the changed sections are sent to Gemini and merged into the last result"
     )
 
     st.divider()
@@ -167,33 +630,57 @@ with st.sidebar:
     """)
 
     if st.button("🔄 Reset Analysis", use_container_width=True):
+        st.session_state.pop("results", None)
+        st.session_state.pop("profile_report", None)
         st.rerun()
 
 # Main content area
 col1, col2 = st.columns([1, 1])
 
 with col1:
-    st.subheader("📋 Job Description")
-    jd = st.text_area(
-        "Paste the job description here",
-        height=300,
-        placeholder="Enter the complete job description including required skills, qualifications, and responsibilities...",
-        label_visibility="collapsed"
-    )
-
-    chars_count = len(jd)
-    st.caption(f"Characters: {chars_count}/5000")
+    if compare_mode:
+        st.subheader("📋 Job Descriptions")
+        jd_count = st.number_input("Number of job descriptions", min_value=2, max_value=10, value=3)
+        jds = []
+        for jd_tab, number in zip(st.tabs([f"JD {n}" for n in range(1, jd_count + 1)]), range(1, jd_count + 1)):
+            with jd_tab:
+                jds.append(st.text_area(
+                    f"Job description {number}",
+                    height=240,
+                    placeholder="Enter the complete job description including required skills, qualifications, and responsibilities...",
+                    label_visibility="collapsed",
+                    key=f"jd_{number}"
+                ))
+                st.caption(f"Characters: {len(jds[-1])}/5000")
+        jd = jds[0]
+    else:
+        job_description_input(live_preview=not screen_mode)
+        jd = st.session_state.get("jd_text", "")
 
 with col2:
-    st.subheader("📄 Resume Upload")
-    uploaded_file = st.file_uploader(
-        "Upload your resume (PDF format)",
-        type="pdf",
-        help="Please upload a PDF file containing your resume",
-        label_visibility="collapsed"
-    )
+    if screen_mode:
+        st.subheader("📄 Resume Uploads")
+        uploaded_files = st.file_uploader(
+            "Upload candidate resumes (PDF format)",
+            type="pdf",
+            accept_multiple_files=True,
+            help="Upload every candidate's resume; they are ranked locally first",
+            label_visibility="collapsed"
+        )
+        uploaded_file = uploaded_files[0] if uploaded_files else None
+        if uploaded_files:
+            st.success(f"✅ {len(uploaded_files)} files uploaded")
+    else:
+        st.subheader("📄 Resume Upload")
+        uploaded_file = st.file_uploader(
+            "Upload your resume (PDF format)",
+            type="pdf",
+            help="Please upload a PDF file containing your resume",
+            label_visibility="collapsed",
+            key="resume_upload"
+        )
 
-    if uploaded_file:
+    if uploaded_file and not screen_mode:
         st.success(f"✅ File uploaded: {uploaded_file.name}")
         file_size = uploaded_file.size / 1024
         st.caption(f"File size: {file_size:.2f} KB")
@@ -204,211 +691,341 @@ st.divider()
 col1, col2, col3 = st.columns([1, 2, 1])
 with col2:
     submit = st.button("🚀 Analyze Resume", type="primary", use_container_width=True)
-
-if submit:
-    # Validation
-    if not jd.strip():
-        st.error("❌ Please paste a job description before analyzing.")
-    elif uploaded_file is None:
-        st.error("❌ Please upload your resume in PDF format.")
-    elif len(jd) < 50:
-        st.warning("⚠️ Job description seems too short. Please provide a detailed description.")
+    check = not screen_mode and st.button("🩺 Quick Check (no API call)", use_container_width=True)
+
+if submit or check:
+    # A new submission replaces whatever result is on screen
+    st.session_state.pop("results", None)
+    started = time.time()
+
+# Profiling is switched on from the Settings page and covers exactly one run
+profiler = None
+if (submit or check) and st.session_state.pop("profile_next_run", False):
+    profiler = RunProfiler()
+    if profiler.start():
+        # cProfile only sees this thread, so the profiled analysis runs in the foreground
+        run_in_background = False
     else:
-        # Create progress container
-        with st.container():
-            st.markdown("---")
-            st.subheader("🔄 Analysis in Progress")
-
-            main_progress = st.progress(0)
+        st.warning("⚠️ Another session is being profiled right now; this run was not profiled.")
+        profiler = None
+
+try:
+    if check:
+        resume = load_resume(uploaded_file) if uploaded_file else None
+        if resume is None:
+            st.error("❌ Please upload a text-based resume in PDF format to check.")
+        else:
+            findings = lint(resume, None if compare_mode else jd[:MAX_JD_CHARS], load_facts(resume.cache_key))
+            st.session_state["results"] = lint_results(
+                findings, f"🩺 Resume check finished locally: {len(findings)} issue(s) found"
+            )
+
+    if submit and screen_mode:
+        if not jd.strip():
+            st.error("❌ Please paste a job description before screening.")
+        elif not uploaded_files:
+            st.error("❌ Please upload at least one resume in PDF format.")
+        elif len(jd) < 50:
+            st.warning("⚠️ Job description seems too short. Please provide a detailed description.")
+        else:
             status_container = st.empty()
+            status_container.info(f"📖 Extracting text from {len(uploaded_files)} resumes...")
 
-            # Step 1: Extract PDF text
-            status_container.info("📖 Step 1/3: Extracting text from PDF...")
-            main_progress.progress(10)
+            candidates = []
+            for resume_file in uploaded_files:
+                resume = load_resume(resume_file)
+                if resume is None:
+                    st.warning(f"⚠️ Skipped {resume_file.name}: no extractable text")
+                else:
+                    candidates.append((resume_file.name, resume))
+
+            if candidates:
+                status_container.info("📊 Ranking candidates locally...")
+                pool = CandidatePool([resume.text for _, resume in candidates])
+                ranked = pool.top_k(jd, len(candidates), ranking_method)
+                shortlist = ranked[:shortlist_size]
+
+                status_container.info(f"🤖 Analyzing the top {len(shortlist)} candidates with Gemini AI...")
+                scheduler = PackingScheduler(
+                    lambda prompt: get_gemini_response(prompt, model_choice, BATCH, output_mode.config(MAX_PACK_SIZE)),
+                    output_mode=output_mode
+                )
+                try:
+                    results = scheduler.run(
+                        [Candidate(str(index), candidates[index][1].prompt_text()) for index, _ in shortlist],
+                        jd
+                    )
+                except QuotaExhausted as e:
+                    # Keep what finished; the rest would only be refused again
+                    results = e.results
+                    st.error(f"❌ Screening stopped early: {e}")
+                status_container.empty()
 
-            text = input_pdf_text(uploaded_file)
+                rows = []
+                for rank, (index, local_score) in enumerate(ranked, start=1):
+                    result = results.get(str(index), {})
+                    rows.append({
+                        "Rank": rank,
+                        "Resume": candidates[index][0],
+                        "Local Score": round(local_score, 3),
+                        "ATS Match": result.get("JD Match", "—" if rank > shortlist_size else "Error"),
+                        "Missing Keywords": ", ".join(result.get("MissingKeywords", [])),
+                    })
+
+                record_history(
+                    "screening",
+                    [(candidates[index][1].content_hash, candidates[index][0], jd, candidates[index][1].skills,
+                      results[str(index)]) for index, _ in shortlist if str(index) in results],
+                    model_choice, started
+                )
 
-            if not text:
+                st.session_state["results"] = {
+                    "kind": "screening",
+                    "rows": rows,
+                    "message": f"✅ Ranked {len(candidates)} resumes locally and analyzed the top {len(shortlist)} "
+                               f"with {scheduler.stats.requests} Gemini request(s)",
+                    "created": time.strftime("%Y%m%d_%H%M%S"),
+                }
+
+    elif submit and compare_mode:
+        filled_jds = [(number, text) for number, text in enumerate(jds, start=1) if text.strip()]
+
+        if len(filled_jds) < 2:
+            st.error("❌ Please paste at least two job descriptions to compare.")
+        elif uploaded_file is None:
+            st.error("❌ Please upload your resume in PDF format.")
+        elif any(len(text) < 50 for _, text in filled_jds):
+            st.warning("⚠️ One or more job descriptions seem too short. Please provide detailed descriptions.")
+        else:
+            resume = load_resume(uploaded_file)
+
+            if resume is None:
                 st.error("❌ Failed to extract text from PDF. Please ensure it's a valid, text-based PDF.")
             else:
-                main_progress.progress(40)
-
-                # Step 2: Prepare data
-                status_container.info("🔧 Step 2/3: Preparing data for analysis...")
-                time.sleep(0.5)
-
-                # Limit text to avoid token issues
-                text = text[:8000]
-                jd_text = jd[:3000]
-
-                formatted_prompt = input_prompt.format(text=text, jd=jd_text)
-                main_progress.progress(60)
-
-                # Step 3: AI Analysis
-                status_container.info("🤖 Step 3/3: Analyzing with Gemini AI...")
-
-                response, error = get_gemini_response(formatted_prompt, model_choice)
-                main_progress.progress(100)
+                text = resume.prompt_text()
+                batches = plan_batches(text, filled_jds)
+                results = {}
+
+                main_progress = st.progress(0)
+                status_container = st.empty()
+
+                for batch_index, batch in enumerate(batches, start=1):
+                    status_container.info(
+                        f"🤖 Request {batch_index}/{len(batches)}: comparing against "
+                        f"{len(batch)} job description(s) with Gemini AI..."
+                    )
+                    response, error = get_gemini_response(build_prompt(text, batch), model_choice)
+                    if error:
+                        results.update({number: {"error": error} for number, _ in batch})
+                    else:
+                        try:
+                            results.update(parse_batch_response(response, batch))
+                        except json.JSONDecodeError as e:
+                            results.update({
+                                number: {"error": f"Could not parse AI response: {e}"} for number, _ in batch
+                            })
+                    main_progress.progress(batch_index / len(batches))
 
                 status_container.empty()
                 main_progress.empty()
 
-                if error:
-                    st.error(f"❌ Error: {error}")
-
-                    with st.expander("🔧 Troubleshooting"):
-                        st.markdown("""
-                        **Common Solutions:**
-                        1. Check your GOOGLE_API_KEY in .env file
-                        2. Verify API key at [Google AI Studio](https://makersuite.google.com/app/apikey)
-                        3. Ensure you have API quota available
-                        4. Try a different model from sidebar
-                        5. Reduce resume length (under 3 pages)
-                        """)
-                else:
-                    st.success("✅ Analysis completed successfully!")
-                    st.markdown("---")
-
-                    try:
-                        # Parse JSON response
-                        response_clean = response.strip()
-
-                        # Remove markdown code blocks if present
-                        if response_clean.startswith("```"):
-                            lines = response_clean.split("\n")
-                            response_clean = "\n".join(lines[1:-1])
-                        response_clean = response_clean.replace("```json", "").replace("```", "").strip()
-
-                        result = json.loads(response_clean)
-
-                        # Display results with enhanced UI
-                        st.header("📊 Analysis Results")
-
-                        # Metrics in columns
-                        metric_col1, metric_col2, metric_col3 = st.columns(3)
+                record_history(
+                    "comparison",
+                    [(resume.content_hash, uploaded_file.name, jd_text, resume.skills, results[number])
+                     for number, jd_text in filled_jds],
+                    model_choice, started
+                )
 
-                        with metric_col1:
-                            match_score = result.get("JD Match", "N/A")
-                            st.metric(
-                                "📈 ATS Match Score",
-                                match_score,
-                                help="Percentage match with job description"
+                st.session_state["results"] = {
+                    "kind": "comparison",
+                    "jds": [(number, jd_text.strip().splitlines()[0][:60]) for number, jd_text in filled_jds],
+                    "results": results,
+                    "message": f"✅ Compared against {len(filled_jds)} job descriptions in {len(batches)} request(s)!",
+                    "created": time.strftime("%Y%m%d_%H%M%S"),
+                }
+
+    elif submit:
+        # Validation
+        if not jd.strip():
+            st.error("❌ Please paste a job description before analyzing.")
+        elif uploaded_file is None:
+            st.error("❌ Please upload your resume in PDF format.")
+        elif len(jd) < 50:
+            st.warning("⚠️ Job description seems too short. Please provide a detailed description.")
+        else:
+            # Create progress container
+            with st.container():
+                st.markdown("---")
+                st.subheader("🔄 Analysis in Progress")
+
+                main_progress = st.progress(0)
+                status_container = st.empty()
+
+                # Step 1: Extract PDF text
+                status_container.info("📖 Step 1/3: Extracting text from PDF...")
+                main_progress.progress(10)
+
+                resume = load_resume(uploaded_file)
+                findings = lint(resume, jd[:MAX_JD_CHARS], load_facts(resume.cache_key)) if resume else []
+
+                if resume is None:
+                    st.error("❌ Failed to extract text from PDF. Please ensure it's a valid, text-based PDF.")
+                elif stop_on_lint_errors and any(finding.severity == ERROR for finding in findings):
+                    status_container.empty()
+                    main_progress.empty()
+                    st.session_state["results"] = lint_results(
+                        findings, "🩺 The resume check found problems to fix first, so no Gemini call was made"
+                    )
+                else:
+                    main_progress.progress(40)
+
+                    # Step 2: Prepare data
+                    status_container.info("🔧 Step 2/3: Preparing data for analysis...")
+
+                    st.caption(
+                        f"🧹 Text cleanup saved {resume.chars_saved:,} characters (~{resume.tokens_saved:,} tokens); "
+                        f"{len(resume.skills)} skills detected, ~{resume.total_tokens:,} resume tokens"
+                    )
+
+                    # Limit text to avoid token issues
+                    text = resume.prompt_text()
+                    jd_text = jd[:MAX_JD_CHARS]
+
+                    formatted_prompt = output_mode.prompt.format(text=text, jd=jd_text)
+                    main_progress.progress(60)
+
+                    # Step 3: AI Analysis
+                    status_container.info("🤖 Step 3/3: Analyzing with Gemini AI...")
+
+                    jd_key = jd_hash(jd_text)
+                    previous = history_store.latest(resume.content_hash, jd_key)
+                    if previous:
+                        st.caption(
+                            f"🗂️ This resume was analyzed against this job description on {previous.date} "
+                            f"(score {previous.score}%, {previous.model}). Past results are on the History page."
+                        )
+
+                    model_used = model_choice
+                    config = output_mode.config()
+                    context = {
+                        "text": text,
+                        "jd_text": jd_text,
+                        "resume_id": resume.content_hash,
+                        "resume_name": uploaded_file.name,
+                        "sections": resume.sections,
+                        "skills": resume.skills,
+                        "lint": findings,
+                        "started": started,
+                        # Near-duplicate reuse is scoped by the requested model option and output mode
+                        "model_choice": model_choice,
+                        "output_mode": output_mode.name,
+                        # Kept for a full analysis if a section-level answer cannot be applied
+                        "full_prompt": formatted_prompt,
+                        "config": config,
+                        "snapshot_key": snapshot_key(
+                            st.session_state.setdefault("session_id", uuid.uuid4().hex), jd_key,
+                            resume_identity(resume, uploaded_file.name)
+                        ),
+                    }
+
+                    # An edited version of a resume analyzed against this JD: send only the changed sections
+                    update = None
+                    snapshot = None
+                    if incremental_updates:
+                        snapshot = (st.session_state.get("resume_snapshots", {}).get(context["snapshot_key"])
+                                    or load_snapshot(context["snapshot_key"]))
+                    if snapshot and snapshot.resume_hash != resume.content_hash:
+                        update = plan_update(snapshot, resume)
+                        if update.worthwhile:
+                            formatted_prompt = update.prompt(resume, jd_text)
+                            config = None
+                            context["update"] = update
+                            context["message"] = (f"✅ Updated the previous analysis for your edits to: "
+                                                  f"{', '.join(update.changed)}")
+                            st.caption(
+                                f"✏️ {len(update.changed)} of {len(resume.sections)} sections changed since "
+                                f"the last analysis, so only those are re-analyzed "
+                                f"(~{estimate_tokens(formatted_prompt):,} prompt tokens)"
                             )
-
-                        with metric_col2:
-                            missing_keywords = result.get("MissingKeywords", [])
-                            st.metric(
-                                "🔑 Missing Keywords",
-                                len(missing_keywords),
-                                help="Critical keywords not found in resume"
+                        elif not update.unchanged:
+                            update = None
+
+                    near_match = None
+                    if update is None and reuse_near_duplicates:
+                        near_match = near_duplicates.lookup(text, jd_text, model_choice, output_mode.name)
+                    context["reused"] = bool(near_match) or bool(update and update.unchanged)
+
+                    if update and update.unchanged:
+                        response, error = json.dumps(snapshot.result), None
+                        st.info(
+                            "♻️ No section of the resume changed since the last analysis, so its result was reused."
+                        )
+                    elif near_match:
+                        similarity, cached_result = near_match
+                        response, error = json.dumps(cached_result), None
+                        st.info(
+                            f"♻️ Reused the analysis of a near-identical resume ({similarity:.0%} similar) "
+                            "for this job description. Turn off reuse in the sidebar to run a fresh analysis."
+                        )
+                    else:
+                        if model_choice == AUTO_MODEL:
+                            scorer = st.session_state.setdefault("local_scorer", IncrementalScorer())
+                            model_used = route_model(formatted_prompt, scorer.score(resume, jd_text).score)
+                        if run_in_background:
+                            job = submit_job(
+                                f"{uploaded_file.name} · {model_used}",
+                                request_analysis, client, formatted_prompt, model_used,
+                                session_id=st.session_state.setdefault("session_id", uuid.uuid4().hex),
+                                hedge=hedge_requests,
+                                config=config,
+                                context={**context, "model_used": model_used}
                             )
-
-                        with metric_col3:
-                            # Calculate match quality
-                            try:
-                                score_val = int(match_score.replace("%", ""))
-                                if score_val >= 80:
-                                    quality = "Excellent ⭐"
-                                elif score_val >= 60:
-                                    quality = "Good 👍"
-                                elif score_val >= 40:
-                                    quality = "Fair ⚠️"
-                                else:
-                                    quality = "Needs Work 📝"
-                            except:
-                                quality = "N/A"
-
-                            st.metric(
-                                "📋 Match Quality",
-                                quality,
-                                help="Overall resume quality assessment"
-                            )
-
-                        st.divider()
-
-                        # Missing Keywords Section
-                        st.subheader("🔍 Missing Keywords Analysis")
-                        if missing_keywords:
-                            st.warning(f"Found {len(missing_keywords)} critical keywords missing from your resume:")
-
-                            # Display keywords as styled tags
-                            keywords_html = ""
-                            for kw in missing_keywords:
-                                keywords_html += f'<span class="keyword-tag">{kw}</span> '
-
-                            st.markdown(keywords_html, unsafe_allow_html=True)
-
-                            st.info("💡 **Tip:** Try to naturally incorporate these keywords into your resume.")
-                        else:
-                            st.success("✅ Great! Your resume contains all critical keywords.")
-
-                        st.divider()
-
-                        # Profile Summary
-                        st.subheader("✍️ AI-Generated Profile Summary")
-                        summary = result.get("Profile Summary", "")
-
-                        if summary:
-                            st.markdown(f"""
-                            <div class="summary-box">
-                                <p class="summary-text">{summary}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-
-                            st.caption("💡 You can use this summary at the top of your resume or LinkedIn profile.")
+                            st.session_state["jobs"] = st.session_state.get("jobs", [])[-9:] + [job]
                         else:
-                            st.info("No summary generated.")
-
-                        st.divider()
-
-                        # Download Results
-                        st.subheader("💾 Export Results")
-
-                        result_text = f"""
-=================================
-SMART ATS ANALYSIS RESULTS
-=================================
-
-Match Score: {match_score}
-Match Quality: {quality}
-
-Missing Keywords ({len(missing_keywords)}):
-{', '.join(missing_keywords) if missing_keywords else 'None'}
-
-Profile Summary:
-{summary}
-
-Model Used: {model_choice}
-Date: {time.strftime('%Y-%m-%d %H:%M:%S')}
-
-=================================
-Generated by Smart ATS Analyzer
-=================================
-"""
-
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.download_button(
-                                label="📥 Download as TXT",
-                                data=result_text,
-                                file_name=f"ats_analysis_{time.strftime('%Y%m%d_%H%M%S')}.txt",
-                                mime="text/plain",
-                                use_container_width=True
-                            )
-
-                        with col2:
-                            json_data = json.dumps(result, indent=2)
-                            st.download_button(
-                                label="📥 Download as JSON",
-                                data=json_data,
-                                file_name=f"ats_analysis_{time.strftime('%Y%m%d_%H%M%S')}.json",
-                                mime="application/json",
-                                use_container_width=True
-                            )
+                            response, error = get_gemini_response(formatted_prompt, model_used, config=config)
+                    main_progress.progress(100)
+
+                    status_container.empty()
+                    main_progress.empty()
+
+                    if context["reused"] or not run_in_background:
+                        complete_analysis(response, error, {**context, "model_used": model_used})
+finally:
+    # Always end the run's profile, even when the script stops early (st.stop, st.rerun, errors)
+    if profiler:
+        st.session_state["profile_report"] = profiler.stop()
+
+# Pick up background analyses that finished since the last run
+for finished_job in st.session_state.get("jobs", []):
+    if finished_job.active or finished_job.context.get("handled"):
+        continue
+    finished_job.context["handled"] = True
+    if finished_job.status == DONE:
+        job_response, job_error, _ = finished_job.result
+        complete_analysis(job_response, job_error, finished_job.context)
+    elif finished_job.status == FAILED:
+        st.error(f"❌ Error: {finished_job.error}")
+    elif finished_job.status == TIMED_OUT:
+        st.error(f"❌ {finished_job.label} timed out after {finished_job.timeout:.0f} seconds. Please try again.")
+
+if any(job.active for job in st.session_state.get("jobs", [])):
+    show_job_monitor()
+
+# Results are kept in session state and rendered in fragments, so downloads and
+# other interactions with them never re-run the analysis or lose the result
+saved_results = st.session_state.get("results")
+if saved_results:
+    (st.info if saved_results["kind"] == "lint" else st.success)(saved_results["message"])
+    st.markdown("---")
+    if saved_results["kind"] == "screening":
+        show_screening(saved_results)
+    elif saved_results["kind"] == "comparison":
+        show_comparison(saved_results)
+    elif saved_results["kind"] == "lint":
+        st.header("🩺 Resume Check")
+        show_lint(saved_results["findings"])
+    else:
+        show_analysis(saved_results)
 
-                    except json.JSONDecodeError as e:
-                        st.warning("⚠️ Could not parse AI response as JSON")
-                        st.subheader("Raw Response:")
-                        st.code(response, language="text")
-                        st.error(f"JSON Error: {e}")
-                        st.info("The AI didn't return properly formatted JSON. Try again or adjust your inputs.")
\ No newline at end of file
+if st.session_state.get("profile_report"):
+    show_profile_report(st.session_state["profile_report"])
@@ -2,6 +2,14 @@ import streamlit as st
 import os
 from dotenv import load_dotenv
 
+from utils.gemini import MODEL_OPTIONS
+from utils.hedging import hedger
+from utils.history import history_store, preferences_profile
+from utils.routing import AUTO_MODEL, model_router
+from utils.scheduler import gemini_scheduler
+from utils.single_flight import analysis_flight
+from utils.usage import usage_ledger
+
 load_dotenv()
 
 st.set_page_config(
@@ -43,7 +51,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Tabs
-tab1, tab2, tab3 = st.tabs(["🔑 API Configuration", "🎨 Preferences", "ℹ️ About"])
+tab1, tab2, tab3, tab4 = st.tabs(["🔑 API Configuration", "📈 Usage", "🎨 Preferences", "ℹ️ About"])
 
 with tab1:
     st.header("Google Gemini API Configuration")
@@ -157,11 +165,83 @@ with tab1:
     </div>
     """, unsafe_allow_html=True)
 
+    flight_stats = analysis_flight.stats()
+    flight_col1, flight_col2, flight_col3 = st.columns(3)
+    flight_col1.metric("Gemini Calls Made", flight_stats["executed"],
+                       help="Analyses sent to Gemini by this app process")
+    flight_col2.metric("Duplicate Calls Saved", flight_stats["coalesced"],
+                       help="Identical concurrent analyses that joined an in-flight call")
+    flight_col3.metric("In Flight Now", flight_stats["in_flight"])
+
     if st.button("🔄 Refresh API Status", type="secondary"):
         st.rerun()
 
 with tab2:
+    st.header("Token Usage & Budgets")
+    st.markdown("Every Gemini call records its prompt and output tokens, latency and model.")
+
+    session_tokens = usage_ledger.session(st.session_state.get("session_id", ""))
+    today_tokens = usage_ledger.today()
+
+    usage_col1, usage_col2, usage_col3, usage_col4 = st.columns(4)
+    usage_col1.metric("This Session", f"{session_tokens:,} tokens")
+    usage_col2.metric("Today", f"{today_tokens:,} tokens")
+    usage_col3.metric("All Time", f"{usage_ledger.total_tokens:,} tokens")
+    usage_col4.metric("Est. Cost", f"${usage_ledger.total_cost:.4f}",
+                      help="Approximate, based on list prices per model")
+
+    st.subheader("🚦 Budgets")
+    for label, used, budget in (
+        ("Session", session_tokens, usage_ledger.session_budget),
+        ("Daily", today_tokens, usage_ledger.daily_budget),
+        ("Global", usage_ledger.total_tokens, usage_ledger.global_budget),
+    ):
+        if budget:
+            st.progress(min(used / budget, 1.0), text=f"{label}: {used:,} / {budget:,} tokens")
+        else:
+            st.caption(f"{label}: no limit configured")
+    st.caption("Budgets are set with SMART_ATS_SESSION_TOKEN_BUDGET, SMART_ATS_DAILY_TOKEN_BUDGET "
+               "and SMART_ATS_GLOBAL_TOKEN_BUDGET (0 disables a budget).")
+
+    st.subheader("🤖 Usage by Model")
+    model_rows = usage_ledger.model_rows()
+    if model_rows:
+        st.dataframe(model_rows, use_container_width=True, hide_index=True)
+    else:
+        st.info("No Gemini calls recorded yet.")
+
+    hedge_stats = hedger.stats()
+    hedge_col1, hedge_col2, hedge_col3 = st.columns(3)
+    hedge_col1.metric("Hedged Calls Sent", hedge_stats["hedges"],
+                      help=f"Backup requests for slow calls (at most {hedger.max_ratio:.0%} of calls)")
+    hedge_col2.metric("Hedges That Won", hedge_stats["hedge_wins"])
+    hedge_col3.metric("Hedges Skipped", hedge_stats["skipped"],
+                      help="Slow calls not hedged because of the hedge budget or rate limit")
+
+    st.subheader("🚥 Request Queue")
+    st.dataframe(gemini_scheduler.class_rows(), use_container_width=True, hide_index=True)
+    st.caption("Single analyses are interactive, screening runs are batch and the watch-folder worker is "
+               "background. Waiting calls are sent by weight, and batch/background calls can never use "
+               "the share of the quota reserved by SMART_ATS_INTERACTIVE_RESERVE. Figures are for this process.")
+
+    with st.expander("🕒 Recent Calls"):
+        st.dataframe(usage_ledger.recent_rows(), use_container_width=True, hide_index=True)
+
+    with st.expander("🧭 Recent Auto-Routing Decisions"):
+        routing_rows = model_router.recent_rows()
+        if routing_rows:
+            st.dataframe(routing_rows, use_container_width=True, hide_index=True)
+        else:
+            st.caption("No requests have used the \"auto\" model option yet.")
+
+    if st.button("🔄 Refresh Usage"):
+        st.rerun()
+
+with tab3:
     st.header("Application Preferences")
+    profile = preferences_profile(st.user, st.query_params, st.session_state)
+    preferences = history_store.preferences(profile)
+    model_options = MODEL_OPTIONS + [AUTO_MODEL]
 
     st.subheader("🎨 Display Settings")
 
@@ -179,14 +259,12 @@ with tab2:
 
     default_model = st.selectbox(
         "Default Gemini Model",
-        ["gemini-2.0-flash-exp", "gemini-1.5-flash", "gemini-1.5-pro"],
-        index=0,
+        model_options,
+        index=model_options.index(preferences["default_model"])
+        if preferences["default_model"] in model_options else 0,
         help="This will be your default model selection"
     )
 
-    st.info(
-        "💡 This preference will be saved for your current session. To make it permanent, modify the default in the code.")
-
     st.divider()
 
     st.subheader("📄 Resume Processing")
@@ -195,29 +273,42 @@ with tab2:
         "Maximum Resume Pages to Process",
         min_value=1,
         max_value=10,
-        value=5,
+        value=preferences["max_pages"],
         help="Limit the number of pages extracted from PDF resumes"
     )
 
     show_progress = st.checkbox(
         "Show detailed progress during analysis",
-        value=True,
+        value=preferences["show_progress"],
         help="Display step-by-step progress bars and status messages"
     )
 
     st.divider()
 
+    st.subheader("🔬 Diagnostics")
+
+    # Plain session state rather than a widget key, so the flag survives switching pages
+    st.session_state["profile_next_run"] = st.toggle(
+        "Profile the next analysis",
+        value=st.session_state.get("profile_next_run", False),
+        help="Wrap the next Analyze or Quick Check run in cProfile and tracemalloc. The report "
+             "appears below the results and switches itself off afterwards."
+    )
+
+    st.divider()
+
     st.subheader("💾 Export Settings")
 
     default_format = st.radio(
         "Default Export Format",
         ["TXT", "JSON", "Both"],
+        index=["TXT", "JSON", "Both"].index(preferences["export_format"]),
         help="Choose default format for downloading analysis results"
     )
 
     include_timestamp = st.checkbox(
         "Include timestamp in exported filenames",
-        value=True,
+        value=preferences["include_timestamp"],
         help="Add date and time to downloaded file names"
     )
 
@@ -227,14 +318,21 @@ with tab2:
 
     with col1:
         if st.button("💾 Save Preferences", type="primary", use_container_width=True):
-            st.success("✅ Preferences saved for current session!")
-            st.info("Note: Preferences are session-based and will reset when you refresh the app.")
+            history_store.save_preferences({
+                "default_model": default_model,
+                "max_pages": max_pages,
+                "show_progress": show_progress,
+                "export_format": default_format,
+                "include_timestamp": include_timestamp,
+            }, profile)
+            st.success("✅ Preferences saved! They are kept across refreshes and restarts.")
 
     with col2:
         if st.button("🔄 Reset to Defaults", use_container_width=True):
+            history_store.reset_preferences(profile)
             st.rerun()
 
-with tab3:
+with tab4:
     st.header("About Smart ATS Analyzer")
 
     col1, col2 = st.columns([1, 2])
@@ -280,6 +378,7 @@ with tab3:
         - **gemini-2.0-flash-exp** (Latest, Recommended)
         - **gemini-1.5-flash** (Fast, Efficient)
         - **gemini-1.5-pro** (Most Capable)
+        - **auto** (Routes each request by size and observed latency)
 
         ### Supported File Types
         - PDF (Text-based only)
@@ -296,8 +395,8 @@ with tab3:
         - Modern web browser
 
         ### Privacy & Security
-        - No data stored permanently
-        - Session-based processing
+        - Analysis history and preferences stay in a local SQLite file
+        - Resumes are not uploaded anywhere except to Gemini
         - Secure API communication
         """)
 
@@ -300,4 +300,7 @@ with tab4:
             **Why it's a problem:** {item['why']}
 
             **Solution:** {item['solution']}
-            """)
\ No newline at end of file
+            """)
+
+    st.info("🩺 Most of these mistakes are checked for free by **Quick Check** on the Resume Analyzer page, "
+            "before any Gemini call is made.")
@@ -0,0 +1,11 @@
+"""Shared test setup: import the app's modules with a throwaway cache directory."""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Set before utils.config is imported, so no test touches the real .cache or shared state
+os.environ["SMART_ATS_CACHE_DIR"] = tempfile.mkdtemp(prefix="smart-ats-tests-")
+os.environ["SMART_ATS_STATE_URL"] = "memory://"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
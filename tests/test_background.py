@@ -0,0 +1,84 @@
+import threading
+import time
+
+from utils.background import CANCELLED, DONE, FAILED, TIMED_OUT, AnalysisJob, submit_job
+from utils.fake_gemini import FakeGeminiClient
+from utils.gemini import generate
+from utils.prompts import input_prompt
+
+
+def wait_until_finished(job: AnalysisJob, seconds: float = 5.0):
+    until = time.monotonic() + seconds
+    while job.active and time.monotonic() < until:
+        time.sleep(0.01)
+
+
+def test_jobs_report_their_result_and_deadline():
+    deadlines = []
+
+    def analysis(text, deadline=None):
+        deadlines.append(deadline)
+        return text.upper()
+
+    job = submit_job("resume.pdf", analysis, "done", timeout=30)
+    wait_until_finished(job)
+    assert (job.status, job.result, job.error) == (DONE, "DONE", None)
+    assert deadlines == [job.started + 30]
+
+
+def test_errors_mark_the_job_failed():
+    def analysis(deadline=None):
+        raise RuntimeError("backend error")
+
+    job = submit_job("resume.pdf", analysis)
+    wait_until_finished(job)
+    assert (job.status, job.error) == (FAILED, "backend error")
+
+
+def test_slow_jobs_time_out_and_their_result_is_dropped():
+    release = threading.Event()
+
+    def analysis(deadline=None):
+        release.wait(5)
+        return "late"
+
+    job = submit_job("resume.pdf", analysis, timeout=0.1)
+    time.sleep(0.2)
+    assert job.poll() == TIMED_OUT
+    release.set()
+    job.future.result(5)
+    assert (job.status, job.result) == (TIMED_OUT, None)
+
+
+def test_cancelled_running_jobs_drop_their_result():
+    started, release = threading.Event(), threading.Event()
+
+    def analysis(deadline=None):
+        started.set()
+        release.wait(5)
+        return "unwanted"
+
+    job = submit_job("resume.pdf", analysis)
+    started.wait(5)
+    assert job.cancel()
+    release.set()
+    job.future.result(5)
+    assert (job.status, job.result) == (CANCELLED, None)
+    assert not job.cancel()
+
+
+def test_cancelled_queued_jobs_never_run():
+    runs = []
+    job = AnalysisJob("resume.pdf")
+    assert job.cancel()
+    job._run(lambda deadline=None: runs.append(deadline), (), {})
+    assert runs == []
+    assert job.status == CANCELLED
+
+
+def test_the_deadline_cuts_off_the_gemini_call():
+    prompt = input_prompt.format(text="Python developer", jd="Python developer")
+    started = time.monotonic()
+    text, error = generate(FakeGeminiClient(latency=5.0), prompt, "gemini-1.5-flash", deadline=time.time() + 0.2)
+    assert text is None and "timed out" in error
+    assert time.monotonic() - started < 1.0
@@ -0,0 +1,77 @@
+import pytest
+from google.genai import Client
+
+from utils import batch_jobs
+from utils.batch_jobs import DONE, FAILED, MAX_ATTEMPTS, all_jobs, poll_all, submit
+from utils.batch_server import BatchServer
+from utils.fake_gemini import FakeGeminiClient
+from utils.history import HistoryStore
+from utils.resume_model import parse_resume, resume_hash
+from utils.usage import UsageLedger
+
+JD = "Senior Python developer with AWS and Docker experience"
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    history = HistoryStore(tmp_path / "history.sqlite3")
+    monkeypatch.setattr(batch_jobs, "BATCH_DIR", tmp_path / "batch_jobs")
+    monkeypatch.setattr(batch_jobs, "history_store", history)
+    monkeypatch.setattr(batch_jobs, "usage_ledger", UsageLedger(session_budget=0, daily_budget=0, global_budget=0))
+    return history
+
+
+def run(fake: FakeGeminiClient, count: int = 3) -> list:
+    """Submit one job for ``count`` cached resumes to a local batch server and poll until nothing is open"""
+    resumes = []
+    for number in range(count):
+        text = f"Candidate {number}\nSkills\nPython, AWS\n"
+        content_hash = resume_hash(text.encode("utf-8"))
+        parse_resume(text, content_hash).save()
+        resumes.append((content_hash, f"resume-{number}.pdf"))
+
+    server = BatchServer(fake, queue_delay=0.0).start()
+    try:
+        client = Client(api_key="local", http_options={"base_url": server.url})
+        submit(client, JD, resumes, "gemini-1.5-flash", "compact")
+        poll_all(client, wait=True, interval=0.05)
+    finally:
+        server.stop()
+    return all_jobs()
+
+
+def test_answers_are_merged_into_the_history(history):
+    jobs = run(FakeGeminiClient(latency=0.0))
+
+    assert len(jobs) == 1
+    assert jobs[0].counts()[DONE] == 3
+    assert not jobs[0].active
+    records = history.page(limit=10)
+    assert sorted(record.resume_name for record in records) == ["resume-0.pdf", "resume-1.pdf", "resume-2.pdf"]
+    assert all(record.kind == "batch" and record.score is not None for record in records)
+
+
+@pytest.mark.parametrize("fake, error", [
+    (FakeGeminiClient(latency=0.0, error_rate=1.0), "RESOURCE_EXHAUSTED"),
+    (FakeGeminiClient(latency=0.0, malformed_rate=1.0), "unreadable answer"),
+])
+def test_failed_items_are_resubmitted_up_to_the_attempt_limit(history, fake, error):
+    jobs = run(fake)
+
+    assert [job.attempt for job in jobs] == list(range(1, MAX_ATTEMPTS + 1))
+    assert [job.resubmitted_as for job in jobs] == [job.id for job in jobs[1:]] + [None]
+    last = jobs[-1]
+    assert last.counts()[FAILED] == 3
+    assert all(error in item["error"] for item in last.items.values())
+    assert not any(job.active for job in jobs)
+    assert history.page(limit=10) == []
+
+
+def test_only_the_failed_items_are_resubmitted(history):
+    jobs = run(FakeGeminiClient(latency=0.0, error_rate=0.5, seed=1), count=8)
+
+    for job, retry in zip(jobs, jobs[1:]):
+        assert set(retry.items) == {key for key, item in job.items.items() if item["status"] == FAILED}
+    done = sum(job.counts()[DONE] for job in jobs)
+    assert done == len(history.page(limit=10))
+    assert done + jobs[-1].counts()[FAILED] == 8
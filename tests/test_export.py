@@ -0,0 +1,91 @@
+import csv
+import json
+
+import pytest
+
+from utils import export as export_module
+from utils.export import COLUMNS, export, iter_records
+from utils.history import AnalysisRecord, HistoryStore
+
+ALL_COLUMNS = list(COLUMNS)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    store.record_many([
+        AnalysisRecord(kind="analysis", resume_hash=f"r{number}", jd_hash="jd", score=number,
+                       resume_name=f"resume, \"{number}\".pdf", jd_title="Python developer",
+                       missing_keywords=["docker", "aws"], summary="Line one\nline two", skills=["python"],
+                       model="gemini-1.5-flash", latency=1.23456, created=1_000.0 + number)
+        for number in range(30)
+    ])
+    return store
+
+
+def expected(store) -> list:
+    return [{column: COLUMNS[column](record) for column in ALL_COLUMNS} for record in iter_records(store)]
+
+
+def test_iter_records_pages_through_everything(store, monkeypatch):
+    monkeypatch.setattr(export_module, "BATCH_ROWS", 7)
+    assert [record.score for record in iter_records(store)] == list(range(29, -1, -1))
+    assert len(list(iter_records(store, limit=10))) == 10
+
+
+def test_csv_round_trip_across_parts(store, tmp_path):
+    result = export(iter_records(store), ALL_COLUMNS, "csv", tmp_path / "out.csv", part_bytes=2_000)
+    assert result.rows == 30
+    assert len(result.parts) > 1
+
+    rows = []
+    for part in result.parts:
+        with open(part, newline="", encoding="utf-8") as file:
+            reader = csv.DictReader(file)
+            assert reader.fieldnames == ALL_COLUMNS
+            rows.extend(reader)
+    assert rows == [{column: "" if value is None else str(value) for column, value in row.items()}
+                    for row in expected(store)]
+
+
+def test_jsonl_round_trip_across_parts(store, tmp_path):
+    result = export(iter_records(store), ALL_COLUMNS, "jsonl", tmp_path / "out.jsonl", part_bytes=2_000)
+    assert len(result.parts) > 1
+    rows = [json.loads(line) for part in result.parts for line in part.read_text(encoding="utf-8").splitlines()]
+    assert rows == expected(store)
+
+
+def test_parquet_round_trip(store, tmp_path, monkeypatch):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(export_module, "BATCH_ROWS", 8)
+    result = export(iter_records(store), ALL_COLUMNS, "parquet", tmp_path / "out.parquet")
+    assert result.rows == 30
+    assert parquet.read_table(result.parts[0]).to_pylist() == expected(store)
+
+
+def test_empty_exports_still_write_a_file(tmp_path):
+    empty = HistoryStore(tmp_path / "empty.sqlite3")
+    result = export(iter_records(empty), ["date", "score"], "csv", tmp_path / "empty.csv")
+    assert result.rows == 0
+    assert result.parts[0].read_text(encoding="utf-8").strip() == "date,score"
+
+
+def test_unknown_columns_are_rejected(store, tmp_path):
+    with pytest.raises(ValueError):
+        export(iter_records(store), ["score", "salary"], "csv", tmp_path / "out.csv")
+
+
+def test_a_failure_opening_the_next_part_surfaces_and_leaves_no_temp_files(store, tmp_path, monkeypatch):
+    opened = []
+
+    def failing_open(path, mode):
+        opened.append(path)
+        if len(opened) == 2:
+            raise OSError("disk full")
+        return open(path, mode)
+    monkeypatch.setattr(export_module, "open", failing_open, raising=False)
+
+    with pytest.raises(OSError, match="disk full"):
+        export(iter_records(store), ALL_COLUMNS, "csv", tmp_path / "out.csv", part_bytes=2_000)
+    assert (tmp_path / "out.csv").exists()
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,86 @@
+import threading
+import time
+
+from utils.fake_gemini import FakeGeminiClient
+from utils.gemini import generate
+from utils.hedging import Hedger, hedge_model_for
+from utils.prompts import input_prompt
+from utils.rate_limit import RateLimiter
+from utils.scheduler import BATCH, INTERACTIVE, PriorityScheduler
+from utils.shared_state import MemoryStore
+from utils.usage import UsageLedger, UsageRecord
+
+PRIMARY = "gemini-2.0-flash-exp"
+PROMPT = input_prompt.format(text="Python developer, five years of Django", jd="Python developer")
+
+
+def hedger(max_ratio: float = 1.0, rpm: int = 100, bulk_rpm: int = None) -> Hedger:
+    """A hedger that hedges after 0.1s: the primary model's recorded p95 latency"""
+    ledger = UsageLedger(session_budget=0, daily_budget=0, global_budget=0)
+    for _ in range(10):
+        ledger.record(UsageRecord(timestamp=0.0, session_id="s", model=PRIMARY, prompt_tokens=100,
+                                  output_tokens=100, total_tokens=200, latency=0.1, fallback_used=False, ok=True))
+    store = MemoryStore()
+    bulk = RateLimiter(rpm=bulk_rpm, tpm=0, store=store, name="bulk") if bulk_rpm else None
+    scheduler = PriorityScheduler(RateLimiter(rpm=rpm, tpm=0, store=store, name="main"), bulk)
+    return Hedger(ledger, scheduler, max_ratio=max_ratio, min_delay=0.1)
+
+
+def slow_primary(hedger: Hedger):
+    """attempt() for Hedger.call: the primary model takes 1s, the hedge model 0.05s"""
+    clients = {PRIMARY: FakeGeminiClient(latency=1.0), hedge_model_for(PRIMARY): FakeGeminiClient(latency=0.05)}
+
+    def attempt(name: str, use_rate_limiter: bool = True):
+        limiter = hedger.scheduler.limiter_for(INTERACTIVE) if use_rate_limiter else None
+        return generate(clients[name], PROMPT, name, rate_limiter=limiter)
+    return attempt, clients
+
+
+def test_the_fast_hedge_wins_and_takes_one_permit():
+    hedging = hedger(rpm=3)
+    attempt, clients = slow_primary(hedging)
+    started = time.monotonic()
+    text, error = hedging.call(attempt, PRIMARY, tokens=500)
+
+    assert error is None and text
+    assert time.monotonic() - started < 0.8
+    assert hedging.stats() == {"calls": 1, "hedges": 1, "hedge_wins": 1, "skipped": 0}
+    assert clients[hedge_model_for(PRIMARY)].calls == 1
+    # One permit for the primary and one taken by the hedger for the hedge, out of three
+    assert hedging.scheduler.try_acquire(INTERACTIVE)
+    assert not hedging.scheduler.try_acquire(INTERACTIVE)
+
+
+def test_hedges_stay_within_their_share_of_calls():
+    hedging = hedger(max_ratio=0.5)
+    attempt, _ = slow_primary(hedging)
+    for _ in range(4):
+        hedging.call(attempt, PRIMARY)
+    # A hedge is only allowed once it keeps hedges at or below half the calls so far
+    assert hedging.stats() == {"calls": 4, "hedges": 2, "hedge_wins": 2, "skipped": 2}
+
+
+def test_no_hedge_is_sent_while_calls_are_queued():
+    hedging = hedger(rpm=100, bulk_rpm=1)
+    assert hedging.scheduler.try_acquire(BATCH)
+    # The bulk bucket is empty, so this batch call waits in the queue while interactive permits are free
+    waiter = threading.Thread(target=hedging.scheduler.acquire, args=(BATCH, 1.0))
+    waiter.start()
+    time.sleep(0.05)
+    try:
+        attempt, clients = slow_primary(hedging)
+        text, error = hedging.call(attempt, PRIMARY)
+    finally:
+        waiter.join(5)
+
+    assert error is None and text
+    assert hedging.stats() == {"calls": 1, "hedges": 0, "hedge_wins": 0, "skipped": 1}
+    assert clients[hedge_model_for(PRIMARY)].calls == 0
+
+
+def test_other_priorities_are_never_hedged():
+    hedging = hedger()
+    attempt, clients = slow_primary(hedging)
+    hedging.call(attempt, PRIMARY, BATCH)
+    assert hedging.stats()["calls"] == 0
+    assert clients[hedge_model_for(PRIMARY)].calls == 0
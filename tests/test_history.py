@@ -0,0 +1,79 @@
+import pytest
+
+from utils.history import DEFAULT_PREFERENCES, AnalysisRecord, HistoryStore, preferences_profile
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(tmp_path / "history.sqlite3")
+
+
+def records(count: int, created: float = 1_000.0, **fields) -> list:
+    return [
+        AnalysisRecord(kind="analysis", resume_hash=fields.get("resume_hash", f"r{number % 3}"),
+                       jd_hash=fields.get("jd_hash", "jd"), score=number, created=created + number // 2)
+        for number in range(count)
+    ]
+
+
+def test_pages_walk_every_row_newest_first_without_gaps(store):
+    # Pairs of rows share a timestamp, so the id has to break ties between pages
+    store.record_many(records(23))
+    seen = []
+    before = None
+    while True:
+        page = store.page(before=before, limit=5)
+        if not page:
+            break
+        seen.extend(page)
+        before = (page[-1].created, page[-1].id)
+
+    assert len(seen) == 23
+    assert len({record.id for record in seen}) == 23
+    keys = [(record.created, record.id) for record in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_pages_can_be_filtered_by_resume_and_jd(store):
+    store.record_many(records(12))
+    store.record_many(records(4, jd_hash="other"))
+    page = store.page(limit=100, resume_hash="r1", jd_hash="jd")
+    assert len(page) == 4
+    assert all(record.resume_hash == "r1" and record.jd_hash == "jd" for record in page)
+
+    latest = store.latest("r1", "jd")
+    assert (latest.created, latest.id) == (page[0].created, page[0].id)
+
+
+def test_records_round_trip(store):
+    record = AnalysisRecord(kind="analysis", resume_hash="r", jd_hash="jd", score=81,
+                            missing_keywords=["docker"], summary="Strong fit", skills=["python"])
+    record_id = store.record(record)
+    stored = store.get(record_id)
+    assert stored.result() == {"JD Match": "81%", "MissingKeywords": ["docker"], "Profile Summary": "Strong fit"}
+    assert stored.skills == ["python"]
+
+
+def test_preferences_are_kept_per_profile(store):
+    store.save_preferences({"max_pages": 2}, "browser:a")
+    assert store.preferences("browser:a")["max_pages"] == 2
+    assert store.preferences("browser:b") == DEFAULT_PREFERENCES
+
+    store.reset_preferences("browser:a")
+    assert store.preferences("browser:a") == DEFAULT_PREFERENCES
+
+
+def test_signed_in_users_get_their_own_profile():
+    user = {"is_logged_in": True, "email": "recruiter@example.com"}
+    assert preferences_profile(user, {}, {}) == "user:recruiter@example.com"
+
+
+def test_anonymous_profiles_are_kept_in_the_url_and_session():
+    query_params, session_state = {}, {}
+    profile = preferences_profile({}, query_params, session_state)
+    assert profile == f"browser:{query_params['profile']}"
+
+    # Navigating to another page drops the query parameters but not the session
+    query_params.clear()
+    assert preferences_profile({}, query_params, session_state) == profile
+    assert preferences_profile({}, {}, {}) != profile
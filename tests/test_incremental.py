@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from utils import shared_state
+from utils.config import SNAPSHOT_TTL_SECONDS
+from utils.incremental import (ResumeSnapshot, load_snapshot, plan_update, resume_identity, save_snapshot,
+                               snapshot_key)
+from utils.resume_model import parse_resume
+from utils.shared_state import MemoryStore
+
+RESUME = """Jane Doe
+jane.doe@example.com
+Experience
+- Built data pipelines in Python and Airflow, 2020 - Present
+- Ran the on-call rotation for the analytics platform
+Skills
+Python, SQL
+Education
+BSc Computer Science, 2019
+"""
+PREVIOUS_RESULT = {"JD Match": "60%", "MissingKeywords": ["Docker", "AWS"], "Profile Summary": "Solid"}
+
+
+def update_for(edited: str):
+    old = parse_resume(RESUME, "old")
+    snapshot = ResumeSnapshot(old.content_hash, dict(old.sections), PREVIOUS_RESULT)
+    return plan_update(snapshot, parse_resume(edited, "new"))
+
+
+def test_only_changed_sections_are_planned():
+    update = update_for(RESUME.replace("Python, SQL", "Python, SQL, Docker"))
+    assert update.changed == ["skills"]
+    assert update.worthwhile
+    assert update_for(RESUME.replace("Python, SQL", "Python,   SQL")).unchanged
+
+
+def test_merge_applies_resolved_and_new_keywords():
+    update = update_for(RESUME.replace("Python, SQL", "Python, SQL, Docker"))
+    merged = update.merge({"JD Match": "72%", "Resolved": ["docker"], "NewMissing": ["Kubernetes", "aws"]})
+    assert merged == {"JD Match": "72%", "MissingKeywords": ["AWS", "Kubernetes"], "Profile Summary": "Solid"}
+
+
+def test_merge_keeps_the_previous_score_when_none_is_given():
+    update = update_for(RESUME.replace("Python, SQL", "Python, SQL, Docker"))
+    assert update.merge({"Resolved": [], "NewMissing": []})["JD Match"] == "60%"
+
+
+@pytest.mark.parametrize("answer", [
+    {"JD Match": "70%", "Resolved": None, "NewMissing": []},
+    {"JD Match": "70%", "Resolved": [], "NewMissing": "Kubernetes"},
+    {"JD Match": "70%", "Resolved": [{"keyword": "docker"}], "NewMissing": []},
+    ["docker"],
+    "70%",
+])
+def test_merge_rejects_malformed_answers(answer):
+    update = update_for(RESUME.replace("Python, SQL", "Python, SQL, Docker"))
+    with pytest.raises(ValueError):
+        update.merge(answer)
+
+
+def test_snapshots_are_scoped_to_the_session_and_candidate():
+    resume = parse_resume(RESUME, "hash")
+    other = parse_resume(RESUME.replace("jane.doe@", "john.roe@"), "other")
+    assert resume_identity(resume, "resume.pdf") != resume_identity(other, "resume.pdf")
+    # Edits to anything but the email keep the identity, so the next version finds the snapshot
+    edited = parse_resume(RESUME.replace("Python, SQL", "Python, SQL, Docker"), "edited")
+    assert resume_identity(edited, "cv.pdf") == resume_identity(resume, "resume.pdf")
+
+    store = MemoryStore()
+    key = snapshot_key("session-a", "jd", resume_identity(resume, "resume.pdf"))
+    save_snapshot(key, ResumeSnapshot("hash", dict(resume.sections), PREVIOUS_RESULT), store)
+    assert load_snapshot(key, store).result == PREVIOUS_RESULT
+    assert load_snapshot(snapshot_key("session-b", "jd", resume_identity(resume, "resume.pdf")), store) is None
+
+
+def test_header_edits_keep_the_identity_and_are_diffed():
+    renamed = RESUME.replace("Jane Doe", "Jane A. Doe")
+    identity = resume_identity(parse_resume(RESUME, "old"), "a.pdf")
+    assert resume_identity(parse_resume(renamed, "new"), "a.pdf") == identity
+    assert update_for(renamed).changed == ["header"]
+
+
+def test_resumes_without_an_email_are_identified_by_file_name():
+    resume = parse_resume(RESUME.replace("jane.doe@example.com", "+1 555 123 4567"), "hash")
+    assert resume_identity(resume, "jane.pdf") != resume_identity(resume, "john.pdf")
+
+
+def test_snapshots_expire(monkeypatch):
+    clock = [time.time()]
+    monkeypatch.setattr(shared_state.time, "time", lambda: clock[0])
+    store = MemoryStore()
+    save_snapshot("key", ResumeSnapshot("hash", {}, PREVIOUS_RESULT), store)
+    clock[0] += SNAPSHOT_TTL_SECONDS + 1
+    assert load_snapshot("key", store) is None
@@ -0,0 +1,47 @@
+import os
+import time
+
+import pytest
+
+from utils import ingest
+from utils.gemini import RATE_LIMITED_MESSAGE
+from utils.ingest import DEFERRED, FAILED, MAX_ATTEMPTS, IngestWorker
+from utils.resume_model import parse_resume
+
+JD = "Senior Python developer with AWS and Docker experience"
+
+
+@pytest.fixture
+def worker(tmp_path, monkeypatch):
+    watch = tmp_path / "inbox"
+    watch.mkdir()
+    path = watch / "resume.pdf"
+    path.write_bytes(b"%PDF-1.4 resume")
+    settled = time.time() - 60
+    os.utime(path, (settled, settled))
+    monkeypatch.setattr(ingest, "load_pdf_resume",
+                        lambda data, max_pages: parse_resume("Jane Doe\nSkills\nPython\n", "hash"))
+    return IngestWorker(None, watch, JD, workers=1)
+
+
+def answer_with(monkeypatch, error: str):
+    monkeypatch.setattr(ingest, "request_analysis", lambda *args, **kwargs: (None, error, "gemini"))
+
+
+def test_quota_refusals_leave_the_file_pending_without_using_an_attempt(worker, monkeypatch):
+    answer_with(monkeypatch, RATE_LIMITED_MESSAGE)
+    for _ in range(MAX_ATTEMPTS + 2):
+        assert worker.scan_once()[DEFERRED] == 1
+
+    entry = worker.manifest.get("resume.pdf")
+    assert (entry["status"], entry["attempts"]) == (DEFERRED, 0)
+    assert worker.pending()
+
+
+def test_other_errors_are_retried_up_to_the_attempt_limit(worker, monkeypatch):
+    answer_with(monkeypatch, "500 INTERNAL: backend error")
+    for _ in range(MAX_ATTEMPTS):
+        assert worker.scan_once()[FAILED] == 1
+
+    assert worker.manifest.get("resume.pdf")["attempts"] == MAX_ATTEMPTS
+    assert worker.pending() == []
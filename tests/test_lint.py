@@ -0,0 +1,59 @@
+import pytest
+
+from utils.lint import ERROR, WARNING, document_facts, lint
+from utils.resume_model import parse_resume
+
+BODY = """Jane Doe
+jane.doe@example.com | +1 555 123 4567
+{experience}
+- Built data pipelines in Python, Jan 2020 - Present
+Technical Skills
+Python, SQL, Docker
+Education
+BSc Computer Science, 2019
+"""
+
+
+def finding_ids(resume) -> set:
+    return {finding.rule.id for finding in lint(resume)}
+
+
+@pytest.mark.parametrize("heading", [
+    "Experience", "Work Experience", "Relevant Experience", "EMPLOYMENT", "Career History:",
+    "Internships", "Professional Experience & Projects",
+])
+def test_experience_headings_are_recognised(heading):
+    resume = parse_resume(BODY.format(experience=heading), "hash")
+    assert "experience" in resume.sections
+    assert "no-experience" not in finding_ids(resume)
+
+
+@pytest.mark.parametrize("line", [
+    "- Led projects across three teams",
+    "Managed 5 projects for enterprise clients",
+    "Experience with Python and AWS at scale.",
+])
+def test_body_lines_are_not_headings(line):
+    resume = parse_resume(f"Jane Doe\nWork Experience\n{line}\n", "hash")
+    assert line in resume.sections["experience"]
+
+
+def test_skills_that_look_like_section_words_are_kept():
+    resume = parse_resume("Jane Doe\nSkills\nPython, Cloud Technologies, Project management\n", "hash")
+    assert resume.skills == ["python", "cloud technologies", "project management"]
+
+
+def test_missing_experience_is_a_warning_not_an_error():
+    resume = parse_resume("Jane Doe\njane.doe@example.com\nSkills\nPython\n", "hash")
+    findings = {finding.rule.id: finding.severity for finding in lint(resume)}
+    assert findings["no-experience"] == WARNING
+    assert ERROR not in findings.values()
+
+
+def test_contact_details_only_in_a_repeated_footer_are_flagged():
+    footer = "jane.doe@example.com | +1 555 123 4567"
+    pages = [f"Jane Doe\nExperience\n- Role {number}\n\n\n\n\n{footer}\nPage {number} of 3" for number in (1, 2, 3)]
+    assert document_facts(pages)["contact_in_page_edges"] == 1
+
+    pages[0] = pages[0].replace("- Role 1", "- Role 1\nContact: jane.doe@example.com")
+    assert document_facts(pages)["contact_in_page_edges"] == 0
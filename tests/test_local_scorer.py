@@ -0,0 +1,49 @@
+from utils import local_scorer
+from utils.local_scorer import IncrementalScorer
+from utils.resume_model import parse_resume
+
+RESUME = "Jane Doe\nSkills\nPython, k8s, PostgreSQL\nExperience\n- Built Django services on AWS\n"
+JD = "Python developer with Kubernetes, AWS and Docker. Docker experience is a must."
+
+
+def counting(monkeypatch) -> list:
+    """Record the text of every keyword_counts call the scorer makes"""
+    texts = []
+    original = local_scorer.keyword_counts
+
+    def keyword_counts(text):
+        texts.append(text)
+        return original(text)
+    monkeypatch.setattr(local_scorer, "keyword_counts", keyword_counts)
+    return texts
+
+
+def test_matches_are_weighted_by_jd_frequency():
+    match = IncrementalScorer().score(parse_resume(RESUME, "hash"), JD)
+    # Aliases count: "k8s" in the resume covers "Kubernetes" in the JD
+    assert set(match.matched) == {"python", "kubernetes", "aws"}
+    # "docker" appears twice in the JD, so it weighs double and comes first
+    assert match.missing == ["docker", "developer"]
+    assert match.score == round(100 * 3 / 6)
+
+
+def test_only_the_changed_side_is_recomputed(monkeypatch):
+    texts = counting(monkeypatch)
+    scorer = IncrementalScorer()
+    resume = parse_resume(RESUME, "hash")
+
+    first = scorer.score(resume, JD)
+    assert len(texts) == 2
+
+    # A rerun with the same inputs reuses everything
+    assert scorer.score(parse_resume(RESUME, "hash"), JD) is first
+    assert len(texts) == 2
+
+    # Typing in the JD box only re-reads the JD
+    edited_jd = JD + " Terraform"
+    assert "terraform" in scorer.score(resume, edited_jd).missing
+    assert texts[2:] == [edited_jd]
+
+    # A new upload only re-reads the resume
+    scorer.score(parse_resume(RESUME + "Docker\n", "other"), edited_jd)
+    assert len(texts) == 4 and texts[3] != edited_jd
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from utils.multi_jd import build_prompt, parse_batch_response, plan_batches
+
+BATCH = [(1, "Python developer"), (2, "Data engineer"), (3, "Frontend engineer")]
+
+
+def test_results_are_keyed_by_jd_number():
+    response = json.dumps([
+        {"JD": 3, "JD Match": "40%"},
+        {"JD": 1, "JD Match": "80%"},
+        {"JD": 2, "JD Match": "60%"},
+    ])
+    results = parse_batch_response(response, BATCH)
+    assert {number: result["JD Match"] for number, result in results.items()} == {1: "80%", 2: "60%", 3: "40%"}
+
+
+def test_unnumbered_items_fall_back_to_their_position():
+    response = json.dumps([{"JD Match": "80%"}, {"JD Match": "60%"}])
+    results = parse_batch_response(response, BATCH)
+    assert results[1]["JD Match"] == "80%"
+    assert results[2]["JD Match"] == "60%"
+    assert "error" in results[3]
+
+
+def test_single_object_and_results_wrapper_are_accepted():
+    single = parse_batch_response('{"JD": 2, "JD Match": "55%"}', BATCH)
+    assert single[2]["JD Match"] == "55%"
+    wrapped = parse_batch_response('{"results": [{"JD": 1, "JD Match": "70%"}]}', BATCH)
+    assert wrapped[1]["JD Match"] == "70%"
+
+
+def test_unknown_and_malformed_items_are_ignored():
+    response = json.dumps([{"JD": 9, "JD Match": "10%"}, {"JD": "two", "JD Match": "20%"}, "text"])
+    results = parse_batch_response(response, BATCH)
+    assert all("error" in result for result in results.values())
+
+
+def test_non_json_response_raises():
+    with pytest.raises(json.JSONDecodeError):
+        parse_batch_response("not json at all", BATCH)
+
+
+def test_batches_respect_size_and_token_budget():
+    jds = [(number, "word " * 400) for number in range(1, 8)]
+    batches = plan_batches("resume text", jds, token_budget=10_000, max_per_request=3)
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+
+    tight = plan_batches("resume text", jds, token_budget=1_000, max_per_request=5)
+    assert all(len(batch) == 1 for batch in tight)
+    assert [number for batch in tight for number, _ in batch] == list(range(1, 8))
+
+
+def test_prompt_numbers_every_jd():
+    prompt = build_prompt("resume text", BATCH)
+    for number, jd in BATCH:
+        assert f"Job Description {number}:\n{jd}" in prompt
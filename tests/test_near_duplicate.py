@@ -0,0 +1,46 @@
+from utils.near_duplicate import NearDuplicateIndex
+
+JD = "Senior Python developer with AWS and Docker experience"
+RESUME = " ".join(
+    f"Built {system} in Python on AWS for the {team} team, cutting costs and latency for customers."
+    for system, team in [("data pipelines", "analytics"), ("billing services", "payments"),
+                         ("search indexing", "discovery"), ("deployment tooling", "platform"),
+                         ("reporting dashboards", "finance"), ("fraud models", "risk")]
+)
+RESULT = {"JD Match": "72%", "MissingKeywords": ["docker"], "Profile Summary": "Solid"}
+
+
+def index(tmp_path=None, threshold: float = 0.85) -> NearDuplicateIndex:
+    store = NearDuplicateIndex(tmp_path / "near.jsonl" if tmp_path else None, threshold=threshold)
+    store.add(RESUME, JD, RESULT, "gemini-1.5-flash", "full")
+    return store
+
+
+def test_a_resubmission_with_new_contact_details_is_a_hit():
+    edited = "Jane Doe jane@example.com +1 555 0100 " + RESUME
+    similarity, result = index().lookup(edited, JD, "gemini-1.5-flash", "full")
+    assert 0.85 <= similarity < 1.0
+    assert result == RESULT
+    # The added name is still a difference, so a stricter threshold rejects it
+    assert index(threshold=0.99).lookup(edited, JD, "gemini-1.5-flash", "full") is None
+
+
+def test_a_different_resume_is_a_miss():
+    other = "Registered nurse with ten years of intensive care and emergency department experience. " * 4
+    assert index().lookup(other, JD, "gemini-1.5-flash", "full") is None
+
+
+def test_lookups_are_scoped_to_the_same_jd_model_and_mode():
+    store = index()
+    assert store.lookup(RESUME, "Staff Java engineer for payment systems", "gemini-1.5-flash", "full") is None
+    assert store.lookup(RESUME, JD, "gemini-1.5-pro", "full") is None
+    assert store.lookup(RESUME, JD, "gemini-1.5-flash", "compact") is None
+    # Whitespace and case in the JD do not change its scope
+    assert store.lookup(RESUME, JD.upper() + "  ", "gemini-1.5-flash", "full") is not None
+
+
+def test_the_index_is_reloaded_from_its_log(tmp_path):
+    index(tmp_path)
+    reloaded = NearDuplicateIndex(tmp_path / "near.jsonl")
+    assert len(reloaded) == 1
+    assert reloaded.lookup(RESUME, JD, "gemini-1.5-flash", "full")[1] == RESULT
@@ -0,0 +1,23 @@
+import json
+
+from utils.output_modes import MODEL_MAX_OUTPUT_TOKENS, OUTPUT_MODES
+from utils.results import COMPACT_KEYWORDS, parse_json_response
+
+
+def test_every_mode_caps_output_tokens():
+    for mode in OUTPUT_MODES.values():
+        assert mode.config()["max_output_tokens"] == mode.max_output_tokens
+        assert mode.output_tokens(3) > 3 * mode.max_output_tokens
+        assert mode.output_tokens(1_000) == MODEL_MAX_OUTPUT_TOKENS
+
+
+def test_compact_answers_are_expanded_and_keywords_capped():
+    keywords = [f"keyword{number}" for number in range(COMPACT_KEYWORDS + 4)]
+    result = parse_json_response(json.dumps({"m": 78, "k": keywords, "s": "Strong fit"}))
+    assert result == {"JD Match": "78%", "MissingKeywords": keywords[:COMPACT_KEYWORDS],
+                      "Profile Summary": "Strong fit"}
+
+
+def test_full_answers_are_left_alone():
+    answer = {"JD Match": "78%", "MissingKeywords": [f"keyword{number}" for number in range(12)]}
+    assert parse_json_response(json.dumps(answer)) == answer
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from utils.gemini import RATE_LIMITED_MESSAGE
+from utils.output_modes import FULL, SCORE_ONLY
+from utils.packing import Candidate, PackingScheduler, QuotaExhausted, parse_packed_response, plan_packs
+from utils.text_cleaning import estimate_tokens
+
+JD = "Senior Python developer with AWS and Docker experience"
+
+
+def candidates(count: int, words: int = 50) -> list:
+    return [Candidate(str(number), f"Candidate {number} " + "python aws " * words) for number in range(count)]
+
+
+def answer(candidate_id: str, score: int = 70) -> dict:
+    return {"id": candidate_id, "JD Match": f"{score}%", "MissingKeywords": [], "Profile Summary": ""}
+
+
+def test_packs_respect_size_and_token_budget():
+    packs = plan_packs(candidates(7), JD, token_budget=100_000, max_pack_size=3)
+    assert [len(pack) for pack in packs] == [3, 3, 1]
+
+    tight = plan_packs(candidates(4, words=400), JD, token_budget=1_000, max_pack_size=10)
+    assert all(len(pack) == 1 for pack in tight)
+
+
+def test_packs_are_sized_with_the_selected_modes_prompt():
+    pool = candidates(4, words=30)
+    block = estimate_tokens(pool[0].block)
+    # Room for two candidates next to the score-only prompt, but only one next to the longer full prompt
+    budget = estimate_tokens(SCORE_ONLY.packed_prompt) + estimate_tokens(JD) + 2 * block
+    assert estimate_tokens(FULL.packed_prompt) + estimate_tokens(JD) + 2 * block > budget
+
+    assert len(plan_packs(pool, JD, token_budget=budget, max_pack_size=4, output_mode=SCORE_ONLY)) == 2
+    assert len(plan_packs(pool, JD, token_budget=budget, max_pack_size=4, output_mode=FULL)) == 4
+
+
+def test_parse_keeps_only_wanted_well_formed_entries():
+    pack = candidates(3)
+    response = json.dumps([answer("0"), answer("1"), {"id": "2"}, answer("99"), "junk"])
+    assert sorted(parse_packed_response(response, pack)) == ["0", "1"]
+
+
+def test_parse_rejects_a_non_array():
+    with pytest.raises(ValueError):
+        parse_packed_response('{"id": "0", "JD Match": "50%"}', candidates(1))
+
+
+def test_partial_pack_answers_are_retried_one_by_one():
+    prompts = []
+
+    def call(prompt):
+        prompts.append(prompt)
+        if "### Candidate" in prompt:
+            return json.dumps([answer("0")]), None
+        return json.dumps({"JD Match": "55%", "MissingKeywords": [], "Profile Summary": ""}), None
+
+    scheduler = PackingScheduler(call, max_pack_size=3)
+    results = scheduler.run(candidates(3), JD)
+    assert sorted(results) == ["0", "1", "2"]
+    assert scheduler.stats.packed_requests == 1
+    assert scheduler.stats.single_requests == 2
+
+
+def test_malformed_pack_falls_back_to_single_calls():
+    def call(prompt):
+        if "### Candidate" in prompt:
+            return "[{not json", None
+        return json.dumps({"JD Match": "55%", "MissingKeywords": [], "Profile Summary": ""}), None
+
+    scheduler = PackingScheduler(call, max_pack_size=3)
+    assert sorted(scheduler.run(candidates(3), JD)) == ["0", "1", "2"]
+    assert scheduler.stats.malformed_packs == 1
+
+
+def test_other_errors_are_not_retried_one_by_one():
+    calls = []
+
+    def call(prompt):
+        calls.append(prompt)
+        return None, "500 internal error"
+
+    scheduler = PackingScheduler(call, max_pack_size=3)
+    assert scheduler.run(candidates(3), JD) == {}
+    assert len(calls) == 1
+    assert sorted(scheduler.stats.errors) == ["0", "1", "2"]
+
+
+def test_quota_errors_stop_the_run_with_partial_results():
+    def call(prompt):
+        if "Candidate 0 " in prompt:
+            return json.dumps([answer("0"), answer("1")]), None
+        return None, RATE_LIMITED_MESSAGE
+
+    scheduler = PackingScheduler(call, max_pack_size=2)
+    with pytest.raises(QuotaExhausted) as raised:
+        scheduler.run(candidates(6), JD)
+    assert sorted(raised.value.results) == ["0", "1"]
+    assert scheduler.stats.requests == 2
@@ -0,0 +1,38 @@
+import pytest
+
+from utils.prerank import CandidatePool
+
+JD = "Senior Python engineer: AWS, Docker, Kubernetes"
+RESUMES = [
+    "Accountant, ten years of audit, tax, payroll",
+    "Python engineer: AWS, Docker, Kubernetes, Terraform",
+    "Python scripting for reports",
+    "Python backend engineer on AWS, some Docker",
+    "Java developer, Spring, Oracle",
+]
+
+
+@pytest.mark.parametrize("method", ["bm25", "cosine"])
+def test_resumes_are_ranked_by_overlap_with_the_jd(method):
+    ranked = CandidatePool(RESUMES).top_k(JD, k=len(RESUMES), method=method)
+    assert [index for index, _ in ranked[:3]] == [1, 3, 2]
+    # No JD term at all
+    assert {index for index, _ in ranked[3:]} == {0, 4}
+    assert all(score == 0.0 for _, score in ranked[3:])
+
+
+def test_top_k_keeps_only_the_best():
+    pool = CandidatePool(RESUMES)
+    assert [index for index, _ in pool.top_k(JD, k=2)] == [1, 3]
+    assert len(pool.top_k(JD, k=50)) == len(RESUMES)
+    assert pool.top_k(JD, k=0) == []
+
+
+def test_long_resumes_are_not_favoured_by_bm25():
+    padded = "Python engineer, AWS. " + "Managed budgets, stakeholder reporting. " * 30
+    scores = CandidatePool(["Python engineer, AWS", padded] + RESUMES[2:]).bm25(JD)
+    assert scores[0] > scores[1]
+
+
+def test_an_empty_pool_ranks_nothing():
+    assert CandidatePool([]).top_k(JD, k=5) == []
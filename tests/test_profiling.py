@@ -0,0 +1,46 @@
+import json
+import pstats
+
+from utils.profiling import RunProfiler, _area
+
+
+def busy_work() -> int:
+    return sum(len(json.dumps({"n": number})) for number in range(20_000))
+
+
+def test_a_run_gives_a_ranked_report_and_a_loadable_prof_file(tmp_path):
+    profiler = RunProfiler()
+    assert profiler.start()
+    busy_work()
+    report = profiler.stop()
+
+    assert report.wall_seconds > 0 and report.peak_bytes > 0
+    # Ranked by time spent in the function itself
+    own = [row["Own (ms)"] for row in report.functions]
+    assert own == sorted(own, reverse=True)
+    assert any(row["Function"] == "busy_work" for row in report.functions)
+    assert "json" in {row["Area"] for row in report.areas}
+    assert report.allocations
+
+    path = tmp_path / "run.prof"
+    path.write_bytes(report.prof_data)
+    stats = pstats.Stats(str(path))
+    assert any(name == "busy_work" for _, _, name in stats.stats)
+
+
+def test_only_one_run_is_profiled_at_a_time():
+    first, second = RunProfiler(), RunProfiler()
+    assert first.start()
+    try:
+        assert not second.start()
+    finally:
+        first.stop()
+    assert second.start()
+    second.stop()
+
+
+def test_time_is_grouped_by_library():
+    assert _area("/usr/lib/python3.11/json/encoder.py") == "json"
+    assert _area("/venv/lib/python3.11/site-packages/PyPDF2/_page.py") == "PyPDF2"
+    assert _area("/app/utils/gemini.py") == "utils/gemini.py"
+    assert _area("~") == "builtins"
@@ -0,0 +1,51 @@
+from utils.resume_model import ParsedResume, parse_resume, resume_cache_key
+from utils.shared_state import MemoryStore, SQLiteStore
+
+RESUME = """Jane Doe
+jane.doe@example.com
+Professional Summary
+Data engineer who likes boring, reliable pipelines.
+Technical Skills
+Python3, JS, k8s, PostgreSQL, python
+Work Experience
+- Built data pipelines in Python and Airflow, Jan 2020 - Present
+Education
+BSc Computer Science, 2019
+"""
+
+
+def test_sections_skills_and_dates_are_split_out():
+    resume = parse_resume(RESUME, "hash")
+    assert list(resume.sections) == ["header", "summary", "skills", "experience", "education"]
+    assert resume.sections["header"] == "Jane Doe\njane.doe@example.com"
+    assert resume.sections["experience"].startswith("- Built data pipelines")
+    # Aliases are mapped to one canonical name and duplicates dropped
+    assert resume.skills == ["python", "javascript", "kubernetes", "postgresql"]
+    assert resume.dates == ["Jan 2020 - Present", "2019"]
+    assert resume.total_tokens == sum(resume.section_tokens) > 0
+
+
+def test_text_puts_sections_back_in_canonical_order():
+    resume = parse_resume("Jane Doe\nEducation\nBSc\nSkills\nPython\n", "hash")
+    assert resume.text == "Jane Doe\n\nSKILLS\nPython\n\nEDUCATION\nBSc"
+    assert resume.prompt_text(limit=8) == "Jane Doe"
+
+
+def test_round_trip_through_the_sqlite_store(tmp_path):
+    resume = parse_resume(RESUME, "hash", chars_saved=120, max_pages=2)
+    resume.save(SQLiteStore(tmp_path / "state.sqlite3"))
+
+    # A fresh connection to the file, as another process would open it
+    store = SQLiteStore(tmp_path / "state.sqlite3")
+    loaded = ParsedResume.load("hash", max_pages=2, store=store)
+    assert loaded.to_dict() == resume.to_dict()
+    assert loaded.cache_key == resume_cache_key("hash", 2) == "hash:2"
+    assert ParsedResume.latest("hash", store).to_dict() == resume.to_dict()
+    # A parse of every page is a different entry
+    assert ParsedResume.load("hash", store=store) is None
+
+
+def test_unreadable_cache_entries_are_a_miss():
+    store = MemoryStore()
+    store.set("resumes", resume_cache_key("hash"), "{not json")
+    assert ParsedResume.load("hash", store=store) is None
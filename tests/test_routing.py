@@ -0,0 +1,39 @@
+from utils.config import MAX_JD_CHARS, MAX_RESUME_CHARS
+from utils.prompts import input_prompt
+from utils.routing import FAST_MODELS, LARGE_MODEL, ModelRouter
+from utils.usage import UsageLedger, UsageRecord
+
+SHORT_PROMPT = input_prompt.format(text="Python developer, five years of Django", jd="Python developer")
+# The longest resume and JD the analyzer sends
+LONG_PROMPT = input_prompt.format(text="python " * (MAX_RESUME_CHARS // 7), jd="django " * (MAX_JD_CHARS // 7))
+
+
+def router(latencies: dict = None) -> ModelRouter:
+    """A router whose ledger has seen calls to each model with the given latency (None = errors)"""
+    ledger = UsageLedger(session_budget=0, daily_budget=0, global_budget=0)
+    for model, latency in (latencies or {}).items():
+        for _ in range(10):
+            ledger.record(UsageRecord(timestamp=0.0, session_id="s", model=model,
+                                      prompt_tokens=100, output_tokens=100, total_tokens=200,
+                                      latency=latency or 0.0, fallback_used=False, ok=latency is not None))
+    return ModelRouter(ledger)
+
+
+def test_short_prompts_go_to_the_fastest_flash_model():
+    assert router().route(SHORT_PROMPT).model == FAST_MODELS[0]
+
+
+def test_long_prompts_escalate_to_the_large_model():
+    decision = router().route(LONG_PROMPT)
+    assert decision.model == LARGE_MODEL
+    assert decision.reason.startswith("long prompt")
+
+
+def test_a_slow_large_model_is_skipped():
+    decision = router({LARGE_MODEL: 30.0}).route(LONG_PROMPT)
+    assert decision.model == FAST_MODELS[0]
+    assert "exceeds the latency target" in decision.reason
+
+
+def test_erroring_flash_models_are_avoided():
+    assert router({FAST_MODELS[0]: None}).route(SHORT_PROMPT).model == FAST_MODELS[1]
@@ -0,0 +1,77 @@
+import threading
+import time
+
+from utils.rate_limit import RateLimiter
+from utils.scheduler import BACKGROUND, BATCH, INTERACTIVE, PriorityScheduler
+from utils.shared_state import MemoryStore
+
+
+def scheduler(rpm: int = 300, bulk_rpm: int = None) -> PriorityScheduler:
+    store = MemoryStore()
+    bulk = RateLimiter(rpm=bulk_rpm, tpm=0, store=store, name="bulk") if bulk_rpm else None
+    return PriorityScheduler(RateLimiter(rpm=rpm, tpm=0, store=store, name="main"), bulk)
+
+
+def drain(limiter: RateLimiter):
+    while limiter.try_acquire():
+        pass
+
+
+def rows(scheduler: PriorityScheduler) -> dict:
+    return {row["Class"].lower(): row for row in scheduler.class_rows()}
+
+
+def test_interactive_calls_overtake_a_batch_backlog():
+    queue = scheduler()
+    drain(queue.limiter)
+    order = []
+
+    def call(priority, number):
+        assert queue.acquire(priority, timeout=10)
+        order.append((priority, number))
+
+    threads = [threading.Thread(target=call, args=(BATCH, number)) for number in range(4)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.01)
+    time.sleep(0.02)
+    interactive = [threading.Thread(target=call, args=(INTERACTIVE, number)) for number in range(3)]
+    for thread in interactive:
+        thread.start()
+        time.sleep(0.01)
+    for thread in threads + interactive:
+        thread.join(15)
+
+    # Weighted fair queuing: 8:3, so two interactive calls go before the first batch call, then they interleave
+    assert order[:4] == [(INTERACTIVE, 0), (INTERACTIVE, 1), (BATCH, 0), (INTERACTIVE, 2)]
+    assert [number for priority, number in order if priority == BATCH] == [0, 1, 2, 3]
+    assert rows(queue)[BATCH]["Sent"] == 4
+
+
+def test_bulk_classes_cannot_use_the_interactive_reserve():
+    queue = scheduler(rpm=10, bulk_rpm=8)
+    assert sum(queue.try_acquire(BATCH) for _ in range(10)) == 8
+    assert not queue.try_acquire(BACKGROUND)
+    assert sum(queue.try_acquire(INTERACTIVE) for _ in range(10)) == 2
+
+
+def test_try_acquire_never_jumps_the_queue():
+    queue = scheduler(rpm=60)
+    drain(queue.limiter)
+    waiter = threading.Thread(target=queue.acquire, args=(BATCH, 5))
+    waiter.start()
+    time.sleep(0.05)
+    try:
+        assert not queue.try_acquire(INTERACTIVE)
+    finally:
+        waiter.join(10)
+
+
+def test_waiting_calls_time_out():
+    queue = scheduler(rpm=1)
+    drain(queue.limiter)
+    started = time.monotonic()
+    assert not queue.acquire(BATCH, timeout=0.1)
+    assert time.monotonic() - started < 1.0
+    assert rows(queue)[BATCH]["Timed Out"] == 1
+    assert rows(queue)[BATCH]["Queued"] == 0
@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from utils import shared_state
+from utils.rate_limit import RateLimiter
+from utils.shared_state import MemoryStore, SQLiteStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStore()
+    return SQLiteStore(tmp_path / "state.sqlite3")
+
+
+def test_requests_per_minute_are_enforced(store):
+    limiter = RateLimiter(rpm=3, tpm=0, store=store, name="test")
+    assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+
+def test_tokens_per_minute_are_enforced(store):
+    limiter = RateLimiter(rpm=2, tpm=1_000, store=store, name="test")
+    assert limiter.try_acquire(tokens=600)
+    assert not limiter.try_acquire(tokens=600)
+    # A refused call takes nothing from the request bucket either
+    assert limiter.try_acquire(tokens=300)
+
+
+def test_take_reports_the_wait_until_a_permit_is_free(store):
+    limiter = RateLimiter(rpm=60, tpm=0, store=store, name="test")
+    while limiter.try_acquire():
+        pass
+    wait = store.take(limiter.buckets(0))
+    assert 0 < wait <= 1.0
+
+
+def test_acquire_waits_for_the_bucket_to_refill(store):
+    limiter = RateLimiter(rpm=600, tpm=0, store=store, name="test")
+    while limiter.try_acquire():
+        pass
+    assert limiter.acquire(timeout=1.0)
+    assert not limiter.acquire(timeout=0.0)
+
+
+def test_replicas_sharing_a_sqlite_file_share_one_budget(tmp_path):
+    path = tmp_path / "state.sqlite3"
+    limiters = [RateLimiter(rpm=20, tpm=0, store=SQLiteStore(path), name="shared") for _ in range(2)]
+    granted = []
+
+    def drain(limiter):
+        granted.extend(limiter.try_acquire() for _ in range(20))
+
+    threads = [threading.Thread(target=drain, args=(limiter,)) for limiter in limiters]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert sum(granted) == 20
+
+
+def test_expired_entries_are_hidden_and_purged(store, monkeypatch):
+    clock = [time.time()]
+    monkeypatch.setattr(shared_state.time, "time", lambda: clock[0])
+    store.set("cache", "old", "value", ttl=10)
+    store.set("cache", "kept", "value")
+    clock[0] += 11
+    assert store.get("cache", "old") is None
+    assert store.get("cache", "kept") == "value"
+
+    clock[0] += shared_state.PURGE_INTERVAL_SECONDS
+    store.set("cache", "new", "value", ttl=10)
+    if isinstance(store, MemoryStore):
+        keys = {key for _, key in store._data}
+    else:
+        keys = {row[0] for row in store._connection().execute("SELECT key FROM kv")}
+    assert keys == {"kept", "new"}
@@ -0,0 +1,148 @@
+import threading
+import time
+
+import pytest
+
+from utils.analysis import _shareable
+from utils.single_flight import SingleFlight
+
+
+class Interrupted(BaseException):
+    """Stands in for Streamlit stopping a script thread mid-call"""
+
+
+def run_in_thread(fn, *args):
+    outcome = {}
+
+    def target():
+        try:
+            outcome["value"] = fn(*args)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, outcome
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    runs = []
+
+    def slow():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return "answer"
+
+    leader, leader_outcome = run_in_thread(flight.do, "key", slow)
+    started.wait(5)
+    waiters = [run_in_thread(flight.do, "key", slow) for _ in range(3)]
+    time.sleep(0.05)
+    release.set()
+    for thread, _ in [(leader, leader_outcome)] + waiters:
+        thread.join(5)
+
+    assert len(runs) == 1
+    assert leader_outcome["value"] == ("answer", False)
+    assert all(outcome["value"] == ("answer", True) for _, outcome in waiters)
+    assert flight.stats() == {"executed": 1, "coalesced": 3, "in_flight": 0}
+
+
+def test_waiters_receive_the_leaders_exception():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("bad answer")
+
+    leader, leader_outcome = run_in_thread(flight.do, "key", failing)
+    started.wait(5)
+    waiter, waiter_outcome = run_in_thread(flight.do, "key", failing)
+    time.sleep(0.05)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    assert isinstance(leader_outcome["error"], ValueError)
+    assert isinstance(waiter_outcome["error"], ValueError)
+
+
+def test_a_waiter_takes_over_when_the_leader_is_interrupted():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    runs = []
+
+    def call():
+        runs.append(threading.current_thread().name)
+        if len(runs) == 1:
+            started.set()
+            release.wait(5)
+            raise Interrupted()
+        return "recovered"
+
+    leader, leader_outcome = run_in_thread(flight.do, "key", call)
+    started.wait(5)
+    waiter, waiter_outcome = run_in_thread(flight.do, "key", call)
+    time.sleep(0.05)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    assert isinstance(leader_outcome["error"], Interrupted)
+    # The waiter ran the call itself rather than sharing the interrupted result
+    assert waiter_outcome["value"] == ("recovered", False)
+    assert len(runs) == 2
+    assert flight.stats() == {"executed": 2, "coalesced": 0, "in_flight": 0}
+
+
+def test_waiters_can_time_out_without_stopping_the_call():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "late"
+
+    leader, leader_outcome = run_in_thread(flight.do, "key", slow)
+    started.wait(5)
+    with pytest.raises(TimeoutError):
+        flight.do("key", slow, timeout=0.05)
+    release.set()
+    leader.join(5)
+    assert leader_outcome["value"] == ("late", False)
+
+
+def test_waiters_retry_instead_of_sharing_the_leaders_quota_refusal():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    sessions = []
+
+    def call(session_id):
+        sessions.append(session_id)
+        if session_id == "exhausted":
+            started.set()
+            release.wait(5)
+            return None, "The session token budget is exhausted (1,000 of 1,000 tokens used or reserved)"
+        return "answer", None
+
+    leader, leader_outcome = run_in_thread(lambda: flight.do("key", call, "exhausted", shareable=_shareable))
+    started.wait(5)
+    waiter, waiter_outcome = run_in_thread(lambda: flight.do("key", call, "fine", shareable=_shareable))
+    time.sleep(0.05)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    assert leader_outcome["value"][0][0] is None
+    assert waiter_outcome["value"] == (("answer", None), False)
+    assert sessions == ["exhausted", "fine"]
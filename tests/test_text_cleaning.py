@@ -0,0 +1,48 @@
+import pytest
+
+from utils.resume_model import parse_resume
+from utils.text_cleaning import CHARS_PER_TOKEN, normalize_pages, normalize_text
+
+
+def test_headers_footers_and_page_numbers_repeated_across_pages_are_dropped():
+    bodies = ["Experience\nBuilt pipelines", "Led the data team", "Education\nBSc Computer Science"]
+    pages = [f"Jane Doe | jane.doe@example.com\n\n\n\n{body}\n\n\n\nConfidential\nPage {number} of 3"
+             for number, body in enumerate(bodies, 1)]
+    text, stats = normalize_pages(pages)
+    # The first copy of the header is kept: it is usually the candidate's contact line
+    assert [line for line in text.splitlines() if line] == [
+        "Jane Doe | jane.doe@example.com", "Experience", "Built pipelines", "Confidential", "Led the data team",
+        "Education", "BSc Computer Science",
+    ]
+    assert stats.removed_lines == 7
+
+
+def test_a_single_page_keeps_its_edge_lines():
+    text, _ = normalize_pages(["Jane Doe\nExperience\nPage 1 of 1"])
+    assert text == "Jane Doe\nExperience"
+
+
+@pytest.mark.parametrize("broken, joined", [
+    ("Built a data experi-\nmentation platform", "Built a data experimentation platform"),
+    ("A self-\ndriven engineer", "A self-driven engineer"),
+    ("Led cross-\nfunctional teams", "Led cross-functional teams"),
+    ("Worked with Python-\nBased services", "Worked with Python-\nBased services"),
+])
+def test_words_hyphenated_across_lines_are_joined(broken, joined):
+    assert normalize_text(broken)[0] == joined
+
+
+def test_bullets_are_unified_and_duplicates_removed():
+    text, stats = normalize_text("• Shipped the billing API\n● Shipped the billing API\n▪ Mentored two engineers\n"
+                                 "* Shipped the billing API")
+    assert text.splitlines() == ["- Shipped the billing API", "- Mentored two engineers"]
+    assert stats.removed_lines == 2
+
+
+def test_savings_are_reported_in_characters_and_tokens():
+    text, stats = normalize_text("Jane   Doe\n\n\n\nSkills:\t\tPython\n" + "• Same bullet\n" * 20)
+    assert stats.chars_saved == stats.original_chars - len(text) > 0
+    assert stats.tokens_saved == stats.chars_saved // CHARS_PER_TOKEN
+
+    resume = parse_resume(text, "hash", chars_saved=stats.chars_saved)
+    assert resume.tokens_saved == stats.tokens_saved
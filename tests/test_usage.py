@@ -0,0 +1,59 @@
+import threading
+
+import pytest
+
+from utils.usage import BudgetExceeded, UsageLedger, UsageRecord
+
+
+def record(tokens: int, session_id: str = "s", model: str = "gemini-1.5-flash", **fields) -> UsageRecord:
+    values = dict(timestamp=0.0, session_id=session_id, model=model, prompt_tokens=tokens, output_tokens=0,
+                  total_tokens=tokens, latency=1.0, fallback_used=False, ok=True)
+    values.update(fields)
+    return UsageRecord(**values)
+
+
+def test_reservations_count_against_the_budget_until_released():
+    ledger = UsageLedger(session_budget=1_000, daily_budget=0, global_budget=0)
+    first = ledger.check_budget("s", 400, 200)
+    with pytest.raises(BudgetExceeded):
+        ledger.check_budget("s", 400, 200)
+    ledger.record(record(500))
+    ledger.release(first)
+    ledger.check_budget("s", 300, 100)
+
+
+def test_concurrent_checks_cannot_overshoot_the_budget():
+    ledger = UsageLedger(session_budget=0, daily_budget=0, global_budget=3_000)
+    passed = []
+    barrier = threading.Barrier(10)
+
+    def call():
+        barrier.wait()
+        try:
+            ledger.check_budget("s", 800, 200)
+            passed.append(True)
+        except BudgetExceeded:
+            pass
+
+    threads = [threading.Thread(target=call) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert len(passed) == 3
+
+
+def test_batch_usage_is_costed_at_batch_prices_without_a_latency_sample():
+    ledger = UsageLedger(session_budget=0, daily_budget=0, global_budget=0)
+    for _ in range(12):
+        ledger.record(record(1_000))
+    ledger.record(record(1_000_000, session_id="batch", latency=0.0, batch=True))
+
+    assert ledger.model_health("gemini-1.5-flash") == (1.0, 0.0, 12)
+    assert ledger.latency_percentile("gemini-1.5-flash") == 1.0
+    row = ledger.model_rows()[0]
+    assert row["Calls"] == 12
+    assert row["Avg Latency (s)"] == 1.0
+    # 1M prompt tokens at half the $0.075 per million interactive price, plus the 12 interactive calls
+    assert row["Est. Cost ($)"] == pytest.approx(0.0375 + 12 * 0.000075, abs=1e-4)
+    assert ledger.total_tokens == 1_012_000
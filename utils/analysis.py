@@ -0,0 +1,69 @@
+"""The shared Gemini analysis call, usable from the page, worker threads and jobs."""
+from utils.config import ANALYSIS_CACHE_TTL_SECONDS
+from utils.gemini import generate, is_quota_error, request_tokens
+from utils.hedging import hedger
+from utils.results import parse_json_response
+from utils.scheduler import INTERACTIVE, gemini_scheduler
+from utils.shared_state import state_store
+from utils.single_flight import analysis_flight, analysis_key
+from utils.usage import usage_ledger
+
+# Where a response came from
+SOURCE_GEMINI = "gemini"
+SOURCE_CACHE = "cache"
+SOURCE_SHARED = "shared"
+
+
+def _shareable(result) -> bool:
+    # Rate-limit and budget refusals belong to the caller's session; others retry under their own
+    return not is_quota_error(result[1])
+
+
+def request_analysis(client, prompt: str, model_name: str, session_id: str = "default",
+                     hedge: bool = False, on_fallback=None, priority: str = INTERACTIVE, config=None,
+                     deadline: float = None):
+    """Return (response, error, source) for a prompt
+
+    Checks the shared analysis cache, joins an identical in-flight call if
+    there is one, and otherwise calls Gemini under the usage ledger, budgets
+    and rate limiter, waiting for a permit in the order the scheduler gives
+    its ``priority`` class. A joined call's quota or budget refusal is not
+    passed on; the call is retried under this ``session_id``. Only interactive calls are hedged, even when
+    ``hedge`` is set. ``config`` is passed on to generate_content (e.g. an
+    output mode's max_output_tokens). Every attempt stops at ``deadline``
+    (a time.time() value), if given. Well-formed responses are cached.
+    Safe to call off the Streamlit script thread as long as on_fallback is.
+    """
+    hedge = hedge and priority == INTERACTIVE
+    cache_key = analysis_key(prompt, model_name)
+    cached = state_store.get("analysis", cache_key)
+    if cached is not None:
+        return cached, None, SOURCE_CACHE
+
+    def attempt(name: str, use_rate_limiter: bool = True):
+        return generate(
+            client, prompt, name,
+            config=config,
+            # Hedged attempts run on worker threads; only the primary may report fallbacks
+            on_fallback=None if hedge else on_fallback,
+            ledger=usage_ledger,
+            session_id=session_id,
+            rate_limiter=gemini_scheduler.limiter_for(priority) if use_rate_limiter else None,
+            deadline=deadline
+        )
+
+    if hedge:
+        (response, error), shared = analysis_flight.do(cache_key, hedger.call, attempt, model_name, priority,
+                                                       request_tokens(prompt, config), shareable=_shareable)
+    else:
+        (response, error), shared = analysis_flight.do(cache_key, attempt, model_name, shareable=_shareable)
+
+    if shared:
+        return response, error, SOURCE_SHARED
+    if error is None:
+        try:
+            parse_json_response(response)
+            state_store.set("analysis", cache_key, response, ttl=ANALYSIS_CACHE_TTL_SECONDS)
+        except ValueError:
+            pass  # Don't cache malformed responses; the next attempt may succeed
+    return response, error, SOURCE_GEMINI
@@ -0,0 +1,104 @@
+"""Run analyses on a managed thread pool so the page never blocks on Gemini.
+
+Each submission returns an AnalysisJob handle that the page keeps in session
+state and polls. Cancelling a queued job removes it from the queue; a job that
+is already running cannot interrupt its HTTP request, so it is marked
+cancelled and its result is discarded when it arrives. Jobs running longer
+than their timeout are marked timed out the same way; the job function also
+gets the deadline, so its HTTP request is cut off then and the pool thread
+is freed instead of staying busy with an answer nobody will read.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.config import ANALYSIS_TIMEOUT_SECONDS, ANALYSIS_WORKERS
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMED_OUT = "timed out"
+
+# Shared by every Streamlit session in this process
+_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analysis")
+
+
+class AnalysisJob:
+    """Handle for one background analysis"""
+
+    def __init__(self, label: str, context: dict = None, timeout: float = ANALYSIS_TIMEOUT_SECONDS):
+        self.id = uuid.uuid4().hex[:8]
+        self.label = label
+        self.context = context or {}
+        self.timeout = timeout
+        self.status = QUEUED
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.future = None
+        self._lock = threading.Lock()
+
+    def _run(self, fn, args, kwargs):
+        with self._lock:
+            if self.status != QUEUED:
+                return
+            self.status = RUNNING
+            self.started = time.time()
+
+        try:
+            result, error = fn(*args, deadline=self.started + self.timeout, **kwargs), None
+        except Exception as e:
+            result, error = None, str(e)
+
+        with self._lock:
+            if self.status != RUNNING:
+                return  # cancelled or timed out meanwhile: drop the result
+            self.result = result
+            self.error = error
+            self.status = FAILED if error else DONE
+            self.finished = time.time()
+
+    def poll(self) -> str:
+        """Current status, applying the timeout to running jobs"""
+        with self._lock:
+            if self.status == RUNNING and time.time() - self.started > self.timeout:
+                self.status = TIMED_OUT
+                self.finished = time.time()
+            return self.status
+
+    def cancel(self) -> bool:
+        """Cancel the job if it has not finished; returns True if it was cancelled"""
+        with self._lock:
+            if self.status not in (QUEUED, RUNNING):
+                return False
+            if self.future is not None:
+                self.future.cancel()
+            self.status = CANCELLED
+            self.finished = time.time()
+            return True
+
+    @property
+    def active(self) -> bool:
+        return self.poll() in (QUEUED, RUNNING)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since submission (or until it finished)"""
+        return (self.finished or time.time()) - self.created
+
+
+def submit_job(label: str, fn, *args, context: dict = None, timeout: float = ANALYSIS_TIMEOUT_SECONDS,
+               **kwargs) -> AnalysisJob:
+    """Queue ``fn(*args, deadline=..., **kwargs)`` on the analysis pool and return its handle
+
+    ``deadline`` is the time.time() at which the job times out; ``fn`` should
+    stop by then.
+    """
+    job = AnalysisJob(label, context, timeout)
+    job.future = _executor.submit(job._run, fn, args, kwargs)
+    return job
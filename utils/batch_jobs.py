@@ -0,0 +1,371 @@
+"""Asynchronous Gemini batch jobs for bulk re-scoring, e.g. the whole candidate database overnight.
+
+Instead of one generate_content call per analysis under the interactive
+RPM limit, every analysis goes into a single JSONL job file. The file is
+uploaded and submitted as one batch job, and the command returns right away.
+Later runs poll the job. Once it has finished, its results file is
+downloaded and every line is merged into the analysis history. Each item
+fails on its own: an error line, an unparseable answer or a missing line
+only affects that item. Failed items are resubmitted as a smaller job, up to
+MAX_ATTEMPTS times. Batch jobs use their own quota (at about half the
+per-token price), so they never hold up interactive analyses. The trade-off
+is latency: a job may take hours.
+
+Job state is kept in one JSON file per job under the cache directory, so any
+later process can pick up a job where the last one stopped. Pointing
+SMART_ATS_GEMINI_BASE_URL at ``python -m utils.batch_server`` runs the whole
+flow against a local stand-in for the API.
+
+    python -m utils.batch_jobs submit --jd job_description.txt --mode compact
+    python -m utils.batch_jobs poll --wait
+"""
+import argparse
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from utils.config import BATCH_POLL_SECONDS, CACHE_DIR, EXPECTED_OUTPUT_TOKENS, MAX_JD_CHARS
+from utils.extraction import load_pdf_resume
+from utils.gemini import DEFAULT_MODEL, MODEL_OPTIONS, create_client
+from utils.history import AnalysisRecord, history_store
+from utils.ingest import write_atomic
+from utils.near_duplicate import jd_hash
+from utils.output_modes import OUTPUT_MODES
+from utils.resume_model import ParsedResume
+from utils.results import parse_json_response, parse_match_score
+from utils.text_cleaning import estimate_tokens
+from utils.usage import BudgetExceeded, UsageRecord, usage_ledger
+
+BATCH_DIR = CACHE_DIR / "batch_jobs"
+
+# Failed items are resubmitted in a follow-up job until they have been sent this many times
+MAX_ATTEMPTS = 3
+
+SUCCEEDED = "JOB_STATE_SUCCEEDED"
+CANCELLED = "JOB_STATE_CANCELLED"
+# A job in one of these states will not change any more
+FINISHED_STATES = {SUCCEEDED, CANCELLED, "JOB_STATE_FAILED", "JOB_STATE_EXPIRED"}
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+# Resume text no longer cached, or the job was cancelled on purpose: not resubmitted
+SKIPPED = "skipped"
+
+MODES = {mode.name: mode for mode in OUTPUT_MODES.values()}
+
+
+@dataclass
+class BatchJob:
+    """One submitted batch job and the state of each item in it"""
+    id: str
+    jd_text: str
+    jd_hash: str
+    model: str
+    mode: str
+    attempt: int = 1
+    name: str = None
+    state: str = None
+    created: float = None
+    finished: float = None
+    merged: bool = False
+    resubmitted_as: str = None
+    error: str = None
+    # key -> {"resume_hash", "resume_name", "status", "error"}
+    items: dict = field(default_factory=dict)
+
+    @property
+    def path(self) -> Path:
+        return BATCH_DIR / f"{self.id}.json"
+
+    @property
+    def active(self) -> bool:
+        """Still needs polling, merging or a resubmission of failed items"""
+        return not self.merged or (self.resubmitted_as is None and bool(self.retryable()))
+
+    def retryable(self) -> list:
+        return [key for key, item in self.items.items()
+                if item["status"] == FAILED and self.attempt < MAX_ATTEMPTS]
+
+    def counts(self) -> dict:
+        counts = {PENDING: 0, DONE: 0, FAILED: 0, SKIPPED: 0}
+        for item in self.items.values():
+            counts[item["status"]] += 1
+        return counts
+
+    def save(self):
+        BATCH_DIR.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.path, json.dumps(self.__dict__, indent=1))
+
+    @classmethod
+    def load(cls, path: Path) -> "BatchJob":
+        return cls(**json.loads(path.read_text(encoding="utf-8")))
+
+
+def all_jobs() -> list:
+    """Every job on record, oldest first"""
+    return sorted((BatchJob.load(path) for path in BATCH_DIR.glob("*.json")), key=lambda job: job.created or 0)
+
+
+def _item_key(resume_hash: str) -> str:
+    return resume_hash[:16]
+
+
+def _request_line(key: str, prompt: str, config) -> str:
+    request = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+    if config:
+        request["generation_config"] = config
+    return json.dumps({"key": key, "request": request})
+
+
+def write_job_file(job: BatchJob, path: Path) -> int:
+    """Write the JSONL requests for the job's pending items; returns the estimated prompt tokens"""
+    mode = MODES[job.mode]
+    tokens = 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as out:
+        for key, item in job.items.items():
+            resume = ParsedResume.latest(item["resume_hash"])
+            if resume is None:
+                item.update(status=SKIPPED, error="resume text is no longer cached")
+                continue
+            prompt = mode.prompt.format(text=resume.prompt_text(), jd=job.jd_text)
+            tokens += estimate_tokens(prompt)
+            out.write(_request_line(key, prompt, mode.config()) + "\n")
+    return tokens
+
+
+def submit(client, jd_text: str, resumes: list, model_name: str = DEFAULT_MODEL, mode: str = "compact",
+           attempt: int = 1) -> BatchJob:
+    """Build, upload and submit one job for (resume_hash, resume_name) pairs; returns without waiting"""
+    jd_text = jd_text[:MAX_JD_CHARS]
+    job_jd_hash = jd_hash(jd_text)
+    job = BatchJob(
+        id=f"{time.strftime('%Y%m%d-%H%M%S')}-{job_jd_hash[:8]}-{attempt}-{uuid.uuid4().hex[:6]}",
+        jd_text=jd_text, jd_hash=job_jd_hash, model=model_name, mode=mode, attempt=attempt,
+        created=time.time(),
+        items={_item_key(resume_hash): {"resume_hash": resume_hash, "resume_name": resume_name,
+                                        "status": PENDING, "error": None}
+               for resume_hash, resume_name in resumes},
+    )
+    job_file = BATCH_DIR / f"{job.id}.requests.jsonl"
+    reservation = None
+    try:
+        tokens = write_job_file(job, job_file)
+        pending = job.counts()[PENDING]
+        if not pending:
+            raise ValueError("none of the resumes have cached text to analyze")
+        # Budgets apply to batch tokens too, checked once for the whole job. The reservation only
+        # guards the submission itself; the job's actual usage is recorded when it is merged.
+        reservation = usage_ledger.check_budget(
+            "batch", tokens, pending * min(MODES[mode].output_tokens(), EXPECTED_OUTPUT_TOKENS)
+        )
+
+        uploaded = client.files.upload(file=str(job_file),
+                                       config={"display_name": job_file.name, "mime_type": "jsonl"})
+        batch = client.batches.create(model=model_name, src=uploaded.name,
+                                      config={"display_name": f"smart-ats-{job.id}"})
+    finally:
+        job_file.unlink(missing_ok=True)
+        if reservation is not None:
+            usage_ledger.release(reservation)
+    job.name = batch.name
+    job.state = _state(batch)
+    job.save()
+    return job
+
+
+def _state(batch) -> str:
+    return getattr(batch.state, "value", batch.state)
+
+
+def _response_text(response: dict) -> str:
+    candidates = response.get("candidates") or [{}]
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(part.get("text", "") for part in parts)
+
+
+def _error_message(error) -> str:
+    if isinstance(error, dict):
+        return f"{error.get('code', '')} {error.get('message', '')}".strip()
+    return getattr(error, "message", None) or str(error)
+
+
+def merge(client, job: BatchJob, batch):
+    """Record every answered item of a finished job in the history; failures are kept per item"""
+    if _state(batch) != SUCCEEDED:
+        message = _error_message(getattr(batch, "error", None) or f"job ended as {_state(batch)}")
+        status = SKIPPED if _state(batch) == CANCELLED else FAILED
+        for item in job.items.values():
+            if item["status"] == PENDING:
+                item.update(status=status, error=message)
+        job.merged = True
+        job.save()
+        return
+
+    output = client.files.download(file=batch.dest.file_name).decode("utf-8")
+    records, prompt_tokens, output_tokens = [], 0, 0
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        try:
+            answer = json.loads(line)
+            item = job.items[answer["key"]]
+        except (ValueError, KeyError):
+            continue
+        if "error" in answer:
+            item.update(status=FAILED, error=_error_message(answer["error"]))
+            continue
+        response = answer.get("response") or {}
+        usage = response.get("usageMetadata") or {}
+        prompt_tokens += usage.get("promptTokenCount", 0)
+        output_tokens += usage.get("candidatesTokenCount", 0)
+        try:
+            result = parse_json_response(_response_text(response))
+            score = parse_match_score(result["JD Match"])
+        except (ValueError, KeyError, TypeError) as e:
+            item.update(status=FAILED, error=f"unreadable answer: {e}")
+            continue
+        resume = ParsedResume.latest(item["resume_hash"])
+        records.append(AnalysisRecord(
+            kind="batch",
+            resume_hash=item["resume_hash"],
+            resume_name=item["resume_name"],
+            jd_hash=job.jd_hash,
+            jd_title=job.jd_text.strip().splitlines()[0][:60],
+            model=job.model,
+            score=score,
+            missing_keywords=result.get("MissingKeywords", []),
+            summary=result.get("Profile Summary", ""),
+            skills=resume.skills if resume else [],
+        ))
+        item.update(status=DONE, error=None)
+
+    for item in job.items.values():
+        if item["status"] == PENDING:
+            item.update(status=FAILED, error="missing from the job output")
+
+    # One transaction for the whole job, then the job is marked merged so it is never recorded twice
+    history_store.record_many(records)
+    usage_ledger.record(UsageRecord(
+        timestamp=time.time(), session_id="batch", model=job.model, prompt_tokens=prompt_tokens,
+        output_tokens=output_tokens, total_tokens=prompt_tokens + output_tokens,
+        latency=0.0, fallback_used=False, ok=True, batch=True,
+    ))
+    job.merged = True
+    job.save()
+
+
+def resubmit(client, job: BatchJob):
+    """Submit a follow-up job for the failed items that have attempts left; returns it or None"""
+    keys = job.retryable()
+    if not keys:
+        return None
+    retry = submit(client, job.jd_text,
+                   [(job.items[key]["resume_hash"], job.items[key]["resume_name"]) for key in keys],
+                   job.model, job.mode, job.attempt + 1)
+    job.resubmitted_as = retry.id
+    job.save()
+    return retry
+
+
+def poll(client, job: BatchJob):
+    """Advance one job: refresh its state, merge it once finished, resubmit its failures"""
+    if not job.merged:
+        batch = client.batches.get(name=job.name)
+        job.state = _state(batch)
+        if job.state not in FINISHED_STATES:
+            job.save()
+            return None
+        job.finished = time.time()
+        merge(client, job, batch)
+    return resubmit(client, job)
+
+
+def poll_all(client, wait: bool = False, interval: float = BATCH_POLL_SECONDS):
+    """Poll every open job once, or until none is left open"""
+    while True:
+        jobs = [job for job in all_jobs() if job.active]
+        for job in jobs:
+            try:
+                retry = poll(client, job)
+            except Exception as e:
+                # Network or API trouble: leave the job as it was for the next poll
+                job.error = str(e)
+                job.save()
+                print(f"{job.id}: {e}", flush=True)
+                continue
+            counts = job.counts()
+            print(f"{job.id}  {job.state}  {counts[DONE]} done, {counts[FAILED]} failed, "
+                  f"{counts[PENDING]} pending, {counts[SKIPPED]} skipped"
+                  + (f"  -> resubmitted as {retry.id}" if retry else ""),
+                  flush=True)
+        if not wait or not any(job.active for job in all_jobs()):
+            return
+        time.sleep(interval)
+
+
+def candidate_resumes(folder: Path = None, jd_hash_filter: str = None, max_pages: int = None) -> list:
+    """(resume_hash, resume_name) to score: PDFs in a folder, or every resume in the history"""
+    if folder is None:
+        return history_store.resumes(jd_hash_filter)
+    resumes = []
+    for path in sorted(folder.rglob("*.pdf")):
+        resume = load_pdf_resume(path.read_bytes(), max_pages)
+        if resume is not None:
+            resumes.append((resume.content_hash, path.name))
+    return resumes
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Bulk re-scoring through asynchronous Gemini batch jobs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    submit_parser = commands.add_parser("submit", help="Submit one job and return without waiting")
+    submit_parser.add_argument("--jd", type=Path, required=True, help="Text file with the job description")
+    submit_parser.add_argument("--resumes", type=Path, help="Folder of PDF resumes (default: every resume in the history)")
+    submit_parser.add_argument("--only-jd", help="Only history resumes already analyzed against this JD hash")
+    submit_parser.add_argument("--model", default=DEFAULT_MODEL, choices=MODEL_OPTIONS)
+    submit_parser.add_argument("--mode", choices=sorted(MODES), default="compact")
+    submit_parser.add_argument("--max-pages", type=int)
+    poll_parser = commands.add_parser("poll", help="Check open jobs, merge finished ones, resubmit failures")
+    poll_parser.add_argument("--wait", action="store_true", help="Keep polling until no job is open")
+    poll_parser.add_argument("--interval", type=float, default=BATCH_POLL_SECONDS)
+    commands.add_parser("list", help="Show every job on record")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for job in all_jobs():
+            counts = job.counts()
+            print(f"{job.id}  {job.state or '-':<20} {counts[DONE]:>6} done {counts[FAILED]:>6} failed "
+                  f"{counts[PENDING]:>6} pending {counts[SKIPPED]:>6} skipped  {'open' if job.active else 'closed'}")
+        return
+
+    client = create_client()
+    if client is None:
+        parser.error("GOOGLE_API_KEY is not set")
+    if not hasattr(client, "batches"):
+        parser.error("batch jobs need the Gemini API; for a local run unset SMART_ATS_FAKE_GEMINI "
+                     "and point SMART_ATS_GEMINI_BASE_URL at python -m utils.batch_server")
+
+    if args.command == "submit":
+        resumes = candidate_resumes(args.resumes, args.only_jd, args.max_pages)
+        if not resumes:
+            parser.error("no resumes to score")
+        try:
+            job = submit(client, args.jd.read_text(encoding="utf-8"), resumes, args.model, args.mode)
+        except (ValueError, BudgetExceeded) as e:
+            parser.error(str(e))
+        counts = job.counts()
+        print(f"Submitted {job.id} as {job.name}: {counts[PENDING]} analyses"
+              + (f", {counts[SKIPPED]} skipped (no cached text)" if counts[SKIPPED] else ""))
+    else:
+        poll_all(client, args.wait, args.interval)
+
+
+if __name__ == "__main__":
+    main()
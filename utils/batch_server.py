@@ -0,0 +1,224 @@
+"""Local stand-in for the Gemini Files and Batch APIs, for tests and dry runs of batch jobs.
+
+It serves the REST calls google-genai makes for a file-based batch job:
+resumable file upload, ``models/{model}:batchGenerateContent``, job status,
+cancellation and results download. Each request line is answered by
+FakeGeminiClient, so error and malformed-output rates can be set through the
+usual SMART_ATS_FAKE_* variables to exercise per-item failures. A job stays
+pending for ``--queue-delay`` seconds before it runs, like a queued job.
+Point the real client at it with SMART_ATS_GEMINI_BASE_URL (any API key
+works):
+
+    python -m utils.batch_server --port 8765
+    SMART_ATS_GEMINI_BASE_URL=http://127.0.0.1:8765 GOOGLE_API_KEY=local python -m utils.batch_jobs poll
+"""
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.fake_gemini import FakeGeminiClient
+from utils.usage import usage_from_response
+
+CREATE_RE = re.compile(r"/models/([^/:]+):batchGenerateContent$")
+BATCH_RE = re.compile(r"/(batches/[^/:]+)(:cancel)?$")
+DOWNLOAD_RE = re.compile(r"/(files/[^/:]+):download$")
+UPLOAD_RE = re.compile(r"/upload-session/(\d+)$")
+
+
+def _timestamp(seconds: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(seconds)) if seconds else None
+
+
+class BatchServer:
+    """In-memory files and batch jobs behind a threaded HTTP server"""
+
+    def __init__(self, client=None, host: str = "127.0.0.1", port: int = 0, queue_delay: float = 1.0):
+        self.client = client or FakeGeminiClient.from_env()
+        self.queue_delay = queue_delay
+        self.files = {}
+        self.batches = {}
+        self._uploads = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _handler(self))
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "BatchServer":
+        """Serve from a daemon thread (for tests and benchmarks)"""
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+
+    def _next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def start_upload(self, file: dict) -> int:
+        upload_id = self._next_id()
+        self._uploads[upload_id] = {"file": file, "data": bytearray()}
+        return upload_id
+
+    def upload_chunk(self, upload_id: int, data: bytes, finalize: bool):
+        """Append a chunk; returns the stored file resource once finalized, else None"""
+        upload = self._uploads[upload_id]
+        upload["data"] += data
+        if not finalize:
+            return None
+        del self._uploads[upload_id]
+        name = f"files/upload-{upload_id}"
+        self.files[name] = bytes(upload["data"])
+        file = upload["file"]
+        return {"name": name, "displayName": file.get("displayName") or file.get("display_name"),
+                "mimeType": file.get("mimeType") or file.get("mime_type"), "sizeBytes": str(len(upload["data"])),
+                "state": "ACTIVE", "createTime": _timestamp(time.time())}
+
+    def create_batch(self, model: str, batch: dict) -> dict:
+        name = f"batches/job-{self._next_id()}"
+        self.batches[name] = {
+            "model": f"models/{model}",
+            "displayName": batch.get("displayName", name),
+            "state": "BATCH_STATE_PENDING",
+            "createTime": time.time(),
+            "updateTime": time.time(),
+        }
+        source = (batch.get("inputConfig") or {}).get("fileName")
+        threading.Thread(target=self._run, args=(name, model, source), daemon=True).start()
+        return self.batch_resource(name)
+
+    def batch_resource(self, name: str) -> dict:
+        job = self.batches[name]
+        metadata = {key: value for key, value in job.items() if key not in ("createTime", "updateTime", "endTime")}
+        metadata.update({key: _timestamp(job.get(key)) for key in ("createTime", "updateTime", "endTime")})
+        return {"name": name, "metadata": metadata,
+                "done": job["state"] not in ("BATCH_STATE_PENDING", "BATCH_STATE_RUNNING")}
+
+    def cancel(self, name: str):
+        job = self.batches[name]
+        if job["state"] in ("BATCH_STATE_PENDING", "BATCH_STATE_RUNNING"):
+            job.update(state="BATCH_STATE_CANCELLED", updateTime=time.time(), endTime=time.time())
+
+    def _answer(self, model: str, line: str) -> dict:
+        item = json.loads(line)
+        request = item.get("request") or {}
+        prompt = "".join(part.get("text", "") for content in request.get("contents", [])
+                         for part in content.get("parts", []))
+        config = request.get("generation_config") or request.get("generationConfig") or {}
+        try:
+            response = self.client.generate_content(
+                model, prompt, {"max_output_tokens": config.get("max_output_tokens") or config.get("maxOutputTokens")}
+            )
+        except Exception as e:
+            return {"key": item.get("key"), "error": {"code": 429, "message": str(e)}}
+        prompt_tokens, output_tokens, total_tokens = usage_from_response(response)
+        return {"key": item.get("key"), "response": {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": response.text}]},
+                            "finishReason": "STOP"}],
+            "usageMetadata": {"promptTokenCount": prompt_tokens, "candidatesTokenCount": output_tokens,
+                              "totalTokenCount": total_tokens},
+        }}
+
+    def _run(self, name: str, model: str, source: str):
+        job = self.batches[name]
+        time.sleep(self.queue_delay)
+        if job["state"] != "BATCH_STATE_PENDING":
+            return
+        if source not in self.files:
+            job.update(state="BATCH_STATE_FAILED", updateTime=time.time(), endTime=time.time())
+            return
+        job.update(state="BATCH_STATE_RUNNING", updateTime=time.time())
+        answers = []
+        for line in self.files[source].decode("utf-8").splitlines():
+            if job["state"] != "BATCH_STATE_RUNNING":
+                return
+            if line.strip():
+                answers.append(json.dumps(self._answer(model, line)))
+        output = f"files/{name.split('/')[-1]}-output"
+        self.files[output] = ("\n".join(answers) + "\n").encode("utf-8")
+        job.update(state="BATCH_STATE_SUCCEEDED", updateTime=time.time(), endTime=time.time(),
+                   output={"responsesFile": output})
+
+
+def _handler(server: BatchServer):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body=None, headers: dict = None):
+            data = body if isinstance(body, bytes) else json.dumps(body or {}).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json" if not isinstance(body, bytes)
+                             else "application/octet-stream")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _not_found(self):
+            self._send(404, {"error": {"code": 404, "message": f"{self.path} not found", "status": "NOT_FOUND"}})
+
+        def _body(self) -> bytes:
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            batch, download = BATCH_RE.search(path), DOWNLOAD_RE.search(path)
+            if batch and batch.group(1) in server.batches:
+                self._send(200, server.batch_resource(batch.group(1)))
+            elif download and download.group(1) in server.files:
+                self._send(200, server.files[download.group(1)])
+            else:
+                self._not_found()
+
+        def do_POST(self):
+            path = self.path.split("?")[0]
+            body = self._body()
+            upload, create, batch = UPLOAD_RE.search(path), CREATE_RE.search(path), BATCH_RE.search(path)
+            if upload:
+                command = self.headers.get("X-Goog-Upload-Command", "")
+                file = server.upload_chunk(int(upload.group(1)), body, "finalize" in command)
+                self._send(200, {"file": file} if file else {},
+                           {"X-Goog-Upload-Status": "final" if file else "active"})
+            elif path.endswith("/files") and self.headers.get("X-Goog-Upload-Command") == "start":
+                upload_id = server.start_upload(json.loads(body or b"{}").get("file", {}))
+                host = self.headers.get("Host", "127.0.0.1")
+                self._send(200, {}, {"X-Goog-Upload-URL": f"http://{host}/upload-session/{upload_id}",
+                                     "X-Goog-Upload-Status": "active"})
+            elif create:
+                self._send(200, server.create_batch(create.group(1), json.loads(body).get("batch", {})))
+            elif batch and batch.group(2) and batch.group(1) in server.batches:
+                server.cancel(batch.group(1))
+                self._send(200, {})
+            else:
+                self._not_found()
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Gemini Files and Batch APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--queue-delay", type=float, default=1.0, help="Seconds each job stays pending")
+    args = parser.parse_args()
+
+    server = BatchServer(host=args.host, port=args.port, queue_delay=args.queue_delay)
+    print(f"Serving the Gemini batch API stand-in at {server.url} (Ctrl+C to stop)", flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
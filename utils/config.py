@@ -0,0 +1,80 @@
+"""Runtime settings shared by the pages and helper modules."""
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Where parsed resumes and other on-disk caches are kept
+CACHE_DIR = Path(os.getenv("SMART_ATS_CACHE_DIR", ".cache"))
+
+# Prompt slice limits used by the analyzer
+MAX_RESUME_CHARS = 8000
+MAX_JD_CHARS = 3000
+
+# Input-token budget for one multi-JD comparison request; larger sets are split
+MULTI_JD_TOKEN_BUDGET = int(os.getenv("SMART_ATS_MULTI_JD_TOKEN_BUDGET", "6000"))
+MAX_JDS_PER_REQUEST = int(os.getenv("SMART_ATS_MAX_JDS_PER_REQUEST", "5"))
+
+# Route Gemini calls to the local fake backend (benchmarks, load tests, demos)
+USE_FAKE_GEMINI = os.getenv("SMART_ATS_FAKE_GEMINI", "").lower() in ("1", "true", "yes")
+
+# Candidate packing: several short resumes for the same JD in one request
+PACK_TOKEN_BUDGET = int(os.getenv("SMART_ATS_PACK_TOKEN_BUDGET", "8000"))
+MAX_PACK_SIZE = int(os.getenv("SMART_ATS_MAX_PACK_SIZE", "6"))
+
+# Reuse results for resumes that are near-duplicates of one already analysed for the same JD
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("SMART_ATS_NEAR_DUPLICATE_THRESHOLD", "0.85"))
+
+# Token budgets enforced before each Gemini call (0 disables a budget)
+SESSION_TOKEN_BUDGET = int(os.getenv("SMART_ATS_SESSION_TOKEN_BUDGET", "200000"))
+DAILY_TOKEN_BUDGET = int(os.getenv("SMART_ATS_DAILY_TOKEN_BUDGET", "2000000"))
+GLOBAL_TOKEN_BUDGET = int(os.getenv("SMART_ATS_GLOBAL_TOKEN_BUDGET", "0"))
+
+# Output tokens assumed for a call when checking budgets up front
+EXPECTED_OUTPUT_TOKENS = 400
+
+# "auto" model routing: latency target and prompt-size thresholds
+LATENCY_TARGET_SECONDS = float(os.getenv("SMART_ATS_LATENCY_TARGET", "10"))
+SHORT_PROMPT_TOKENS = int(os.getenv("SMART_ATS_SHORT_PROMPT_TOKENS", "1500"))
+# A single-analysis prompt tops out near (MAX_RESUME_CHARS + MAX_JD_CHARS) / 4 tokens plus the template;
+# prompts within 10% of that come from resumes filling (nearly) their whole slice
+LONG_PROMPT_TOKENS = int(os.getenv("SMART_ATS_LONG_PROMPT_TOKENS",
+                                   str(round(0.9 * (MAX_RESUME_CHARS + MAX_JD_CHARS) / 4))))
+
+# Requests per minute allowed by the Gemini quota (free tier: 15)
+RPM_LIMIT = int(os.getenv("SMART_ATS_RPM_LIMIT", "15"))
+RATE_LIMIT_WAIT_SECONDS = float(os.getenv("SMART_ATS_RATE_LIMIT_WAIT", "60"))
+
+# Hedged requests: at most this share of calls may be duplicated
+HEDGE_MAX_RATIO = float(os.getenv("SMART_ATS_HEDGE_MAX_RATIO", "0.05"))
+HEDGE_MIN_DELAY_SECONDS = float(os.getenv("SMART_ATS_HEDGE_MIN_DELAY", "2"))
+
+# Shared state (analysis cache, extraction cache, rate buckets) for multi-replica deployments:
+# empty -> SQLite file in CACHE_DIR, "memory://" -> this process only, "redis://..." -> Redis
+STATE_URL = os.getenv("SMART_ATS_STATE_URL", "")
+TPM_LIMIT = int(os.getenv("SMART_ATS_TPM_LIMIT", "1000000"))
+ANALYSIS_CACHE_TTL_SECONDS = int(os.getenv("SMART_ATS_ANALYSIS_CACHE_TTL", str(7 * 24 * 3600)))
+# Section-level re-analysis snapshots belong to one session, so they only need to outlive it
+SNAPSHOT_TTL_SECONDS = int(os.getenv("SMART_ATS_SNAPSHOT_TTL", str(24 * 3600)))
+
+# Background analyses: worker threads shared by all sessions and per-analysis timeout
+ANALYSIS_WORKERS = int(os.getenv("SMART_ATS_ANALYSIS_WORKERS", "4"))
+ANALYSIS_TIMEOUT_SECONDS = float(os.getenv("SMART_ATS_ANALYSIS_TIMEOUT", "120"))
+
+# Bulk exports: CSV/JSONL files are split into downloadable parts of at most this size
+EXPORT_PART_BYTES = int(float(os.getenv("SMART_ATS_EXPORT_PART_MB", "50")) * 1024 * 1024)
+
+# Watch-folder ingestion: concurrent analyses and seconds between directory scans
+INGEST_WORKERS = int(os.getenv("SMART_ATS_INGEST_WORKERS", "2"))
+INGEST_POLL_SECONDS = float(os.getenv("SMART_ATS_INGEST_POLL", "10"))
+
+# Share of the RPM/TPM quota that batch and background calls may never use, kept for interactive calls
+INTERACTIVE_RESERVE_SHARE = float(os.getenv("SMART_ATS_INTERACTIVE_RESERVE", "0.2"))
+
+# Gemini API endpoint override, e.g. the local stand-in batch server (python -m utils.batch_server)
+GEMINI_BASE_URL = os.getenv("SMART_ATS_GEMINI_BASE_URL", "")
+
+# Batch jobs: seconds between status checks while waiting for a job to finish
+BATCH_POLL_SECONDS = float(os.getenv("SMART_ATS_BATCH_POLL", "60"))
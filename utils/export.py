@@ -0,0 +1,228 @@
+"""Streaming bulk export of stored analyses to CSV, JSONL or Parquet.
+
+Rows are read from the history database a page at a time and written
+straight to disk, so memory use stays flat however many analyses are
+exported. CSV and JSONL output is split into parts of a bounded size that
+can each be offered as a download; Parquet (needs the optional `pyarrow`
+package) is written one row group at a time.
+
+Also usable from the command line for scheduled BI exports:
+
+    python -m utils.export --format csv --output exports/analyses.csv
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import time
+from dataclasses import dataclass, field
+
+from utils.config import CACHE_DIR, EXPORT_PART_BYTES
+from utils.history import history_store
+
+EXPORT_DIR = CACHE_DIR / "exports"
+
+# Rows fetched from SQLite (and written per Parquet row group) at a time
+BATCH_ROWS = 5000
+
+COLUMNS = {
+    "id": lambda record: record.id,
+    "date": lambda record: record.date,
+    "kind": lambda record: record.kind,
+    "resume_hash": lambda record: record.resume_hash,
+    "resume_name": lambda record: record.resume_name,
+    "jd_hash": lambda record: record.jd_hash,
+    "jd_title": lambda record: record.jd_title,
+    "model": lambda record: record.model,
+    "score": lambda record: record.score,
+    "missing_keywords": lambda record: "; ".join(record.missing_keywords),
+    "missing_keyword_count": lambda record: len(record.missing_keywords),
+    "summary": lambda record: record.summary,
+    "skills": lambda record: "; ".join(record.skills),
+    "latency_seconds": lambda record: round(record.latency, 3) if record.latency is not None else None,
+}
+DEFAULT_COLUMNS = ["date", "resume_name", "jd_title", "score", "missing_keywords", "model"]
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet export is optional
+    pyarrow = None
+
+FORMATS = ["CSV", "JSONL"] + (["Parquet"] if pyarrow is not None else [])
+
+
+@dataclass
+class ExportResult:
+    """Files written by an export and how many rows they hold"""
+    rows: int = 0
+    parts: list = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return sum(part.stat().st_size for part in self.parts)
+
+
+def iter_records(store=history_store, resume_hash: str = None, jd_hash: str = None, limit: int = None):
+    """Every matching stored analysis, newest first, fetched in batches"""
+    before = None
+    produced = 0
+    while limit is None or produced < limit:
+        batch = store.page(before=before, limit=BATCH_ROWS, resume_hash=resume_hash, jd_hash=jd_hash)
+        for record in batch:
+            yield record
+            produced += 1
+            if produced == limit:
+                return
+        if len(batch) < BATCH_ROWS:
+            return
+        before = (batch[-1].created, batch[-1].id)
+
+
+def _csv_row(values: list) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+
+def _csv_lines(records, columns: list):
+    for record in records:
+        yield _csv_row([COLUMNS[column](record) for column in columns])
+
+
+def _jsonl_lines(records, columns: list):
+    for record in records:
+        yield json.dumps({column: COLUMNS[column](record) for column in columns}) + "\n"
+
+
+def _part_path(path, number: int):
+    return path if number == 1 else path.with_name(f"{path.stem}.part{number}{path.suffix}")
+
+
+def _write_parts(lines, path, header: str = "", part_bytes: int = EXPORT_PART_BYTES) -> ExportResult:
+    """Write lines to one or more files of at most ``part_bytes`` each, atomically"""
+    result = ExportResult()
+    header = header.encode("utf-8")
+    # The temporary file being written, until it is renamed into place
+    out, tmp_path, written = None, None, 0
+    try:
+        for line in lines:
+            data = line.encode("utf-8")
+            # A part always gets at least one row, even one larger than part_bytes
+            if out is None or (written + len(data) > part_bytes and written > len(header)):
+                if out is not None:
+                    out.close()
+                    os.replace(tmp_path, result.parts[-1])
+                    out, tmp_path = None, None
+                result.parts.append(_part_path(path, len(result.parts) + 1))
+                tmp_path = f"{result.parts[-1]}.tmp"
+                out = open(tmp_path, "wb")
+                out.write(header)
+                written = len(header)
+            out.write(data)
+            written += len(data)
+            result.rows += 1
+        if out is None:
+            result.parts.append(path)
+            tmp_path = f"{path}.tmp"
+            out = open(tmp_path, "wb")
+            out.write(header)
+        out.close()
+        os.replace(tmp_path, result.parts[-1])
+        tmp_path = None
+    except BaseException:
+        if out is not None:
+            out.close()
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return result
+
+
+def _write_parquet(records, columns: list, path) -> ExportResult:
+    result = ExportResult(parts=[path])
+    tmp_path = f"{path}.tmp"
+    writer = None
+    batch = {column: [] for column in columns}
+
+    def flush():
+        nonlocal writer
+        table = pyarrow.table(batch)
+        if writer is None:
+            writer = pyarrow.parquet.ParquetWriter(tmp_path, table.schema)
+        writer.write_table(table.cast(writer.schema))
+        for values in batch.values():
+            values.clear()
+
+    try:
+        for record in records:
+            for column in columns:
+                batch[column].append(COLUMNS[column](record))
+            result.rows += 1
+            if result.rows % BATCH_ROWS == 0:
+                flush()
+        if batch[columns[0]] or writer is None:
+            flush()
+        writer.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return result
+
+
+def export(records, columns: list, file_format: str, path=None, part_bytes: int = EXPORT_PART_BYTES) -> ExportResult:
+    """Stream records to disk in the given format and return the files written"""
+    unknown = [column for column in columns if column not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown export columns: {', '.join(unknown)}")
+    if not columns:
+        raise ValueError("Choose at least one column to export")
+
+    file_format = file_format.lower()
+    if path is None:
+        EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+        extension = {"csv": "csv", "jsonl": "jsonl", "parquet": "parquet"}[file_format]
+        path = EXPORT_DIR / f"ats_analyses_{time.strftime('%Y%m%d_%H%M%S')}.{extension}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if file_format == "parquet":
+        if pyarrow is None:
+            raise RuntimeError("Parquet export needs the pyarrow package (pip install pyarrow)")
+        return _write_parquet(records, columns, path)
+    if file_format == "csv":
+        # Every part repeats the header so each file loads on its own
+        return _write_parts(_csv_lines(records, columns), path, _csv_row(columns), part_bytes)
+    if file_format == "jsonl":
+        return _write_parts(_jsonl_lines(records, columns), path, "", part_bytes)
+    raise ValueError(f"Unsupported export format: {file_format}")
+
+
+def main():
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description="Export stored analyses for BI tools")
+    parser.add_argument("--format", choices=[name.lower() for name in FORMATS], default="csv")
+    parser.add_argument("--output", type=Path, help="Output file (default: a timestamped file in the cache dir)")
+    parser.add_argument("--columns", nargs="+", default=list(COLUMNS), choices=list(COLUMNS))
+    parser.add_argument("--resume-hash")
+    parser.add_argument("--jd-hash")
+    parser.add_argument("--part-mb", type=int, default=EXPORT_PART_BYTES // (1024 * 1024),
+                        help="Split CSV/JSONL output into files of at most this size")
+    args = parser.parse_args()
+
+    result = export(
+        iter_records(resume_hash=args.resume_hash, jd_hash=args.jd_hash),
+        args.columns, args.format, args.output, part_bytes=args.part_mb * 1024 * 1024,
+    )
+    for part in result.parts:
+        print(part)
+    print(f"{result.rows} rows, {result.size / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
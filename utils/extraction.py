@@ -0,0 +1,59 @@
+"""PDF resume extraction shared by the page and the ingestion worker.
+
+Reading the PDF, cleaning the text and parsing it into a ParsedResume has no
+Streamlit dependency, so uploads and files picked up from a watched folder
+go through exactly the same steps and share the same extraction cache.
+"""
+import io
+
+import PyPDF2 as pdf
+
+from utils.lint import document_facts, pdf_structure, save_facts
+from utils.resume_model import ParsedResume, parse_resume, resume_hash
+from utils.text_cleaning import normalize_pages
+
+
+def extract_pages(source, max_pages: int = None, on_page=None):
+    """Per-page text and basic PDF structure of a file path or file-like object
+
+    Returns (pages, structure), or (None, None) if no text could be extracted.
+    ``on_page(page_number, total_pages)`` is called after each page is read.
+    Errors from PyPDF2 are left to the caller.
+    """
+    reader = pdf.PdfReader(source)
+    pages = []
+    total_pages = min(len(reader.pages), max_pages or len(reader.pages))
+    for page_num in range(total_pages):
+        pages.append(reader.pages[page_num].extract_text() or "")
+        if on_page:
+            on_page(page_num + 1, total_pages)
+
+    if not any(page.strip() for page in pages):
+        return None, None
+    return pages, pdf_structure(reader)
+
+
+def build_resume(pages: list, structure: dict, content_hash: str, max_pages: int = None) -> ParsedResume:
+    """Clean and parse extracted pages, caching the resume and its layout facts"""
+    # Strip repeated headers/footers, page numbers and extra whitespace
+    text, cleaning_stats = normalize_pages(pages)
+    resume = parse_resume(text, content_hash, chars_saved=cleaning_stats.chars_saved, max_pages=max_pages)
+    resume.save()
+    # Layout facts for the resume check need the raw pages, so record them now
+    save_facts(resume.cache_key, document_facts(pages, structure))
+    return resume
+
+
+def load_pdf_resume(data: bytes, max_pages: int = None, on_page=None):
+    """Parsed resume for PDF bytes, extracting only on a cache miss (None if no text)
+
+    ``on_page`` is passed to extract_pages to report progress.
+    """
+    content_hash = resume_hash(data)
+    resume = ParsedResume.load(content_hash, max_pages)
+    if resume is not None:
+        return resume
+    pages, structure = extract_pages(io.BytesIO(data), max_pages, on_page)
+    if not pages:
+        return None
+    return build_resume(pages, structure, content_hash, max_pages)
@@ -0,0 +1,208 @@
+"""Local stand-in for the Gemini client used by benchmarks and load tests.
+
+It mimics ``client.models.generate_content`` closely enough for the app:
+responses are JSON in the shape our prompts ask for (full, compact or
+score-only), scored by simple keyword overlap, with configurable latency per
+call, per input token and per output token, error and malformed-output rates,
+and max_output_tokens truncation.
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from utils.local_scorer import keyword_counts
+from utils.results import COMPACT_KEYWORDS
+from utils.text_cleaning import CHARS_PER_TOKEN, estimate_tokens
+
+CANDIDATE_RE = re.compile(r"^### Candidate (\S+)$", re.MULTILINE)
+NUMBERED_JD_RE = re.compile(r"^Job Description (\d+):$", re.MULTILINE)
+
+# Compact prompts show these answer formats (see utils/prompts.py)
+COMPACT_MARKER = '"m": 78, "k":'
+SCORE_ONLY_MARKER = '"m": 78}'
+COMPACT_SUMMARY_WORDS = 40
+
+
+def _terms(text: str) -> set:
+    return set(keyword_counts(text))
+
+
+def _between(text: str, start: str, end: str = None) -> str:
+    _, _, rest = text.partition(start)
+    if end and end in rest:
+        rest = rest[:rest.index(end)]
+    return rest.strip()
+
+
+def fake_analysis(resume: str, jd: str) -> dict:
+    """Score a resume against a JD by keyword overlap, in the app's result format"""
+    jd_terms = _terms(jd)
+    resume_terms = _terms(resume)
+    matched = jd_terms & resume_terms
+    score = round(100 * len(matched) / len(jd_terms)) if jd_terms else 0
+    missing = sorted(jd_terms - resume_terms)
+    strengths = ", ".join(sorted(matched)[:5]) or "general experience"
+    # About as long as the summaries Gemini writes for the full prompt
+    return {
+        "JD Match": f"{score}%",
+        "MissingKeywords": missing[:12],
+        "Profile Summary": f"Candidate covering {len(matched)} of {len(jd_terms)} key requirements "
+                           f"including {strengths}. Brings hands-on delivery experience and a track "
+                           f"record of applying {strengths} to production systems, collaborating "
+                           f"across teams and owning outcomes end to end. Would strengthen the "
+                           f"application by evidencing {', '.join(missing[:4]) or 'measurable impact'} "
+                           f"with concrete, quantified achievements tailored to this role.",
+    }
+
+
+def _compact(answer: dict, score_only: bool) -> dict:
+    """An answer in the short-key format of the compact and score-only prompts"""
+    compact = {key: value for key, value in answer.items() if key in ("id", "JD")}
+    compact["m"] = int(answer["JD Match"].rstrip("%"))
+    if not score_only:
+        compact["k"] = answer["MissingKeywords"][:COMPACT_KEYWORDS]
+        compact["s"] = " ".join(answer["Profile Summary"].split()[:COMPACT_SUMMARY_WORDS])
+    return compact
+
+
+def _max_output_tokens(config):
+    if isinstance(config, dict):
+        return config.get("max_output_tokens")
+    return getattr(config, "max_output_tokens", None)
+
+
+def _timeout(config):
+    """The request's HTTP timeout in seconds, or None"""
+    options = config.get("http_options") if isinstance(config, dict) else getattr(config, "http_options", None)
+    if isinstance(options, dict):
+        timeout = options.get("timeout")
+    else:
+        timeout = getattr(options, "timeout", None)
+    return timeout / 1000 if timeout else None
+
+
+def _sleep(seconds: float, config):
+    # Like an HTTP client, give up once the request's timeout has passed
+    timeout = _timeout(config)
+    if timeout is not None and seconds > timeout:
+        time.sleep(timeout)
+        raise TimeoutError(f"The request timed out after {timeout:.1f}s")
+    time.sleep(seconds)
+
+
+class _FakeModels:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def generate_content(self, model, contents, config=None):
+        return self._owner.generate_content(model, contents, config)
+
+
+class FakeGeminiClient:
+    """Drop-in replacement for google.genai.Client in tests and benchmarks"""
+
+    def __init__(self, latency: float = 0.5, latency_per_1k_tokens: float = 0.0,
+                 error_rate: float = 0.0, malformed_rate: float = 0.0, seed: int = 0,
+                 latency_per_1k_output_tokens: float = 0.0):
+        self.latency = latency
+        self.latency_per_1k_tokens = latency_per_1k_tokens
+        self.latency_per_1k_output_tokens = latency_per_1k_output_tokens
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.models = _FakeModels(self)
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "FakeGeminiClient":
+        return cls(
+            latency=float(os.getenv("SMART_ATS_FAKE_LATENCY", "0.5")),
+            latency_per_1k_tokens=float(os.getenv("SMART_ATS_FAKE_LATENCY_PER_1K_TOKENS", "0.0")),
+            error_rate=float(os.getenv("SMART_ATS_FAKE_ERROR_RATE", "0.0")),
+            malformed_rate=float(os.getenv("SMART_ATS_FAKE_MALFORMED_RATE", "0.0")),
+            latency_per_1k_output_tokens=float(os.getenv("SMART_ATS_FAKE_LATENCY_PER_1K_OUTPUT_TOKENS", "0.0")),
+        )
+
+    def _roll(self, rate: float) -> bool:
+        with self._lock:
+            return rate > 0 and self._random.random() < rate
+
+    def generate_content(self, model, contents, config=None):
+        with self._lock:
+            self.calls += 1
+
+        prompt = contents if isinstance(contents, str) else str(contents)
+        prompt_tokens = estimate_tokens(prompt)
+
+        if self._roll(self.error_rate):
+            _sleep(self.latency + self.latency_per_1k_tokens * prompt_tokens / 1000, config)
+            raise RuntimeError(f"429 RESOURCE_EXHAUSTED: fake quota error for {model}")
+
+        answer = self._answer(prompt)
+        if COMPACT_MARKER in prompt or SCORE_ONLY_MARKER in prompt:
+            score_only = COMPACT_MARKER not in prompt
+            answer = ([_compact(item, score_only) for item in answer] if isinstance(answer, list)
+                      else _compact(answer, score_only))
+        text = json.dumps(answer)
+        if self._roll(self.malformed_rate):
+            text = text[: len(text) // 2]
+        # Like the real API, generation simply stops at the output-token cap
+        max_output_tokens = _max_output_tokens(config)
+        if max_output_tokens:
+            text = text[: max_output_tokens * CHARS_PER_TOKEN]
+
+        output_tokens = estimate_tokens(text)
+        _sleep(self.latency + self.latency_per_1k_tokens * prompt_tokens / 1000
+               + self.latency_per_1k_output_tokens * output_tokens / 1000, config)
+        return SimpleNamespace(
+            text=text,
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens,
+            ),
+        )
+
+    def _answer(self, prompt: str):
+        if "Previously missing keywords:" in prompt:
+            return self._section_update(prompt)
+
+        if CANDIDATE_RE.search(prompt):
+            first = CANDIDATE_RE.search(prompt)
+            jd = _between(prompt[:first.start()], "Job Description:")
+            blocks = CANDIDATE_RE.split(prompt[first.start():])[1:]
+            answers = []
+            for candidate_id, body in zip(blocks[::2], blocks[1::2]):
+                body = body.split("Remember:")[0]
+                answers.append({"id": candidate_id, **fake_analysis(body, jd)})
+            return answers
+
+        numbered = list(NUMBERED_JD_RE.finditer(prompt))
+        if numbered:
+            resume = _between(prompt[:numbered[0].start()], "Resume:")
+            answers = []
+            for index, match in enumerate(numbered):
+                end = numbered[index + 1].start() if index + 1 < len(numbered) else len(prompt)
+                jd = prompt[match.end():end].split("Remember:")[0]
+                answers.append({"JD": int(match.group(1)), **fake_analysis(resume, jd)})
+            return answers
+
+        resume = _between(prompt, "Resume:", "Job Description:")
+        jd = _between(prompt, "Job Description:", "Remember:")
+        return fake_analysis(resume, jd)
+
+    @staticmethod
+    def _section_update(prompt: str) -> dict:
+        """Answer a section-level re-analysis: missing keywords the edited text now covers"""
+        score = re.search(r"\d+", _between(prompt, "Previous JD Match:", "\n"))
+        missing = [kw.strip() for kw in _between(prompt, "Previously missing keywords:", "\n").split(",")]
+        edits = _between(prompt, "Edited sections:", "Job Description:")
+        after = " ".join(part.partition("After:")[2] for part in edits.split("### ")).lower()
+        resolved = [kw for kw in missing if kw and kw != "none" and kw.lower() in after]
+        previous = int(score.group(0)) if score else 0
+        return {"JD Match": f"{min(100, previous + 3 * len(resolved))}%", "Resolved": resolved, "NewMissing": []}
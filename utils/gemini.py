@@ -0,0 +1,157 @@
+"""Gemini client creation and a UI-independent generate_content wrapper."""
+import os
+import time
+
+from utils.config import EXPECTED_OUTPUT_TOKENS, GEMINI_BASE_URL, RATE_LIMIT_WAIT_SECONDS, USE_FAKE_GEMINI
+from utils.text_cleaning import estimate_tokens
+from utils.usage import BudgetExceeded, UsageRecord, usage_from_response
+
+MODEL_OPTIONS = ["gemini-2.0-flash-exp", "gemini-1.5-flash", "gemini-1.5-pro"]
+DEFAULT_MODEL = MODEL_OPTIONS[0]
+FALLBACK_MODEL = "gemini-1.5-flash"
+
+RATE_LIMITED_MESSAGE = "Request rate limit reached. Please wait a minute and try again."
+TIMED_OUT_MESSAGE = "The analysis ran past its deadline and was stopped."
+# Substrings of errors that another call right away would only repeat
+QUOTA_ERROR_MARKERS = (RATE_LIMITED_MESSAGE, "token budget is exhausted", "429", "RESOURCE_EXHAUSTED")
+
+
+def create_client():
+    """Create the Gemini client (or the local fake backend when enabled)
+
+    Returns None when no API key is configured. SMART_ATS_GEMINI_BASE_URL
+    points the real client at another endpoint, such as the local batch server.
+    """
+    if USE_FAKE_GEMINI:
+        from utils.fake_gemini import FakeGeminiClient
+        return FakeGeminiClient.from_env()
+
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        return None
+
+    from google.genai import Client
+    if GEMINI_BASE_URL:
+        return Client(api_key=api_key, http_options={"base_url": GEMINI_BASE_URL})
+    return Client(api_key=api_key)
+
+
+def is_quota_error(error: str) -> bool:
+    """Whether an error from generate() is a rate-limit, quota or budget refusal"""
+    return any(marker in (error or "") for marker in QUOTA_ERROR_MARKERS)
+
+
+def _record(ledger, session_id, model_name, response, started, fallback_used=False, ok=True):
+    if ledger is None:
+        return
+    prompt_tokens, output_tokens, total_tokens = usage_from_response(response)
+    ledger.record(UsageRecord(
+        timestamp=time.time(),
+        session_id=session_id,
+        model=model_name,
+        prompt_tokens=prompt_tokens,
+        output_tokens=output_tokens,
+        total_tokens=total_tokens,
+        latency=time.perf_counter() - started,
+        fallback_used=fallback_used,
+        ok=ok,
+    ))
+
+
+def _output_estimate(config) -> int:
+    # A max_output_tokens cap below the usual response size is all the output the call can use
+    output_cap = config.get("max_output_tokens") if isinstance(config, dict) else None
+    return min(output_cap or EXPECTED_OUTPUT_TOKENS, EXPECTED_OUTPUT_TOKENS)
+
+
+def request_tokens(prompt: str, config=None) -> int:
+    """Estimated prompt plus output tokens of a call, as charged to the TPM bucket"""
+    return estimate_tokens(prompt) + _output_estimate(config)
+
+
+def _remaining(deadline) -> float:
+    return None if deadline is None else deadline - time.time()
+
+
+def _with_timeout(config, deadline):
+    # generate_content takes a per-request HTTP timeout in milliseconds
+    if deadline is None:
+        return config
+    return {**(config or {}), "http_options": {"timeout": max(1, int(_remaining(deadline) * 1000))}}
+
+
+def _acquire(rate_limiter, tokens, deadline) -> bool:
+    if rate_limiter is None:
+        return True
+    wait = RATE_LIMIT_WAIT_SECONDS if deadline is None else min(RATE_LIMIT_WAIT_SECONDS, _remaining(deadline))
+    return wait > 0 and rate_limiter.acquire(wait, tokens=tokens)
+
+
+def generate(client, prompt: str, model_name: str = DEFAULT_MODEL, config=None, on_fallback=None,
+             ledger=None, session_id: str = "default", rate_limiter=None, deadline: float = None):
+    """Call generate_content, retrying once on the fallback model for 2.0 models
+
+    Returns (text, error) like the page-level get_gemini_response. When a
+    usage ledger is given, the call's estimated tokens are reserved against
+    the budgets before it is made, every attempt is recorded against
+    ``session_id``, and the reservation is released once the actual usage
+    is in. When a rate limiter is given, every attempt waits for a permit
+    first. ``deadline`` (a time.time() value) bounds the permit wait and
+    becomes the HTTP timeout of each attempt, so the call stops once it
+    passes instead of running on after its caller gave up.
+    """
+    if client is None:
+        return None, "Client not initialized. Check API key setup."
+
+    if ledger is None:
+        return _generate(client, prompt, model_name, config, on_fallback, None, session_id, rate_limiter, deadline)
+    try:
+        reservation = ledger.check_budget(session_id, estimate_tokens(prompt), _output_estimate(config))
+    except BudgetExceeded as e:
+        return None, str(e)
+    try:
+        return _generate(client, prompt, model_name, config, on_fallback, ledger, session_id, rate_limiter,
+                         deadline)
+    finally:
+        ledger.release(reservation)
+
+
+def _generate(client, prompt, model_name, config, on_fallback, ledger, session_id, rate_limiter, deadline):
+    tokens = request_tokens(prompt, config)
+    if not _acquire(rate_limiter, tokens, deadline):
+        timed_out = deadline is not None and _remaining(deadline) <= 0
+        return None, TIMED_OUT_MESSAGE if timed_out else RATE_LIMITED_MESSAGE
+
+    started = time.perf_counter()
+    try:
+        response = client.models.generate_content(
+            model=model_name,
+            contents=prompt,
+            config=_with_timeout(config, deadline)
+        )
+        _record(ledger, session_id, model_name, response, started)
+        return response.text, None
+    except Exception as e:
+        error_msg = str(e)
+        _record(ledger, session_id, model_name, None, started, ok=False)
+        # Try fallback model if the first one fails
+        if "2.0" in model_name:
+            if deadline is not None and _remaining(deadline) <= 0:
+                return None, f"{error_msg}. Fallback skipped: {TIMED_OUT_MESSAGE}"
+            if not _acquire(rate_limiter, tokens, deadline):
+                return None, f"{error_msg}. Fallback skipped: {RATE_LIMITED_MESSAGE}"
+            started = time.perf_counter()
+            try:
+                if on_fallback:
+                    on_fallback()
+                response = client.models.generate_content(
+                    model=FALLBACK_MODEL,
+                    contents=prompt,
+                    config=_with_timeout(config, deadline)
+                )
+                _record(ledger, session_id, FALLBACK_MODEL, response, started, fallback_used=True)
+                return response.text, None
+            except Exception as e2:
+                _record(ledger, session_id, FALLBACK_MODEL, None, started, fallback_used=True, ok=False)
+                return None, f"Both models failed. Error: {str(e2)}"
+        return None, error_msg
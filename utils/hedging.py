@@ -0,0 +1,111 @@
+"""Hedged Gemini requests to cut tail latency.
+
+If the primary call has not returned after an adaptive delay (the model's
+running p95 latency), a duplicate is sent and the first successful result
+wins. Hedges are budgeted: they never exceed a fixed share of calls and are
+only sent when the priority scheduler has a spare permit right now, charged
+with the request's estimated tokens and never ahead of a waiting call. Only
+interactive calls are hedged; bulk work gains nothing from a shorter tail.
+
+The synchronous Gemini client cannot abort an HTTP request that is already
+running, so "cancelling" the loser means dropping its result; a hedge that has
+not started yet is cancelled outright.
+"""
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utils.config import HEDGE_MAX_RATIO, HEDGE_MIN_DELAY_SECONDS
+from utils.gemini import FALLBACK_MODEL
+from utils.routing import PRIOR_LATENCY
+from utils.scheduler import INTERACTIVE, gemini_scheduler
+from utils.usage import usage_ledger
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="gemini-hedge")
+
+
+def hedge_model_for(model_name: str) -> str:
+    """Hedge 2.0 models on the stable fallback model, others on themselves"""
+    return FALLBACK_MODEL if "2.0" in model_name else model_name
+
+
+class Hedger:
+    """Run a call, duplicating it once if it is slower than usual"""
+
+    def __init__(self, ledger, scheduler, max_ratio: float = HEDGE_MAX_RATIO,
+                 min_delay: float = HEDGE_MIN_DELAY_SECONDS, percentile: float = 0.95):
+        self.ledger = ledger
+        self.scheduler = scheduler
+        self.max_ratio = max_ratio
+        self.min_delay = min_delay
+        self.percentile = percentile
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.skipped = 0
+
+    def delay_for(self, model_name: str) -> float:
+        """Seconds to wait on the primary before hedging"""
+        observed = self.ledger.latency_percentile(model_name, self.percentile)
+        if observed is None:
+            observed = 2 * PRIOR_LATENCY.get(model_name, 5.0)
+        return max(self.min_delay, observed)
+
+    def _may_hedge(self, tokens: int) -> bool:
+        with self._lock:
+            within_budget = self.hedges + 1 <= self.max_ratio * self.calls
+        if within_budget and self.scheduler.try_acquire(INTERACTIVE, tokens):
+            with self._lock:
+                self.hedges += 1
+            return True
+        with self._lock:
+            self.skipped += 1
+        return False
+
+    def call(self, attempt, model_name: str, priority: str = INTERACTIVE, tokens: int = 0):
+        """Run ``attempt(model_name)`` (returning (text, error)) with hedging
+
+        ``tokens`` is the request's estimated size, charged for the hedge's
+        permit. The hedge attempt must not take another rate-limiter permit
+        itself: the hedger already took one for it. Calls of other priority
+        classes run unhedged.
+        """
+        if priority != INTERACTIVE:
+            return attempt(model_name, True)
+        with self._lock:
+            self.calls += 1
+
+        primary = _executor.submit(attempt, model_name, True)
+        done, _ = wait([primary], timeout=self.delay_for(model_name))
+        if done or not self._may_hedge(tokens):
+            return primary.result()
+
+        hedge = _executor.submit(attempt, hedge_model_for(model_name), False)
+        pending = {primary, hedge}
+        result = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result[1] is None:
+                    for loser in pending:
+                        loser.cancel()
+                    if future is hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return result
+        # Both failed: report the last error
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "skipped": self.skipped,
+            }
+
+
+# Shared by every Streamlit session in this process
+hedger = Hedger(usage_ledger, gemini_scheduler)
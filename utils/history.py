@@ -0,0 +1,218 @@
+"""Persistent analysis history and user preferences in an embedded SQLite file.
+
+Every finished analysis is stored with its resume and JD hashes, score,
+keywords, model and timing, so past results can be looked up instead of
+re-run and survive a browser refresh. Pages are fetched with keyset
+pagination over indexed columns, which stays fast with millions of rows
+because no query has to skip or count earlier rows. Preferences are kept
+per profile: the signed-in user, or else one browser's link.
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from utils.config import CACHE_DIR
+from utils.gemini import DEFAULT_MODEL
+
+HISTORY_PATH = CACHE_DIR / "history.sqlite3"
+PAGE_SIZE = 25
+
+DEFAULT_PREFERENCES = {
+    "default_model": DEFAULT_MODEL,
+    "max_pages": 5,
+    "show_progress": True,
+    "export_format": "Both",
+    "include_timestamp": True,
+}
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS analyses (
+        id INTEGER PRIMARY KEY,
+        created REAL NOT NULL,
+        kind TEXT NOT NULL,
+        resume_hash TEXT NOT NULL,
+        resume_name TEXT,
+        jd_hash TEXT NOT NULL,
+        jd_title TEXT,
+        model TEXT,
+        score INTEGER,
+        missing_keywords TEXT,
+        summary TEXT,
+        skills TEXT,
+        latency REAL
+    )""",
+    # Each index ends in created so filtered pages are read in order straight from the index
+    "CREATE INDEX IF NOT EXISTS analyses_created ON analyses (created)",
+    "CREATE INDEX IF NOT EXISTS analyses_jd ON analyses (jd_hash, created)",
+    "CREATE INDEX IF NOT EXISTS analyses_resume ON analyses (resume_hash, created)",
+    "CREATE TABLE IF NOT EXISTS preferences (profile TEXT, name TEXT, value TEXT, PRIMARY KEY (profile, name))",
+)
+
+_COLUMNS = ("id", "created", "kind", "resume_hash", "resume_name", "jd_hash", "jd_title", "model",
+            "score", "missing_keywords", "summary", "skills", "latency")
+
+
+@dataclass
+class AnalysisRecord:
+    """One stored analysis of a resume against a job description"""
+    kind: str
+    resume_hash: str
+    jd_hash: str
+    score: int = None
+    missing_keywords: list = field(default_factory=list)
+    summary: str = ""
+    skills: list = field(default_factory=list)
+    model: str = ""
+    resume_name: str = ""
+    jd_title: str = ""
+    latency: float = None
+    created: float = None
+    id: int = None
+
+    @classmethod
+    def from_row(cls, row) -> "AnalysisRecord":
+        data = dict(zip(_COLUMNS, row))
+        data["missing_keywords"] = json.loads(data["missing_keywords"] or "[]")
+        data["skills"] = json.loads(data["skills"] or "[]")
+        return cls(**data)
+
+    @property
+    def date(self) -> str:
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.created))
+
+    def result(self) -> dict:
+        """The record in the shape of a parsed Gemini response"""
+        return {
+            "JD Match": f"{self.score}%" if self.score is not None else "N/A",
+            "MissingKeywords": self.missing_keywords,
+            "Profile Summary": self.summary,
+        }
+
+
+class HistoryStore:
+    """Analyses and preferences in one SQLite file, shared by every process that opens it"""
+
+    def __init__(self, path=HISTORY_PATH):
+        self.path = path
+        self._local = threading.local()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = self._connection()
+        for statement in _SCHEMA:
+            db.execute(statement)
+
+    def _connection(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def record(self, record: AnalysisRecord) -> int:
+        """Store an analysis and return its id"""
+        return self.record_many([record])[0]
+
+    def record_many(self, records: list) -> list:
+        """Store several analyses in one transaction (used for comparisons and screening)"""
+        db = self._connection()
+        now = time.time()
+        ids = []
+        db.execute("BEGIN")
+        try:
+            for record in records:
+                record.created = record.created or now
+                cursor = db.execute(
+                    f"INSERT INTO analyses ({', '.join(_COLUMNS[1:])}) VALUES ({', '.join('?' * 12)})",
+                    (record.created, record.kind, record.resume_hash, record.resume_name, record.jd_hash,
+                     record.jd_title, record.model, record.score, json.dumps(record.missing_keywords),
+                     record.summary, json.dumps(record.skills), record.latency),
+                )
+                record.id = cursor.lastrowid
+                ids.append(record.id)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return ids
+
+    def page(self, before: tuple = None, limit: int = PAGE_SIZE, resume_hash: str = None,
+             jd_hash: str = None) -> list:
+        """Newest-first page of analyses, optionally for one resume or JD
+
+        ``before`` is the (created, id) of the last row of the previous page;
+        pass it to get the next page.
+        """
+        clauses, params = [], []
+        if resume_hash:
+            clauses.append("resume_hash = ?")
+            params.append(resume_hash)
+        if jd_hash:
+            clauses.append("jd_hash = ?")
+            params.append(jd_hash)
+        if before:
+            clauses.append("(created, id) < (?, ?)")
+            params.extend(before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connection().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM analyses {where} ORDER BY created DESC, id DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        return [AnalysisRecord.from_row(row) for row in rows]
+
+    def latest(self, resume_hash: str, jd_hash: str):
+        """Most recent analysis of this resume against this JD, or None"""
+        rows = self.page(limit=1, resume_hash=resume_hash, jd_hash=jd_hash)
+        return rows[0] if rows else None
+
+    def resumes(self, jd_hash: str = None) -> list:
+        """(resume_hash, resume_name) of every resume analyzed so far, optionally against one JD"""
+        where, params = ("WHERE jd_hash = ?", (jd_hash,)) if jd_hash else ("", ())
+        return self._connection().execute(
+            f"SELECT resume_hash, MAX(resume_name) FROM analyses {where} GROUP BY resume_hash", params
+        ).fetchall()
+
+    def get(self, record_id: int):
+        row = self._connection().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM analyses WHERE id = ?", (record_id,)
+        ).fetchone()
+        return AnalysisRecord.from_row(row) if row else None
+
+    def preferences(self, profile: str = "default") -> dict:
+        """Saved preferences merged over the defaults"""
+        rows = self._connection().execute(
+            "SELECT name, value FROM preferences WHERE profile = ?", (profile,)
+        ).fetchall()
+        return {**DEFAULT_PREFERENCES, **{name: json.loads(value) for name, value in rows}}
+
+    def save_preferences(self, values: dict, profile: str = "default"):
+        self._connection().executemany(
+            "INSERT OR REPLACE INTO preferences (profile, name, value) VALUES (?, ?, ?)",
+            [(profile, name, json.dumps(value)) for name, value in values.items()],
+        )
+
+    def reset_preferences(self, profile: str = "default"):
+        self._connection().execute("DELETE FROM preferences WHERE profile = ?", (profile,))
+
+
+def preferences_profile(user, query_params, session_state) -> str:
+    """Preferences profile of the viewer: the signed-in user, else a random id kept in the page URL
+
+    Takes st.user, st.query_params and st.session_state. The URL id survives
+    refreshes and bookmarks, and session state carries it across pages,
+    which drop query parameters on navigation.
+    """
+    if user.get("is_logged_in") and user.get("email"):
+        return f"user:{user.get('email')}"
+    profile = query_params.get("profile") or session_state.get("preferences_profile") or uuid.uuid4().hex
+    session_state["preferences_profile"] = profile
+    if query_params.get("profile") != profile:
+        query_params["profile"] = profile
+    return f"browser:{profile}"
+
+
+# Shared by every Streamlit session in this process
+history_store = HistoryStore()
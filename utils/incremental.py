@@ -0,0 +1,143 @@
+"""Section-level re-analysis of an edited resume against the same JD.
+
+After each analysis a snapshot of the resume's sections and the result is
+kept per session, job description and candidate for SNAPSHOT_TTL_SECONDS.
+When a new version of the resume arrives, its sections are diffed against
+the snapshot; if only a few changed, Gemini is sent just those sections (old
+and new text) with the previous score and missing keywords, and the answer
+is merged into the previous result. Prompt and output size then follow the
+size of the edit instead of the resume.
+"""
+import hashlib
+import json
+from dataclasses import dataclass, field
+
+from utils.config import SNAPSHOT_TTL_SECONDS
+from utils.lint import EMAIL_RE
+from utils.prompts import section_update_prompt
+from utils.resume_model import SECTION_NAMES
+from utils.results import parse_match_score
+from utils.shared_state import state_store
+
+# Above this share of the resume text changed, a full analysis is cheaper and more reliable
+MAX_CHANGED_SHARE = 0.5
+
+
+def _same(old: str, new: str) -> bool:
+    return " ".join((old or "").split()) == " ".join((new or "").split())
+
+
+def _keyword_list(value):
+    """``value`` if it is a list of strings, else None"""
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return value
+    return None
+
+
+@dataclass
+class ResumeSnapshot:
+    """Sections of an analyzed resume version and the result they produced"""
+    resume_hash: str
+    sections: dict
+    result: dict
+
+
+@dataclass
+class SectionUpdate:
+    """What changed between a snapshot and a new resume version"""
+    previous: ResumeSnapshot
+    changed: list = field(default_factory=list)
+    changed_chars: int = 0
+    total_chars: int = 0
+
+    @property
+    def unchanged(self) -> bool:
+        return not self.changed
+
+    @property
+    def worthwhile(self) -> bool:
+        """Whether a section-level update should replace a full analysis"""
+        return bool(self.changed) and self.changed_chars <= MAX_CHANGED_SHARE * self.total_chars
+
+    def prompt(self, resume, jd: str) -> str:
+        """Prompt carrying only the changed sections, old and new"""
+        changes = []
+        for name in self.changed:
+            old = self.previous.sections.get(name) or "(section did not exist)"
+            new = resume.sections.get(name) or "(section removed)"
+            changes.append(f"### {name.upper()}\nBefore:\n{old}\n\nAfter:\n{new}")
+        return section_update_prompt.format(
+            score=self.previous.result.get("JD Match", "N/A"),
+            missing=", ".join(self.previous.result.get("MissingKeywords", [])) or "none",
+            changes="\n\n".join(changes),
+            jd=jd,
+        )
+
+    def merge(self, update: dict) -> dict:
+        """Previous result with the updated score and keyword list applied
+
+        Raises ValueError if the answer is not an object with "Resolved" and
+        "NewMissing" keyword lists; the caller should run a full analysis.
+        """
+        if not isinstance(update, dict):
+            raise ValueError("Section update is not a JSON object")
+        resolved_keywords = _keyword_list(update.get("Resolved", []))
+        new_missing = _keyword_list(update.get("NewMissing", []))
+        if resolved_keywords is None or new_missing is None:
+            raise ValueError("Section update has no valid Resolved/NewMissing keyword lists")
+
+        resolved = {keyword.lower() for keyword in resolved_keywords}
+        missing = [keyword for keyword in _keyword_list(self.previous.result.get("MissingKeywords", [])) or []
+                   if keyword.lower() not in resolved]
+        known = {keyword.lower() for keyword in missing}
+        missing += [keyword for keyword in new_missing if keyword.lower() not in known]
+
+        score = parse_match_score(update.get("JD Match"))
+        return {
+            **self.previous.result,
+            "JD Match": f"{max(0, min(100, score))}%" if score is not None else self.previous.result.get("JD Match"),
+            "MissingKeywords": missing,
+        }
+
+
+def plan_update(previous: ResumeSnapshot, resume) -> SectionUpdate:
+    """Diff a new resume version against the last analyzed one, section by section"""
+    plan = SectionUpdate(previous)
+    for name in SECTION_NAMES:
+        old, new = previous.sections.get(name, ""), resume.sections.get(name, "")
+        plan.total_chars += len(new)
+        if not _same(old, new):
+            plan.changed.append(name)
+            plan.changed_chars += len(old) + len(new)
+    return plan
+
+
+def resume_identity(resume, resume_name: str) -> str:
+    """Id shared by the versions of one candidate's resume: its email address, else the file name
+
+    The rest of the header stays out of the id, so edits to the name or
+    phone line are diffed like any other section.
+    """
+    email = EMAIL_RE.search(resume.sections.get("header", "")) or EMAIL_RE.search(resume.text)
+    basis = email.group(0).lower() if email else resume_name
+    return hashlib.sha256(basis.encode("utf-8")).hexdigest()[:16]
+
+
+def snapshot_key(session_id: str, jd_key: str, identity: str) -> str:
+    """Snapshots are private to a session, so other recruiters' uploads never match"""
+    return f"{session_id}:{jd_key}:{identity}"
+
+
+def save_snapshot(key: str, snapshot: ResumeSnapshot, store=None):
+    (store or state_store).set("resume_snapshots", key, json.dumps(snapshot.__dict__), ttl=SNAPSHOT_TTL_SECONDS)
+
+
+def load_snapshot(key: str, store=None):
+    """The last analyzed version stored under this key, or None"""
+    data = (store or state_store).get("resume_snapshots", key)
+    if data is None:
+        return None
+    try:
+        return ResumeSnapshot(**json.loads(data))
+    except (ValueError, TypeError):
+        return None
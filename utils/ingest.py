@@ -0,0 +1,255 @@
+"""Watch-folder ingestion: analyze every PDF dropped into a directory.
+
+A long-running worker scans the directory, hashes new or modified PDFs and
+keeps a manifest of what it has finished, so only new or changed files are
+processed and a restarted worker picks up where it stopped. Files go through
+the same extraction, cache, budget and rate-limit pipeline as uploads on the
+Resume Analyzer page, a bounded number at a time. Each result is written
+atomically next to the manifest and recorded in the analysis history.
+
+    python -m utils.ingest --watch inbox/ --jd job_description.txt
+"""
+import argparse
+import json
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from utils.analysis import request_analysis
+from utils.config import INGEST_POLL_SECONDS, INGEST_WORKERS, MAX_JD_CHARS
+from utils.extraction import load_pdf_resume
+from utils.gemini import DEFAULT_MODEL, MODEL_OPTIONS, create_client, is_quota_error
+from utils.history import AnalysisRecord, history_store
+from utils.near_duplicate import jd_hash
+from utils.prompts import input_prompt
+from utils.resume_model import resume_hash
+from utils.results import parse_json_response, parse_match_score
+from utils.routing import AUTO_MODEL, model_router
+from utils.scheduler import BACKGROUND
+
+MANIFEST_NAME = "manifest.json"
+
+# Files modified more recently than this may still be being copied in
+SETTLE_SECONDS = 2.0
+
+# Failed files are retried on later scans up to this many times, or when they change
+MAX_ATTEMPTS = 3
+
+DONE = "done"
+FAILED = "failed"
+# Refused for quota, rate limit or budget: retried on the next scan without using up an attempt
+DEFERRED = "deferred"
+
+
+def write_atomic(path: Path, text: str):
+    """Replace a file in one step so readers never see a partial write"""
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        out.write(text)
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp_path, path)
+
+
+class Manifest:
+    """Per-file ingestion state, keyed by path relative to the watched folder
+
+    Each entry holds the file's size and mtime (to skip unchanged files
+    without reading them), its content hash, the JD hash it was analyzed
+    against, its status and the result file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            self.entries = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            self.entries = {}
+
+    def get(self, name: str) -> dict:
+        with self._lock:
+            return dict(self.entries.get(name, {}))
+
+    def update(self, name: str, **values):
+        """Merge values into a file's entry and save the manifest"""
+        with self._lock:
+            self.entries[name] = {**self.entries.get(name, {}), **values}
+            write_atomic(self.path, json.dumps(self.entries, indent=1, sort_keys=True))
+
+
+class IngestWorker:
+    """Analyze new and changed PDFs in ``watch_dir`` against one job description
+
+    With ``model_name`` set to "auto", each file is routed to a model the same
+    way the page routes uploads.
+    """
+
+    def __init__(self, client, watch_dir: Path, jd_text: str, output_dir: Path = None,
+                 model_name: str = DEFAULT_MODEL, workers: int = INGEST_WORKERS, max_pages: int = None):
+        self.client = client
+        self.watch_dir = watch_dir
+        self.jd_text = jd_text[:MAX_JD_CHARS]
+        self.jd_hash = jd_hash(self.jd_text)
+        self.output_dir = output_dir or watch_dir / "results"
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.model_name = model_name
+        self.workers = workers
+        self.max_pages = max_pages
+        self.manifest = Manifest(self.output_dir / MANIFEST_NAME)
+        self.stopping = threading.Event()
+
+    def pending(self) -> list:
+        """PDFs that are new, changed, deferred, or failed fewer than MAX_ATTEMPTS times"""
+        found = []
+        now = time.time()
+        for path in sorted(self.watch_dir.rglob("*")):
+            if path.suffix.lower() != ".pdf" or not path.is_file() or self.output_dir in path.parents:
+                continue
+            stat = path.stat()
+            if now - stat.st_mtime < SETTLE_SECONDS:
+                continue
+            entry = self.manifest.get(str(path.relative_to(self.watch_dir)))
+            unchanged = (entry.get("size"), entry.get("mtime")) == (stat.st_size, stat.st_mtime)
+            if unchanged and entry.get("jd_hash") == self.jd_hash:
+                if entry.get("status") == DONE or entry.get("attempts", 0) >= MAX_ATTEMPTS:
+                    continue
+            found.append(path)
+        return found
+
+    def process(self, path: Path) -> str:
+        """Extract, analyze and store one PDF; returns its new status"""
+        name = str(path.relative_to(self.watch_dir))
+        stat = path.stat()
+        data = path.read_bytes()
+        content_hash = resume_hash(data)
+        entry = self.manifest.get(name)
+
+        # Touched (or copied over) without a content change: nothing to re-analyze
+        if (entry.get("status") == DONE and entry.get("content_hash") == content_hash
+                and entry.get("jd_hash") == self.jd_hash):
+            self.manifest.update(name, size=stat.st_size, mtime=stat.st_mtime)
+            return DONE
+
+        previous_attempts = entry.get("attempts", 0) if entry.get("content_hash") == content_hash else 0
+        started = time.time()
+        model_name = self.model_name
+        try:
+            resume = load_pdf_resume(data, self.max_pages)
+            if resume is None:
+                raise ValueError("no extractable text")
+            prompt = input_prompt.format(text=resume.prompt_text(), jd=self.jd_text)
+            if model_name == AUTO_MODEL:
+                model_name = model_router.route(prompt).model
+            response, error, _ = request_analysis(
+                self.client, prompt, model_name, session_id="ingest", priority=BACKGROUND
+            )
+            if error and is_quota_error(error):
+                # Says nothing about the file: interactive calls may just be holding the reserve
+                self.manifest.update(name, size=stat.st_size, mtime=stat.st_mtime, content_hash=content_hash,
+                                     jd_hash=self.jd_hash, status=DEFERRED, error=error,
+                                     attempts=previous_attempts)
+                return DEFERRED
+            if error:
+                raise RuntimeError(error)
+            result = parse_json_response(response)
+        except Exception as e:
+            self.manifest.update(name, size=stat.st_size, mtime=stat.st_mtime, content_hash=content_hash,
+                                 jd_hash=self.jd_hash, status=FAILED, error=str(e),
+                                 attempts=previous_attempts + 1)
+            return FAILED
+
+        result_path = self.output_dir / f"{path.stem}.{content_hash[:12]}.json"
+        write_atomic(result_path, json.dumps({
+            "file": name,
+            "resume_id": content_hash,
+            "jd_id": self.jd_hash,
+            "model": model_name,
+            "analyzed": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "result": result,
+        }, indent=2))
+        history_store.record(AnalysisRecord(
+            kind="ingest",
+            resume_hash=content_hash,
+            resume_name=path.name,
+            jd_hash=self.jd_hash,
+            jd_title=self.jd_text.strip().splitlines()[0][:60],
+            model=model_name,
+            score=parse_match_score(result.get("JD Match")),
+            missing_keywords=result.get("MissingKeywords", []),
+            summary=result.get("Profile Summary", ""),
+            skills=resume.skills,
+            latency=time.time() - started,
+        ))
+        # The manifest is updated last, so a crash before this point only repeats this file
+        self.manifest.update(name, size=stat.st_size, mtime=stat.st_mtime, content_hash=content_hash,
+                             jd_hash=self.jd_hash, status=DONE, error=None, attempts=previous_attempts + 1,
+                             result=result_path.name)
+        return DONE
+
+    def scan_once(self) -> dict:
+        """Process everything pending with at most ``workers`` files in flight"""
+        counts = {DONE: 0, FAILED: 0, DEFERRED: 0}
+        paths = self.pending()
+        if not paths:
+            return counts
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest") as executor:
+            for path, status in zip(paths, executor.map(self._process_unless_stopping, paths)):
+                if status:
+                    counts[status] += 1
+                    print(f"{status:>8}  {path.relative_to(self.watch_dir)}", flush=True)
+        return counts
+
+    def _process_unless_stopping(self, path: Path):
+        # Files still queued when a stop is requested are left for the next run
+        return None if self.stopping.is_set() else self.process(path)
+
+    def run(self, interval: float = INGEST_POLL_SECONDS):
+        """Scan until stop() is called"""
+        while not self.stopping.is_set():
+            self.scan_once()
+            self.stopping.wait(interval)
+
+    def stop(self):
+        self.stopping.set()
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Analyze every PDF resume dropped into a folder")
+    parser.add_argument("--watch", type=Path, required=True, help="Folder to watch for PDF resumes")
+    parser.add_argument("--jd", type=Path, required=True, help="Text file with the job description")
+    parser.add_argument("--output", type=Path, help="Where results and the manifest go (default: WATCH/results)")
+    parser.add_argument("--model", default=DEFAULT_MODEL, choices=MODEL_OPTIONS + [AUTO_MODEL],
+                        help="Gemini model, or \"auto\" to route each file")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS)
+    parser.add_argument("--interval", type=float, default=INGEST_POLL_SECONDS, help="Seconds between scans")
+    parser.add_argument("--max-pages", type=int)
+    parser.add_argument("--once", action="store_true", help="Process what is there now and exit")
+    args = parser.parse_args()
+
+    client = create_client()
+    if client is None:
+        parser.error("GOOGLE_API_KEY is not set")
+
+    worker = IngestWorker(client, args.watch, args.jd.read_text(encoding="utf-8"), args.output,
+                          args.model, args.workers, args.max_pages)
+    if args.once:
+        counts = worker.scan_once()
+        print(f"{counts[DONE]} analyzed, {counts[FAILED]} failed, {counts[DEFERRED]} deferred by quota")
+        return
+
+    # Finish the files already being analyzed, then exit
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop())
+    print(f"Watching {args.watch} every {args.interval:g}s (Ctrl+C to stop)", flush=True)
+    worker.run(args.interval)
+
+
+if __name__ == "__main__":
+    main()
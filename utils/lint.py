@@ -0,0 +1,270 @@
+"""Offline resume checks built from the rules on the Tips & Guide page.
+
+Everything here runs locally on the extracted text and a few facts about the
+PDF, so obvious problems (missing sections, contact details in a footer,
+scanned pages, low keyword coverage) are reported in milliseconds without a
+Gemini call. Rules are plain data: each one compares a single metric against
+a threshold, and all metrics are measured in one pass over the resume.
+"""
+import json
+import operator
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+
+from utils.local_scorer import keyword_counts
+from utils.resume_model import SECTION_NAMES
+from utils.shared_state import state_store
+from utils.text_cleaning import EDGE_LINES, INLINE_SPACE_RE, line_key, repeated_edge_lines
+
+ERROR = "error"
+WARNING = "warning"
+INFO = "info"
+SEVERITY_ORDER = {ERROR: 0, WARNING: 1, INFO: 2}
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+PHONE_RE = re.compile(r"(?:\+?\d[\s().-]?){9,14}\d")
+FIRST_PERSON_RE = re.compile(r"\b(?:i|me|my|mine|myself)\b", re.IGNORECASE)
+TABLE_LINE_RE = re.compile(r"\t|\s{3,}\S+\s{3,}|\|")
+
+# Top JD keywords used for the coverage check
+JD_KEYWORDS = 20
+
+OPS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+}
+
+
+@dataclass(frozen=True)
+class LintRule:
+    """One check: ``metric op threshold`` means the resume has the problem"""
+    id: str
+    severity: str
+    metric: str
+    op: str
+    threshold: float
+    message: str
+    advice: str
+
+
+@dataclass(frozen=True)
+class LintFinding:
+    """A rule that fired, with the measured value"""
+    rule: LintRule
+    value: float
+
+    @property
+    def severity(self) -> str:
+        return self.rule.severity
+
+    @property
+    def message(self) -> str:
+        return self.rule.message.format(value=self.value)
+
+
+RULES = (
+    # Essential sections
+    LintRule("no-experience", WARNING, "missing_experience", "==", 1,
+             "No Work Experience section was found",
+             "Add a section headed \"Experience\" or \"Work Experience\" so the ATS can parse your roles."),
+    LintRule("no-skills", WARNING, "missing_skills", "==", 1,
+             "No Skills section was found",
+             "List your skills under a standard \"Skills\" heading; many ATS match keywords there first."),
+    LintRule("no-education", WARNING, "missing_education", "==", 1,
+             "No Education section was found",
+             "Add an \"Education\" section with degree, institution and graduation date."),
+    LintRule("no-summary", INFO, "missing_summary", "==", 1,
+             "No Professional Summary was found",
+             "A 2-4 sentence summary is a good place for the job's most important keywords."),
+    # Contact information
+    LintRule("no-email", ERROR, "email_count", "==", 0,
+             "No email address was found",
+             "Put your email address in plain text at the top of the resume."),
+    LintRule("no-phone", WARNING, "phone_count", "==", 0,
+             "No phone number was found",
+             "Add a phone number next to your email address."),
+    LintRule("contact-in-header", WARNING, "contact_in_page_edges", "==", 1,
+             "Contact details only appear in a repeated page header or footer",
+             "Many ATS skip headers and footers; move your contact details into the body of the first page."),
+    # Formatting
+    LintRule("scanned-pdf", ERROR, "chars_per_page", "<", 200,
+             "Very little text could be extracted (~{value:.0f} characters per page)",
+             "The PDF looks scanned or image-based. Export it from a word processor as a text-based PDF."),
+    LintRule("images", WARNING, "image_count", ">", 0,
+             "The PDF contains {value:.0f} image(s)",
+             "Graphics, logos and photos are ignored or misread by ATS; remove them or keep them decorative."),
+    LintRule("fonts", INFO, "font_count", ">", 4,
+             "The PDF uses {value:.0f} different fonts",
+             "Stick to one or two standard fonts such as Arial, Calibri or Georgia."),
+    LintRule("icon-glyphs", WARNING, "private_glyph_count", ">", 0,
+             "{value:.0f} icon-font characters could not be read as text",
+             "Icon fonts (for phone, email or LinkedIn symbols) extract as garbage; use plain labels instead."),
+    LintRule("symbols", INFO, "symbol_count", ">", 10,
+             "{value:.0f} decorative symbols or emoji were found",
+             "Use simple bullets (•, - or numbers) instead of decorative symbols."),
+    LintRule("tables", WARNING, "table_line_count", ">", 3,
+             "{value:.0f} lines look like tables or multi-column layout",
+             "Tables, columns and text boxes are often read out of order; use a single-column layout."),
+    LintRule("long-lines", INFO, "paragraph_line_count", ">", 2,
+             "{value:.0f} experience entries are long paragraphs",
+             "Break long paragraphs into achievement bullet points."),
+    LintRule("few-bullets", INFO, "experience_bullet_ratio", "<", 0.3,
+             "Only {value:.0%} of experience lines are bullet points",
+             "Describe each role with bullet points that start with an action verb."),
+    LintRule("no-dates", WARNING, "date_count", "==", 0,
+             "No employment or graduation dates were found",
+             "Give dates for each role and degree, e.g. \"Jan 2021 - Present\"."),
+    # Length and wording
+    LintRule("too-short", WARNING, "word_count", "<", 200,
+             "The resume is short ({value:.0f} words)",
+             "Add detail to your experience and skills; most strong resumes have 400-800 words."),
+    LintRule("too-long", INFO, "page_count", ">", 3,
+             "The resume is {value:.0f} pages long",
+             "Aim for 1-2 pages; recruiters spend only seconds on each resume."),
+    LintRule("first-person", INFO, "first_person_count", ">", 3,
+             "First-person pronouns are used {value:.0f} times",
+             "Drop \"I\" and \"my\" and start bullets with action verbs."),
+    # Keywords (only when a job description is given)
+    LintRule("low-keyword-coverage", WARNING, "jd_keyword_coverage", "<", 0.4,
+             "Only {value:.0%} of the job description's top keywords appear in the resume",
+             "Work the missing keywords you genuinely have into your summary, skills and experience."),
+    LintRule("keyword-stuffing", WARNING, "top_keyword_share", ">", 0.05,
+             "One keyword makes up {value:.0%} of all words",
+             "Repeating a keyword many times looks like stuffing; use it naturally in context."),
+)
+
+
+def _resolve(obj):
+    """Follow a PDF indirect reference, if it is one"""
+    return obj.get_object() if hasattr(obj, "get_object") else obj
+
+
+def pdf_structure(reader) -> dict:
+    """Page, image and font counts read from the PDF's resources (no rendering)"""
+    image_count = 0
+    fonts = set()
+    for page in reader.pages:
+        resources = _resolve(page.get("/Resources")) or {}
+        for xobject in (_resolve(resources.get("/XObject")) or {}).values():
+            if _resolve(xobject).get("/Subtype") == "/Image":
+                image_count += 1
+        for font in (_resolve(resources.get("/Font")) or {}).values():
+            # Subset prefixes ("ABCDEF+Calibri") name the same typeface
+            fonts.add(str(_resolve(font).get("/BaseFont", "")).split("+")[-1])
+    return {"page_count": len(reader.pages), "image_count": image_count, "font_count": len(fonts)}
+
+
+def document_facts(pages: list, structure: dict = None) -> dict:
+    """Facts that need the raw per-page text, which normalization discards"""
+    page_lines = [
+        [INLINE_SPACE_RE.sub(" ", line).strip() for line in (page or "").splitlines()]
+        for page in pages
+    ]
+    repeated = repeated_edge_lines(page_lines)
+
+    contact_in_edges = contact_in_body = False
+    table_lines = 0
+    for raw_page, lines in zip(pages, page_lines):
+        table_lines += sum(1 for line in (raw_page or "").splitlines() if TABLE_LINE_RE.search(line.strip()))
+        for index, line in enumerate(lines):
+            if not (EMAIL_RE.search(line) or PHONE_RE.search(line)):
+                continue
+            at_edge = index < EDGE_LINES or index >= len(lines) - EDGE_LINES
+            if at_edge and line_key(line) in repeated:
+                contact_in_edges = True
+            else:
+                contact_in_body = True
+
+    facts = dict(structure or {})
+    facts.setdefault("page_count", len(pages))
+    facts["raw_chars"] = sum(len(page or "") for page in pages)
+    facts["contact_in_page_edges"] = int(contact_in_edges and not contact_in_body)
+    facts["table_line_count"] = table_lines
+    return facts
+
+
+def save_facts(cache_key: str, facts: dict, store=None):
+    """Store a resume's layout facts under its ParsedResume.cache_key"""
+    (store or state_store).set("document_facts", cache_key, json.dumps(facts))
+
+
+def load_facts(cache_key: str, store=None):
+    data = (store or state_store).get("document_facts", cache_key)
+    return json.loads(data) if data is not None else None
+
+
+def measure(resume, jd: str = None, facts: dict = None) -> dict:
+    """Every metric the rules refer to, collected in one pass over the resume"""
+    metrics = {f"missing_{name}": int(not resume.sections.get(name)) for name in SECTION_NAMES[1:]}
+    words = Counter()
+    email_count = phone_count = first_person = 0
+    private_glyphs = symbols = 0
+    experience_lines = experience_bullets = paragraph_lines = 0
+
+    for name in SECTION_NAMES:
+        for line in resume.sections.get(name, "").splitlines():
+            email_count += len(EMAIL_RE.findall(line))
+            phone_count += len(PHONE_RE.findall(line))
+            first_person += len(FIRST_PERSON_RE.findall(line))
+            words.update(line.split())
+            for char in line:
+                if ord(char) > 127:
+                    category = unicodedata.category(char)
+                    if category == "Co":
+                        private_glyphs += 1
+                    elif category == "So":
+                        symbols += 1
+            if name == "experience" and line:
+                experience_lines += 1
+                experience_bullets += line.startswith("- ")
+                paragraph_lines += len(line) > 300
+
+    word_count = sum(words.values())
+    metrics.update({
+        "email_count": email_count,
+        "phone_count": phone_count,
+        "first_person_count": first_person,
+        "private_glyph_count": private_glyphs,
+        "symbol_count": symbols,
+        "paragraph_line_count": paragraph_lines,
+        "date_count": len(resume.dates),
+        "word_count": word_count,
+    })
+    if experience_lines >= 5:
+        metrics["experience_bullet_ratio"] = experience_bullets / experience_lines
+
+    if facts:
+        metrics.update({key: value for key, value in facts.items() if key != "raw_chars"})
+        metrics["chars_per_page"] = facts["raw_chars"] / max(1, facts["page_count"])
+
+    keywords = keyword_counts(resume.text)
+    if word_count >= 100 and keywords:
+        _, count = keywords.most_common(1)[0]
+        metrics["top_keyword_share"] = count / word_count if count >= 8 else 0.0
+
+    if jd and jd.strip():
+        top_jd = [term for term, _ in keyword_counts(jd).most_common(JD_KEYWORDS)]
+        if top_jd:
+            resume_terms = set(keywords) | set(resume.skills)
+            metrics["jd_keyword_coverage"] = sum(term in resume_terms for term in top_jd) / len(top_jd)
+    return metrics
+
+
+def lint(resume, jd: str = None, facts: dict = None, rules=RULES) -> list:
+    """Findings for every rule that fires, most severe first
+
+    Rules whose metric could not be measured (no JD given, no PDF facts for a
+    resume cached before they were recorded) are skipped.
+    """
+    metrics = measure(resume, jd, facts)
+    findings = [
+        LintFinding(rule, metrics[rule.metric])
+        for rule in rules
+        if metrics.get(rule.metric) is not None and OPS[rule.op](metrics[rule.metric], rule.threshold)
+    ]
+    return sorted(findings, key=lambda finding: SEVERITY_ORDER[finding.severity])
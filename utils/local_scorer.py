@@ -0,0 +1,96 @@
+"""Fast local keyword match used for the live preview while editing inputs."""
+import hashlib
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+from utils.resume_model import canonical_skill
+
+WORD_RE = re.compile(r"[a-z][a-z0-9+#./-]*[a-z0-9+#]|[a-z]")
+STOPWORDS = {
+    "a", "an", "and", "the", "for", "with", "you", "our", "are", "will", "have", "has", "this",
+    "that", "from", "your", "who", "work", "team", "teams", "years", "year", "experience", "ability",
+    "strong", "using", "into", "including", "such", "role", "job", "description", "resume", "candidate",
+    "skills", "of", "to", "in", "on", "or", "as", "is", "be", "by", "at", "we", "it", "its",
+    "all", "can", "able", "about", "across", "other", "new", "plus", "must", "should", "would",
+    "looking", "join", "help", "build", "building", "working", "knowledge", "understanding",
+    "requirements", "responsibilities", "qualifications", "preferred", "required", "nice",
+    "etc", "e.g", "i.e", "well", "good", "great", "excellent", "more", "least", "within", "their",
+    "they", "them", "what", "which", "while", "where", "when", "how", "also", "both", "each",
+}
+MAX_PREVIEW_KEYWORDS = 15
+
+
+def _hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def keyword_counts(text: str) -> Counter:
+    """Canonical keyword frequencies with stopwords removed"""
+    words = (canonical_skill(word) for word in WORD_RE.findall(text.lower()))
+    return Counter(word for word in words if word not in STOPWORDS and len(word) > 1)
+
+
+@dataclass
+class LocalMatch:
+    """Provisional match between a resume and a JD"""
+    score: int
+    matched: list = field(default_factory=list)
+    missing: list = field(default_factory=list)
+
+
+class IncrementalScorer:
+    """Keyword matcher that only recomputes the side (resume or JD) that changed
+
+    One instance lives in each session's state so reruns triggered by typing
+    in the JD box reuse the resume's keyword set, and vice versa.
+    """
+
+    def __init__(self):
+        self._resume_key = None
+        self._resume_terms = frozenset()
+        self._jd_key = None
+        self._jd_counts = Counter()
+        self._last = None
+
+    def _update_resume(self, resume) -> bool:
+        if resume.cache_key == self._resume_key:
+            return False
+        terms = set(keyword_counts(resume.text))
+        terms.update(resume.skills)
+        self._resume_terms = frozenset(terms)
+        self._resume_key = resume.cache_key
+        return True
+
+    def _update_jd(self, jd: str) -> bool:
+        key = _hash(jd)
+        if key == self._jd_key:
+            return False
+        self._jd_counts = keyword_counts(jd)
+        self._jd_key = key
+        return True
+
+    def score(self, resume, jd: str) -> LocalMatch:
+        """Score a ParsedResume against JD text, weighting terms by JD frequency"""
+        resume_changed = self._update_resume(resume)
+        jd_changed = self._update_jd(jd)
+        if self._last is not None and not (resume_changed or jd_changed):
+            return self._last
+
+        total = sum(self._jd_counts.values())
+        matched_weight = 0
+        matched = []
+        missing = []
+        for term, count in self._jd_counts.most_common():
+            if term in self._resume_terms:
+                matched_weight += count
+                matched.append(term)
+            else:
+                missing.append(term)
+
+        self._last = LocalMatch(
+            score=round(100 * matched_weight / total) if total else 0,
+            matched=matched[:MAX_PREVIEW_KEYWORDS],
+            missing=missing[:MAX_PREVIEW_KEYWORDS],
+        )
+        return self._last
@@ -0,0 +1,69 @@
+"""Compare one resume against several job descriptions in batched requests."""
+from utils.config import MAX_JD_CHARS, MAX_JDS_PER_REQUEST, MULTI_JD_TOKEN_BUDGET
+from utils.prompts import multi_jd_prompt
+from utils.results import parse_json_response
+from utils.text_cleaning import estimate_tokens
+
+
+def format_jds(jds: list) -> str:
+    """Number job descriptions so the model can key its answers"""
+    return "\n\n".join(
+        f"Job Description {number}:\n{jd[:MAX_JD_CHARS]}" for number, jd in jds
+    )
+
+
+def plan_batches(resume_text: str, jds: list, token_budget: int = MULTI_JD_TOKEN_BUDGET,
+                 max_per_request: int = MAX_JDS_PER_REQUEST) -> list:
+    """Group (number, jd) pairs so each request stays inside the token budget
+
+    The resume is sent once per batch, so every batch pays for the prompt
+    template and the resume, plus each of its job descriptions.
+    """
+    fixed_tokens = estimate_tokens(multi_jd_prompt) + estimate_tokens(resume_text)
+    batches = []
+    current = []
+    current_tokens = fixed_tokens
+
+    for number, jd in jds:
+        jd_tokens = estimate_tokens(f"Job Description {number}:\n{jd[:MAX_JD_CHARS]}")
+        if current and (current_tokens + jd_tokens > token_budget or len(current) >= max_per_request):
+            batches.append(current)
+            current = []
+            current_tokens = fixed_tokens
+        current.append((number, jd))
+        current_tokens += jd_tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_prompt(resume_text: str, batch: list) -> str:
+    return multi_jd_prompt.format(text=resume_text, jds=format_jds(batch), count=len(batch))
+
+
+def parse_batch_response(response: str, batch: list) -> dict:
+    """Map each JD number in the batch to its result dict (or an error dict)
+
+    Raises json.JSONDecodeError if the response is not JSON at all.
+    """
+    parsed = parse_json_response(response)
+    if isinstance(parsed, dict):
+        parsed = parsed.get("results", [parsed])
+
+    by_number = {}
+    numbers = [number for number, _ in batch]
+    for position, item in enumerate(parsed if isinstance(parsed, list) else []):
+        if not isinstance(item, dict):
+            continue
+        try:
+            number = int(item.get("JD", numbers[position] if position < len(numbers) else 0))
+        except (TypeError, ValueError):
+            continue
+        if number in numbers:
+            by_number[number] = item
+
+    return {
+        number: by_number.get(number, {"error": "No result returned for this job description"})
+        for number in numbers
+    }
@@ -0,0 +1,141 @@
+"""MinHash/LSH index for reusing results of near-identical resumes.
+
+Candidates often resubmit a resume with a new phone number or one extra
+bullet. Exact hashes miss those, so resumes are reduced to MinHash signatures
+of word shingles (digits, emails and URLs removed) and bucketed with LSH per
+job description, model and output mode, so a compact or score-only result is
+never served for a full analysis or for another model. A lookup only compares against the few signatures that share
+a bucket, which keeps it well under a millisecond at hundreds of thousands of
+stored resumes.
+"""
+import hashlib
+import json
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from utils.config import CACHE_DIR, NEAR_DUPLICATE_THRESHOLD
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+PRIME = (1 << 31) - 1
+
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, PRIME, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, PRIME, NUM_PERM, dtype=np.uint64)
+
+NOISE_RE = re.compile(r"\S+@\S+|https?://\S+|www\.\S+|\d+")
+WORD_RE = re.compile(r"[a-z][a-z+#.]*")
+
+
+def _shingles(text: str) -> set:
+    words = WORD_RE.findall(NOISE_RE.sub(" ", text.lower()))
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """128-value MinHash signature of the text's word 3-shingles"""
+    shingles = _shingles(text)
+    if not shingles:
+        return np.full(NUM_PERM, PRIME, dtype=np.uint32)
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    return ((np.outer(_A, hashes) + _B[:, None]) % PRIME).min(axis=1).astype(np.uint32)
+
+
+def jd_hash(jd: str) -> str:
+    return hashlib.sha256(" ".join(jd.split()).lower().encode("utf-8")).hexdigest()
+
+
+def scope_key(jd: str, model: str, mode: str) -> str:
+    """Which stored results may answer a request: same JD, model option and output mode"""
+    return f"{jd_hash(jd)}:{model}:{mode}"
+
+
+class NearDuplicateIndex:
+    """LSH buckets of MinHash signatures, scoped by scope_key()
+
+    Entries are appended to a JSON-lines log so the index survives restarts.
+    """
+
+    def __init__(self, path=None, threshold: float = NEAR_DUPLICATE_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._signatures = []
+        self._results = []
+        self._buckets = {}
+        if path is not None and path.exists():
+            self._load()
+
+    def __len__(self):
+        return len(self._signatures)
+
+    @staticmethod
+    def _band_keys(scope: str, signature: np.ndarray):
+        bands = signature.reshape(BANDS, ROWS)
+        return [hash((scope, band, bands[band].tobytes())) for band in range(BANDS)]
+
+    def _insert(self, scope: str, signature: np.ndarray, result: dict) -> int:
+        entry_id = len(self._signatures)
+        self._signatures.append(signature)
+        self._results.append(result)
+        for key in self._band_keys(scope, signature):
+            self._buckets.setdefault(key, []).append(entry_id)
+        return entry_id
+
+    def add_signature(self, scope: str, signature: np.ndarray, result: dict, persist: bool = True):
+        with self._lock:
+            self._insert(scope, signature, result)
+            if persist and self.path is not None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as log:
+                    log.write(json.dumps({
+                        "scope": scope,
+                        "signature": signature.tobytes().hex(),
+                        "result": result,
+                    }) + "\n")
+
+    def add(self, resume_text: str, jd: str, result: dict, model: str, mode: str):
+        """Remember the analysis result for this resume/JD pair, model option and output mode"""
+        self.add_signature(scope_key(jd, model, mode), minhash_signature(resume_text), result)
+
+    def lookup_signature(self, scope: str, signature: np.ndarray):
+        """Return (similarity, result) for the best match above threshold, or None"""
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(scope, signature):
+                candidates.update(self._buckets.get(key, ()))
+
+            best = None
+            for entry_id in candidates:
+                similarity = float(np.count_nonzero(self._signatures[entry_id] == signature)) / NUM_PERM
+                if similarity >= self.threshold and (best is None or similarity > best[0]):
+                    best = (similarity, self._results[entry_id])
+            return best
+
+    def lookup(self, resume_text: str, jd: str, model: str, mode: str):
+        """Find a stored result for a near-identical resume analysed the same way against the same JD"""
+        return self.lookup_signature(scope_key(jd, model, mode), minhash_signature(resume_text))
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as log:
+            for line in log:
+                try:
+                    entry = json.loads(line)
+                    signature = np.frombuffer(bytes.fromhex(entry["signature"]), dtype=np.uint32)
+                    # Entries from before results were scoped by model and mode have no scope and are dropped
+                    scope = entry["scope"]
+                except (ValueError, KeyError):
+                    continue
+                if signature.size == NUM_PERM:
+                    self._insert(scope, signature, entry["result"])
+
+
+# Shared by every Streamlit session in this process
+near_duplicates = NearDuplicateIndex(CACHE_DIR / "near_duplicates.jsonl")
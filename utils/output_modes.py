@@ -0,0 +1,48 @@
+"""Response detail levels for analyses: full, compact and score-only output.
+
+Output tokens are generated one at a time, so they dominate response time.
+Compact mode asks for single-letter keys, at most 8 missing keywords and a
+summary of at most 40 words; score-only mode (for bulk screening) asks for
+the match score alone. Every mode also caps max_output_tokens. Short keys
+are mapped back to the usual result keys when responses are parsed (see
+utils.results), with the keyword list cut to the compact limit, so
+everything downstream sees the same result dict.
+"""
+from dataclasses import dataclass
+
+from utils.prompts import (compact_prompt, input_prompt, packed_compact_prompt, packed_prompt,
+                           packed_score_prompt, score_prompt)
+
+# The largest max_output_tokens the supported Gemini models accept
+MODEL_MAX_OUTPUT_TOKENS = 8192
+
+
+@dataclass(frozen=True)
+class OutputMode:
+    """Prompt templates and output-token cap for one level of response detail"""
+    name: str
+    label: str
+    prompt: str
+    packed_prompt: str
+    # Per analysis
+    max_output_tokens: int
+    # Includes missing keywords and a profile summary
+    detailed: bool = True
+
+    def output_tokens(self, analyses: int = 1):
+        """Output-token cap for a request answering ``analyses`` analyses"""
+        # A little room for the JSON array around packed answers
+        return min(self.max_output_tokens * analyses + (16 if analyses > 1 else 0), MODEL_MAX_OUTPUT_TOKENS)
+
+    def config(self, analyses: int = 1):
+        """generate_content config for the mode"""
+        return {"max_output_tokens": self.output_tokens(analyses)}
+
+
+# About twice a typical full answer (see EXPECTED_OUTPUT_TOKENS), so only runaway output is cut off
+FULL = OutputMode("full", "Full", input_prompt, packed_prompt, max_output_tokens=1024)
+COMPACT = OutputMode("compact", "Compact", compact_prompt, packed_compact_prompt, max_output_tokens=192)
+SCORE_ONLY = OutputMode("score", "Score only", score_prompt, packed_score_prompt, max_output_tokens=24,
+                        detailed=False)
+
+OUTPUT_MODES = {mode.label: mode for mode in (FULL, COMPACT, SCORE_ONLY)}
@@ -0,0 +1,174 @@
+"""Pack several candidates for the same JD into one Gemini request.
+
+With a fixed requests-per-minute ceiling, throughput is bounded by how many
+candidates each request carries. PackingScheduler groups short resumes up to a
+token budget, asks for a JSON array keyed by candidate id, and falls back to
+one request per candidate for anything a malformed or partial packed
+response did not cover. Rate-limit, quota and budget errors end the run
+instead, since retrying a pack one candidate at a time would only multiply
+the refused calls.
+"""
+import json
+from dataclasses import dataclass, field
+
+from utils.config import MAX_JD_CHARS, MAX_PACK_SIZE, MAX_RESUME_CHARS, PACK_TOKEN_BUDGET
+from utils.gemini import is_quota_error
+from utils.output_modes import FULL
+from utils.results import parse_json_response
+from utils.text_cleaning import estimate_tokens
+
+
+class QuotaExhausted(Exception):
+    """Raised when a call is refused for rate limit, quota or budget reasons
+
+    ``results`` holds what the run finished before the refusal.
+    """
+    results = None
+
+
+@dataclass
+class Candidate:
+    """One resume to screen; candidate_id must be unique within a run"""
+    candidate_id: str
+    text: str
+
+    @property
+    def block(self) -> str:
+        return f"### Candidate {self.candidate_id}\n{self.text[:MAX_RESUME_CHARS]}"
+
+
+@dataclass
+class PackingStats:
+    candidates: int = 0
+    requests: int = 0
+    packed_requests: int = 0
+    single_requests: int = 0
+    malformed_packs: int = 0
+    errors: dict = field(default_factory=dict)
+
+
+def plan_packs(candidates: list, jd: str, token_budget: int = PACK_TOKEN_BUDGET,
+               max_pack_size: int = MAX_PACK_SIZE, output_mode=FULL) -> list:
+    """Greedily group candidates so each packed prompt fits the token budget"""
+    fixed_tokens = estimate_tokens(output_mode.packed_prompt) + estimate_tokens(jd[:MAX_JD_CHARS])
+    packs = []
+    current = []
+    current_tokens = fixed_tokens
+
+    for candidate in candidates:
+        tokens = estimate_tokens(candidate.block)
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_pack_size):
+            packs.append(current)
+            current = []
+            current_tokens = fixed_tokens
+        current.append(candidate)
+        current_tokens += tokens
+
+    if current:
+        packs.append(current)
+    return packs
+
+
+def build_packed_prompt(pack: list, jd: str, output_mode=FULL) -> str:
+    return output_mode.packed_prompt.format(
+        jd=jd[:MAX_JD_CHARS],
+        candidates="\n\n".join(candidate.block for candidate in pack),
+        count=len(pack),
+    )
+
+
+def parse_packed_response(response: str, pack: list) -> dict:
+    """Return {candidate_id: result} for every well-formed entry in the response
+
+    Raises ValueError (including json.JSONDecodeError) if the response is not a
+    JSON array; missing or unknown ids are simply left out.
+    """
+    parsed = parse_json_response(response)
+    if not isinstance(parsed, list):
+        raise ValueError("Packed response is not a JSON array")
+
+    wanted = {candidate.candidate_id for candidate in pack}
+    results = {}
+    for item in parsed:
+        if isinstance(item, dict) and str(item.get("id")) in wanted and "JD Match" in item:
+            result = dict(item)
+            results[str(result.pop("id"))] = result
+    return results
+
+
+class PackingScheduler:
+    """Screen many candidates against one JD with as few requests as possible
+
+    ``call`` takes a prompt and returns (text, error), e.g. the page's
+    get_gemini_response or a functools.partial of utils.gemini.generate.
+    ``output_mode`` picks the prompts; the call itself should apply the
+    mode's output-token cap, e.g. ``output_mode.config(max_pack_size)``.
+    ``run`` raises QuotaExhausted as soon as a call is refused for rate
+    limit, quota or budget reasons.
+    """
+
+    def __init__(self, call, token_budget: int = PACK_TOKEN_BUDGET, max_pack_size: int = MAX_PACK_SIZE,
+                 output_mode=FULL):
+        self.call = call
+        self.token_budget = token_budget
+        self.max_pack_size = max_pack_size
+        self.output_mode = output_mode
+        self.stats = PackingStats()
+
+    def run(self, candidates: list, jd: str) -> dict:
+        """Return {candidate_id: result dict} for every candidate that succeeded"""
+        self.stats.candidates += len(candidates)
+        results = {}
+
+        try:
+            for pack in plan_packs(candidates, jd, self.token_budget, self.max_pack_size, self.output_mode):
+                if len(pack) == 1:
+                    leftovers = pack
+                else:
+                    leftovers = self._run_pack(pack, jd, results)
+
+                for candidate in leftovers:
+                    self._run_single(candidate, jd, results)
+        except QuotaExhausted as e:
+            e.results = results
+            raise
+
+        return results
+
+    def _run_pack(self, pack: list, jd: str, results: dict) -> list:
+        """Send a packed request and return the candidates it did not answer"""
+        self.stats.requests += 1
+        self.stats.packed_requests += 1
+        response, error = self.call(build_packed_prompt(pack, jd, self.output_mode))
+        if error:
+            if is_quota_error(error):
+                raise QuotaExhausted(error)
+            # Only malformed or partial answers are worth retrying one candidate at a time
+            for candidate in pack:
+                self.stats.errors[candidate.candidate_id] = error
+            return []
+
+        try:
+            packed_results = parse_packed_response(response, pack)
+        except ValueError:
+            self.stats.malformed_packs += 1
+            return pack
+
+        results.update(packed_results)
+        return [candidate for candidate in pack if candidate.candidate_id not in packed_results]
+
+    def _run_single(self, candidate: Candidate, jd: str, results: dict):
+        self.stats.requests += 1
+        self.stats.single_requests += 1
+        prompt = self.output_mode.prompt.format(text=candidate.text[:MAX_RESUME_CHARS], jd=jd[:MAX_JD_CHARS])
+        response, error = self.call(prompt)
+        if error:
+            if is_quota_error(error):
+                raise QuotaExhausted(error)
+            self.stats.errors[candidate.candidate_id] = error
+            return
+
+        try:
+            results[candidate.candidate_id] = parse_json_response(response)
+        except json.JSONDecodeError as e:
+            self.stats.errors[candidate.candidate_id] = f"Could not parse AI response: {e}"
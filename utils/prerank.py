@@ -0,0 +1,109 @@
+"""Local pre-ranking of many resumes against one JD before calling Gemini.
+
+Resumes are turned into hashed term-frequency vectors stored as flat NumPy
+arrays (a COO sparse matrix), and every candidate is scored against the JD in
+one vectorised pass with BM25 or TF-IDF cosine similarity. Only the top-K are
+then sent for the full LLM analysis.
+"""
+import re
+import zlib
+from collections import Counter
+
+import numpy as np
+
+N_FEATURES = 1 << 20
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_feature_cache = {}
+
+
+def _feature(token: str) -> int:
+    feature = _feature_cache.get(token)
+    if feature is None:
+        feature = _feature_cache[token] = zlib.crc32(token.encode("utf-8")) % N_FEATURES
+    return feature
+
+
+def hashed_counts(text: str) -> Counter:
+    """Hashed term frequencies for one document"""
+    counts = Counter()
+    for token, count in Counter(TOKEN_RE.findall(text.lower())).items():
+        counts[_feature(token)] += count
+    return counts
+
+
+class CandidatePool:
+    """Hashed term matrix for a pool of resumes, scored against JDs in bulk"""
+
+    def __init__(self, texts: list):
+        features = []
+        counts = []
+        terms_per_doc = np.zeros(len(texts), dtype=np.int64)
+
+        for doc, text in enumerate(texts):
+            term_counts = hashed_counts(text)
+            terms_per_doc[doc] = len(term_counts)
+            features.extend(term_counts.keys())
+            counts.extend(term_counts.values())
+
+        self.size = len(texts)
+        self.docs = np.repeat(np.arange(self.size, dtype=np.int32), terms_per_doc)
+        self.features = np.asarray(features, dtype=np.int32)
+        self.tf = np.asarray(counts, dtype=np.float32)
+        self.lengths = np.bincount(self.docs, weights=self.tf, minlength=self.size)
+        self.avg_length = self.lengths.mean() if self.size else 0.0
+
+        # Document frequency per hashed feature (each (doc, feature) pair is unique)
+        self.df = np.bincount(self.features, minlength=N_FEATURES).astype(np.float32)
+        self.idf = np.log1p((self.size - self.df + 0.5) / (self.df + 0.5)).astype(np.float32)
+        self._doc_norms = None
+
+    def _query_mask(self, jd: str):
+        query = hashed_counts(jd)
+        query_features = np.fromiter(query.keys(), dtype=np.int32, count=len(query))
+        query_weights = np.zeros(N_FEATURES, dtype=np.float32)
+        query_weights[query_features] = np.fromiter(query.values(), dtype=np.float32, count=len(query))
+        return query_weights, np.isin(self.features, query_features)
+
+    def bm25(self, jd: str) -> np.ndarray:
+        """BM25 score of every resume for the JD's terms"""
+        _, mask = self._query_mask(jd)
+        docs = self.docs[mask]
+        features = self.features[mask]
+        tf = self.tf[mask]
+        norm = K1 * (1 - B + B * self.lengths[docs] / max(self.avg_length, 1.0))
+        weights = self.idf[features] * tf * (K1 + 1) / (tf + norm)
+        return np.bincount(docs, weights=weights, minlength=self.size)
+
+    def cosine(self, jd: str) -> np.ndarray:
+        """TF-IDF cosine similarity of every resume with the JD"""
+        if self._doc_norms is None:
+            weights = self.tf * self.idf[self.features]
+            self._doc_norms = np.sqrt(np.bincount(self.docs, weights=weights * weights, minlength=self.size))
+
+        query_weights, mask = self._query_mask(jd)
+        query_weights *= self.idf
+        query_norm = np.linalg.norm(query_weights)
+        features = self.features[mask]
+        dots = np.bincount(
+            self.docs[mask],
+            weights=self.tf[mask] * self.idf[features] * query_weights[features],
+            minlength=self.size,
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = dots / (self._doc_norms * query_norm)
+        return np.nan_to_num(scores)
+
+    def top_k(self, jd: str, k: int, method: str = "bm25") -> list:
+        """Return [(index, score), ...] for the k best resumes, best first"""
+        scores = self.bm25(jd) if method == "bm25" else self.cosine(jd)
+        k = min(k, self.size)
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(index), float(scores[index])) for index in best]
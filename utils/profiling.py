@@ -0,0 +1,126 @@
+"""Opt-in cProfile + tracemalloc report for a single analysis run.
+
+Profilers are only created and started when a run asks for it, so normal
+runs pay nothing. Both tools are process-wide, so only one session can
+profile at a time.
+"""
+import cProfile
+import marshal
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 10
+
+STDLIB_DIR_RE = re.compile(r"^python\d+(\.\d+)?$")
+
+_profiling = threading.Lock()
+
+
+@dataclass
+class ProfileReport:
+    """Ranked hot functions, time per library and peak memory for one run"""
+    wall_seconds: float
+    peak_bytes: int
+    functions: list = field(default_factory=list)
+    areas: list = field(default_factory=list)
+    allocations: list = field(default_factory=list)
+    # Marshalled pstats data, the same format as cProfile's .prof files
+    prof_data: bytes = b""
+
+
+def _area(filename: str) -> str:
+    """Group a code location by library: "PyPDF2", "json", "streamlit", "utils/gemini.py" ..."""
+    if filename.startswith("~") or filename.startswith("<"):
+        return "builtins"
+    parts = filename.replace("\\", "/").split("/")
+    for marker in ("site-packages", "dist-packages"):
+        if marker in parts[:-1]:
+            return parts[parts.index(marker) + 1].removesuffix(".py")
+    for index in range(len(parts) - 2, -1, -1):
+        if STDLIB_DIR_RE.match(parts[index]):
+            return parts[index + 1].removesuffix(".py")
+    return "/".join(parts[-2:])
+
+
+class RunProfiler:
+    """Profile everything the script thread does between start() and stop()"""
+
+    def __init__(self):
+        self._profiler = None
+        self._started = 0.0
+        self._owns_tracemalloc = False
+
+    def start(self) -> bool:
+        """Begin profiling; returns False if another session is already profiling"""
+        if not _profiling.acquire(blocking=False):
+            return False
+        self._owns_tracemalloc = not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._profiler = cProfile.Profile()
+        self._started = time.perf_counter()
+        try:
+            self._profiler.enable()
+        except ValueError:
+            # Another profiler (a debugger, say) already owns the interpreter hook
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+            _profiling.release()
+            return False
+        return True
+
+    def stop(self) -> ProfileReport:
+        self._profiler.disable()
+        wall = time.perf_counter() - self._started
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+        _profiling.release()
+
+        stats = pstats.Stats(self._profiler).stats
+        ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)
+        functions = [
+            {
+                "Function": name,
+                "Location": f"{filename}:{line}",
+                "Calls": calls,
+                "Own (ms)": round(own * 1000, 2),
+                "Cumulative (ms)": round(cumulative * 1000, 2),
+            }
+            for (filename, line, name), (_, calls, own, cumulative, _) in ranked[:TOP_FUNCTIONS]
+        ]
+
+        area_times = {}
+        for (filename, _, _), (_, _, own, _, _) in stats.items():
+            area = _area(filename)
+            area_times[area] = area_times.get(area, 0.0) + own
+        total = sum(area_times.values()) or 1.0
+        areas = [
+            {"Area": area, "Own (ms)": round(own * 1000, 2), "Share": f"{own / total:.0%}"}
+            for area, own in sorted(area_times.items(), key=lambda item: item[1], reverse=True)
+        ]
+
+        allocations = [
+            {
+                "Location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "Size (KB)": round(stat.size / 1024, 1),
+                "Blocks": stat.count,
+            }
+            for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+        ]
+
+        return ProfileReport(
+            wall_seconds=wall,
+            peak_bytes=peak,
+            functions=functions,
+            areas=areas,
+            allocations=allocations,
+            prof_data=marshal.dumps(stats),
+        )
@@ -0,0 +1,171 @@
+"""Prompt templates sent to Gemini."""
+
+# Single resume vs single job description
+input_prompt = """
+Act as an expert ATS (Application Tracking System) with deep knowledge in software engineering, 
+data science, data analytics, and big data engineering.
+
+Analyze the resume against the job description and provide:
+1. JD Match percentage (be realistic and accurate)
+2. Missing keywords that are critical for the role
+3. A compelling profile summary tailored to the JD
+
+**IMPORTANT: Respond ONLY with valid JSON in this exact format:**
+{{"JD Match": "XX%", "MissingKeywords": ["keyword1", "keyword2", "keyword3"], "Profile Summary": "A professional summary here"}}
+
+Resume:
+{text}
+
+Job Description:
+{jd}
+
+Remember: Output ONLY the JSON object, no additional text.
+"""
+
+# One resume vs several numbered job descriptions
+multi_jd_prompt = """
+Act as an expert ATS (Application Tracking System) with deep knowledge in software engineering, 
+data science, data analytics, and big data engineering.
+
+Analyze the resume below against EACH of the numbered job descriptions and, for every job description, provide:
+1. JD Match percentage (be realistic and accurate)
+2. Missing keywords that are critical for the role
+3. A compelling profile summary tailored to the JD
+
+**IMPORTANT: Respond ONLY with a valid JSON array containing one object per job description, in this exact format:**
+[{{"JD": 1, "JD Match": "XX%", "MissingKeywords": ["keyword1", "keyword2"], "Profile Summary": "A professional summary here"}}]
+
+Resume:
+{text}
+
+{jds}
+
+Remember: Output ONLY the JSON array with exactly {count} objects, no additional text.
+"""
+
+# Several candidate resumes vs one job description
+packed_prompt = """
+Act as an expert ATS (Application Tracking System) with deep knowledge in software engineering, 
+data science, data analytics, and big data engineering.
+
+Analyze EACH candidate resume below against the job description and, for every candidate, provide:
+1. JD Match percentage (be realistic and accurate)
+2. Missing keywords that are critical for the role
+3. A compelling profile summary tailored to the JD
+
+**IMPORTANT: Respond ONLY with a valid JSON array containing one object per candidate, keyed by the candidate id, in this exact format:**
+[{{"id": "candidate id", "JD Match": "XX%", "MissingKeywords": ["keyword1", "keyword2"], "Profile Summary": "A professional summary here"}}]
+
+Job Description:
+{jd}
+
+{candidates}
+
+Remember: Output ONLY the JSON array with exactly {count} objects, no additional text.
+"""
+
+# Compact output: short keys, capped keyword list and summary length (see utils/output_modes.py)
+compact_prompt = """
+Act as an expert ATS (Application Tracking System) with deep knowledge in software engineering, 
+data science, data analytics, and big data engineering.
+
+Analyze the resume against the job description.
+
+**IMPORTANT: Respond ONLY with compact JSON in this exact format:**
+{{"m": 78, "k": ["keyword1", "keyword2"], "s": "summary"}}
+m = JD match percentage as an integer (be realistic and accurate), k = at most 8 critical missing keywords,
+s = a profile summary tailored to the JD in at most 40 words.
+
+Resume:
+{text}
+
+Job Description:
+{jd}
+
+Remember: Output ONLY the JSON object, no additional text.
+"""
+
+# Several candidates, compact output
+packed_compact_prompt = """
+Act as an expert ATS (Application Tracking System) with deep knowledge in software engineering, 
+data science, data analytics, and big data engineering.
+
+Analyze EACH candidate resume below against the job description.
+
+**IMPORTANT: Respond ONLY with a compact JSON array containing one object per candidate, in this exact format:**
+[{{"id": "candidate id", "m": 78, "k": ["keyword1", "keyword2"], "s": "summary"}}]
+m = JD match percentage as an integer (be realistic and accurate), k = at most 8 critical missing keywords,
+s = a profile summary tailored to the JD in at most 40 words.
+
+Job Description:
+{jd}
+
+{candidates}
+
+Remember: Output ONLY the JSON array with exactly {count} objects, no additional text.
+"""
+
+# Several candidates, match score only (bulk screening)
+packed_score_prompt = """
+Act as an expert ATS (Application Tracking System) with deep knowledge in software engineering, 
+data science, data analytics, and big data engineering.
+
+Score how well EACH candidate resume below matches the job description.
+
+**IMPORTANT: Respond ONLY with a compact JSON array containing one object per candidate, in this exact format:**
+[{{"id": "candidate id", "m": 78}}]
+m = JD match percentage as an integer (be realistic and accurate).
+
+Job Description:
+{jd}
+
+{candidates}
+
+Remember: Output ONLY the JSON array with exactly {count} objects, no additional text.
+"""
+
+# One candidate, match score only
+score_prompt = """
+Act as an expert ATS (Application Tracking System) with deep knowledge in software engineering, 
+data science, data analytics, and big data engineering.
+
+Score how well the resume matches the job description.
+
+**IMPORTANT: Respond ONLY with compact JSON in this exact format:**
+{{"m": 78}}
+m = JD match percentage as an integer (be realistic and accurate).
+
+Resume:
+{text}
+
+Job Description:
+{jd}
+
+Remember: Output ONLY the JSON object, no additional text.
+"""
+
+# Re-analysis of an edited resume: only the changed sections are sent (see utils/incremental.py)
+section_update_prompt = """
+Act as an expert ATS (Application Tracking System) with deep knowledge in software engineering, 
+data science, data analytics, and big data engineering.
+
+A resume was already analyzed against the job description below. The candidate has since edited
+some sections; every other section is unchanged. Update the analysis for the edits only:
+1. The new JD Match percentage, starting from the previous one (be realistic and accurate)
+2. Which previously missing keywords the edited sections now cover
+3. Critical keywords that became missing because of the edits (e.g. removed content)
+
+**IMPORTANT: Respond ONLY with valid JSON in this exact format:**
+{{"JD Match": "XX%", "Resolved": ["keyword1"], "NewMissing": ["keyword2"]}}
+
+Previous JD Match: {score}
+Previously missing keywords: {missing}
+
+Edited sections:
+{changes}
+
+Job Description:
+{jd}
+
+Remember: Output ONLY the JSON object, no additional text.
+"""
@@ -0,0 +1,49 @@
+"""Token-bucket limiter keeping Gemini calls under the RPM/TPM quota.
+
+Buckets live in a StateStore, so every replica sharing the store draws from
+the same per-minute request and token budget instead of each assuming it
+has the whole quota to itself.
+"""
+import time
+
+from utils.config import RPM_LIMIT, TPM_LIMIT
+from utils.shared_state import MemoryStore, state_store
+
+
+class RateLimiter:
+    """Allow ``rpm`` requests and ``tpm`` tokens per minute, with bursts up to each limit"""
+
+    def __init__(self, rpm: int = RPM_LIMIT, tpm: int = TPM_LIMIT, store=None, name: str = "gemini"):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.store = store if store is not None else MemoryStore()
+        self.name = name
+
+    def buckets(self, tokens: int) -> list:
+        """The (name, amount, capacity, refill) buckets one call of ``tokens`` draws from"""
+        buckets = [(f"{self.name}:rpm", 1, self.rpm, self.rpm / 60.0)]
+        if self.tpm and tokens:
+            buckets.append((f"{self.name}:tpm", min(tokens, self.tpm), self.tpm, self.tpm / 60.0))
+        return buckets
+
+    def try_acquire(self, tokens: int = 0) -> bool:
+        """Take a permit if one is available right now"""
+        return self.store.take(self.buckets(tokens)) == 0.0
+
+    def acquire(self, timeout: float = None, tokens: int = 0) -> bool:
+        """Wait for a permit; returns False if none became available within timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.store.take(self.buckets(tokens))
+            if wait == 0.0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+# Shared by every Streamlit session in this process and every replica using the same state store
+gemini_rate_limiter = RateLimiter(store=state_store)
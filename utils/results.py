@@ -0,0 +1,66 @@
+"""Parsing and interpretation of Gemini analysis responses."""
+import json
+import re
+
+# Compact responses use single-letter keys (see utils/output_modes.py)
+SHORT_KEYS = {"m": "JD Match", "k": "MissingKeywords", "s": "Profile Summary"}
+# The compact prompts ask for at most this many missing keywords
+COMPACT_KEYWORDS = 8
+
+
+def clean_json_text(response: str) -> str:
+    """Strip markdown code fences Gemini sometimes wraps around JSON"""
+    response_clean = response.strip()
+
+    # Remove markdown code blocks if present
+    if response_clean.startswith("```"):
+        lines = response_clean.split("\n")
+        response_clean = "\n".join(lines[1:-1])
+    return response_clean.replace("```json", "").replace("```", "").strip()
+
+
+def expand_short_keys(parsed):
+    """Map compact {"m": 78, "k": [...], "s": "..."} results (or lists of them) to the usual keys
+
+    Keyword lists longer than the prompt allows are cut to COMPACT_KEYWORDS.
+    """
+    if isinstance(parsed, list):
+        return [expand_short_keys(item) for item in parsed]
+    if not isinstance(parsed, dict) or "m" not in parsed:
+        return parsed
+    result = {SHORT_KEYS.get(key, key): value for key, value in parsed.items()}
+    if isinstance(parsed.get("k"), list):
+        result["MissingKeywords"] = parsed["k"][:COMPACT_KEYWORDS]
+    if isinstance(result["JD Match"], (int, float)):
+        result["JD Match"] = f"{int(result['JD Match'])}%"
+    return result
+
+
+def parse_json_response(response: str):
+    """Parse a Gemini response as JSON (raises json.JSONDecodeError)
+
+    Compact short keys are expanded, so callers always get the full key names.
+    """
+    return expand_short_keys(json.loads(clean_json_text(response)))
+
+
+def parse_match_score(match_score):
+    """Turn "78%" (or 78) into an int, or None if it cannot be read"""
+    if isinstance(match_score, (int, float)):
+        return int(match_score)
+    found = re.search(r"\d+", str(match_score or ""))
+    return int(found.group(0)) if found else None
+
+
+def match_quality(match_score) -> str:
+    """Human-readable quality band for a match score"""
+    score_val = parse_match_score(match_score)
+    if score_val is None:
+        return "N/A"
+    if score_val >= 80:
+        return "Excellent ⭐"
+    if score_val >= 60:
+        return "Good 👍"
+    if score_val >= 40:
+        return "Fair ⚠️"
+    return "Needs Work 📝"
@@ -0,0 +1,252 @@
+"""Compact, reusable representation of a parsed resume."""
+import hashlib
+import json
+import re
+from array import array
+
+from utils.config import MAX_RESUME_CHARS
+from utils.shared_state import state_store
+from utils.text_cleaning import estimate_tokens, estimate_tokens_saved
+
+SECTION_NAMES = ("header", "summary", "skills", "experience", "education")
+
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "objective", "about me", "career objective"),
+    "skills": ("skills", "technical skills", "core competencies", "key skills", "technologies", "tools"),
+    "experience": ("experience", "work experience", "professional experience", "employment history",
+                   "work history", "projects"),
+    "education": ("education", "academic background", "certifications", "education and certifications"),
+}
+
+HEADING_LOOKUP = {heading: name for name, headings in SECTION_HEADINGS.items() for heading in headings}
+
+# Words that make a short line a heading even when it is not one of the standard ones
+# ("Relevant Experience", "Career History", "Internships", "Education & Training")
+HEADING_WORDS = {
+    "summary": ("summary", "objective", "profile", "about me"),
+    "skills": ("skills", "competencies", "technologies"),
+    "experience": ("experience", "employment", "career history", "work history", "internships?", "projects"),
+    "education": ("education", "academic", "certifications", "qualifications"),
+}
+HEADING_WORD_RES = {
+    name: re.compile(rf"\b(?:{'|'.join(words)})\b") for name, words in HEADING_WORDS.items()
+}
+HEADING_PUNCTUATION_RE = re.compile(r"[^\w\s]+")
+# Longer lines are body text that happens to mention a section word
+MAX_HEADING_WORDS = 4
+
+# Common spellings mapped onto one canonical skill name
+SKILL_ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "py": "python",
+    "python3": "python",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "nlp": "natural language processing",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "mssql": "sql server",
+    "gcp": "google cloud",
+    "aws cloud": "aws",
+    "sklearn": "scikit-learn",
+    "tf": "tensorflow",
+}
+
+SKILL_SPLIT_RE = re.compile(r"[,;|•●▪\n]|\s-\s|:\s")
+DATE_RE = re.compile(
+    r"\b(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+\d{4}"
+    r"|\d{1,2}/\d{4}|(?:19|20)\d{2})\b"
+    r"(?:\s*(?:-|–|to)\s*(?:present|current|(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)"
+    r"[a-z]*\.?\s+)?\d{4}|\d{1,2}/\d{4}))?",
+    re.IGNORECASE,
+)
+
+
+def resume_hash(data: bytes) -> str:
+    """Stable content hash used to key parsed resumes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def resume_cache_key(content_hash: str, max_pages: int = None) -> str:
+    """Cache key of a resume parsed from its first ``max_pages`` pages (None: every page)"""
+    return f"{content_hash}:{max_pages or 'all'}"
+
+
+def canonical_skill(skill: str) -> str:
+    skill = skill.strip().strip(".").lower()
+    return SKILL_ALIASES.get(skill, skill)
+
+
+def _normalize_heading(line: str) -> str:
+    return " ".join(HEADING_PUNCTUATION_RE.sub(" ", line.lower()).split())
+
+
+def _heading_for(line: str):
+    """Return the section name if the line looks like a section heading
+
+    Standard headings match exactly; other short lines match on the section
+    word that appears first in them.
+    """
+    stripped = line.strip()
+    if len(stripped) > 40 or stripped[:1] in ("-", "•", "*") or stripped.endswith("."):
+        return None
+    candidate = _normalize_heading(stripped)
+    if candidate in HEADING_LOOKUP:
+        return HEADING_LOOKUP[candidate]
+    if not candidate or len(candidate.split()) > MAX_HEADING_WORDS or any(char.isdigit() for char in candidate):
+        return None
+    found = []
+    for name, pattern in HEADING_WORD_RES.items():
+        match = pattern.search(candidate)
+        if match:
+            found.append((match.start(), name))
+    return min(found)[1] if found else None
+
+
+def _extract_skills(skills_text: str) -> list:
+    skills = []
+    seen = set()
+    for part in SKILL_SPLIT_RE.split(skills_text):
+        part = part.strip().lstrip("-").strip()
+        # Only standard headings: "Cloud Technologies" is a skill, not a heading
+        if not part or len(part) > 40 or _normalize_heading(part) in HEADING_LOOKUP:
+            continue
+        skill = canonical_skill(part)
+        if skill not in seen:
+            seen.add(skill)
+            skills.append(skill)
+    return skills
+
+
+class ParsedResume:
+    """Sections, canonical skills, dates and token counts for one uploaded resume
+
+    Built once per upload hash and page limit and kept in the shared state
+    store so that prompt building, local scoring and exports reuse it instead
+    of re-parsing the raw PDF text.
+    """
+    __slots__ = ("content_hash", "sections", "skills", "dates", "section_tokens", "chars_saved", "max_pages")
+
+    def __init__(self, content_hash: str, sections: dict, skills: list, dates: list,
+                 section_tokens=None, chars_saved: int = 0, max_pages: int = None):
+        self.content_hash = content_hash
+        # Pages read from the PDF (None: all of them)
+        self.max_pages = max_pages
+        self.sections = sections
+        self.skills = skills
+        self.dates = dates
+        # One unsigned int per entry of SECTION_NAMES
+        self.section_tokens = array("I", section_tokens or [
+            estimate_tokens(sections.get(name, "")) for name in SECTION_NAMES
+        ])
+        self.chars_saved = chars_saved
+
+    @property
+    def cache_key(self) -> str:
+        return resume_cache_key(self.content_hash, self.max_pages)
+
+    @property
+    def tokens_saved(self) -> int:
+        """Estimated prompt tokens the text cleanup removed"""
+        return estimate_tokens_saved(self.chars_saved, 0)
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.section_tokens)
+
+    @property
+    def text(self) -> str:
+        """Full resume text with section headings, in canonical order"""
+        parts = []
+        for name in SECTION_NAMES:
+            body = self.sections.get(name)
+            if body:
+                parts.append(body if name == "header" else f"{name.upper()}\n{body}")
+        return "\n\n".join(parts)
+
+    def prompt_text(self, limit: int = MAX_RESUME_CHARS) -> str:
+        """Resume text for the Gemini prompt, trimmed to the character budget"""
+        return self.text[:limit]
+
+    def to_dict(self) -> dict:
+        return {
+            "content_hash": self.content_hash,
+            "sections": self.sections,
+            "skills": self.skills,
+            "dates": self.dates,
+            "section_tokens": self.section_tokens.tolist(),
+            "chars_saved": self.chars_saved,
+            "max_pages": self.max_pages,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ParsedResume":
+        return cls(
+            content_hash=data["content_hash"],
+            sections=data["sections"],
+            skills=data["skills"],
+            dates=data["dates"],
+            section_tokens=data.get("section_tokens"),
+            chars_saved=data.get("chars_saved", 0),
+            max_pages=data.get("max_pages"),
+        )
+
+    def save(self, store=None):
+        """Write the parsed resume to the shared extraction cache
+
+        It is also kept as the file's latest parse, for bulk jobs that only
+        know the content hash.
+        """
+        data = json.dumps(self.to_dict())
+        (store or state_store).set("resumes", self.cache_key, data)
+        (store or state_store).set("resumes", self.content_hash, data)
+
+    @classmethod
+    def load(cls, content_hash: str, max_pages: int = None, store=None):
+        """Load a resume parsed with this page limit, or None if it is not cached"""
+        return cls._load(resume_cache_key(content_hash, max_pages), store)
+
+    @classmethod
+    def latest(cls, content_hash: str, store=None):
+        """Load the most recent parse of the file, whatever its page limit, or None"""
+        return cls._load(content_hash, store)
+
+    @classmethod
+    def _load(cls, key: str, store):
+        data = (store or state_store).get("resumes", key)
+        if data is None:
+            return None
+        try:
+            return cls.from_dict(json.loads(data))
+        except (ValueError, KeyError):
+            return None
+
+
+def parse_resume(text: str, content_hash: str, chars_saved: int = 0, max_pages: int = None) -> ParsedResume:
+    """Split normalized resume text into sections and pull out skills and dates"""
+    sections = {}
+    # Lines before the first recognised heading are the name/contact block
+    current = "header"
+    for line in text.splitlines():
+        heading = _heading_for(line)
+        if heading:
+            current = heading
+            continue
+        sections.setdefault(current, []).append(line)
+
+    sections = {name: "\n".join(lines).strip() for name, lines in sections.items()}
+    sections = {name: body for name, body in sections.items() if body}
+
+    return ParsedResume(
+        content_hash=content_hash,
+        sections=sections,
+        skills=_extract_skills(sections.get("skills", "")),
+        dates=[match.group(0) for match in DATE_RE.finditer(text)],
+        chars_saved=chars_saved,
+        max_pages=max_pages,
+    )
@@ -0,0 +1,118 @@
+"""Automatic model selection for the "auto" model option."""
+import json
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+
+from utils.config import CACHE_DIR, LATENCY_TARGET_SECONDS, LONG_PROMPT_TOKENS, SHORT_PROMPT_TOKENS
+from utils.text_cleaning import estimate_tokens
+from utils.usage import usage_ledger
+
+AUTO_MODEL = "auto"
+
+# Cheapest/fastest first; the last entry is the escalation model
+FAST_MODELS = ["gemini-2.0-flash-exp", "gemini-1.5-flash"]
+LARGE_MODEL = "gemini-1.5-pro"
+
+# Latency assumed for a model until we have observed it
+PRIOR_LATENCY = {"gemini-2.0-flash-exp": 3.0, "gemini-1.5-flash": 4.0, "gemini-1.5-pro": 8.0}
+
+# Provisional local scores in this band are treated as ambiguous
+AMBIGUOUS_SCORES = range(35, 70)
+MAX_ERROR_RATE = 0.3
+
+logger = logging.getLogger("smart_ats.routing")
+
+
+@dataclass
+class RoutingDecision:
+    timestamp: float
+    model: str
+    reason: str
+    prompt_tokens: int
+    local_score: int = None
+
+
+class ModelRouter:
+    """Pick a model per request from prompt size, observed latency and error rates
+
+    Short or clear-cut comparisons go to the fastest healthy flash model. Long
+    prompts, or ones whose local provisional score is ambiguous, escalate to
+    the larger model as long as it is healthy and its observed latency still
+    fits the latency target.
+    """
+
+    def __init__(self, ledger, latency_target: float = LATENCY_TARGET_SECONDS, log_path=None):
+        self.ledger = ledger
+        self.latency_target = latency_target
+        self.log_path = log_path
+        self.decisions = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def _latency(self, model: str) -> tuple:
+        average, error_rate, samples = self.ledger.model_health(model)
+        return (average if average is not None else PRIOR_LATENCY.get(model, 5.0)), error_rate
+
+    def _fastest(self) -> tuple:
+        healthy = []
+        for model in FAST_MODELS:
+            latency, error_rate = self._latency(model)
+            if error_rate <= MAX_ERROR_RATE:
+                healthy.append((latency, model))
+        if not healthy:
+            return FAST_MODELS[-1], "all flash models erroring; using the stable flash model"
+        latency, model = min(healthy)
+        return model, f"fastest healthy model (~{latency:.1f}s)"
+
+    def route(self, prompt: str, local_score: int = None) -> RoutingDecision:
+        """Decide which model to use for this prompt, and why"""
+        prompt_tokens = estimate_tokens(prompt)
+        model, reason = self._fastest()
+
+        escalate = None
+        if prompt_tokens >= LONG_PROMPT_TOKENS:
+            escalate = f"long prompt ({prompt_tokens:,} tokens)"
+        elif local_score in AMBIGUOUS_SCORES and prompt_tokens >= SHORT_PROMPT_TOKENS:
+            escalate = f"ambiguous local score ({local_score}%)"
+
+        if escalate:
+            latency, error_rate = self._latency(LARGE_MODEL)
+            if error_rate > MAX_ERROR_RATE:
+                reason = f"{escalate}, but {LARGE_MODEL} is erroring; {reason}"
+            elif latency > self.latency_target:
+                reason = f"{escalate}, but {LARGE_MODEL} (~{latency:.1f}s) exceeds the latency target; {reason}"
+            else:
+                model, reason = LARGE_MODEL, escalate
+
+        decision = RoutingDecision(time.time(), model, reason, prompt_tokens, local_score)
+        self._log(decision)
+        return decision
+
+    def _log(self, decision: RoutingDecision):
+        logger.info("routed to %s: %s", decision.model, decision.reason)
+        with self._lock:
+            self.decisions.append(decision)
+            if self.log_path is not None:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as log:
+                    log.write(json.dumps(asdict(decision)) + "\n")
+
+    def recent_rows(self, limit: int = 20) -> list:
+        with self._lock:
+            decisions = list(self.decisions)[-limit:]
+        return [
+            {
+                "Time": time.strftime("%H:%M:%S", time.localtime(decision.timestamp)),
+                "Model": decision.model,
+                "Prompt Tokens": decision.prompt_tokens,
+                "Local Score": decision.local_score,
+                "Reason": decision.reason,
+            }
+            for decision in reversed(decisions)
+        ]
+
+
+# Shared by every Streamlit session in this process
+model_router = ModelRouter(usage_ledger, log_path=CACHE_DIR / "routing.jsonl")
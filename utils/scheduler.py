@@ -0,0 +1,207 @@
+"""Priority scheduling of Gemini calls in front of the shared rate limiter.
+
+Calls are tagged interactive (a recruiter waiting on the page), batch
+(screening many resumes, bulk re-scoring) or background (the ingestion
+worker). Waiting calls are released in weighted-fair-queuing order, so
+interactive calls jump ahead of queued bulk work and no class starves.
+Bulk classes also draw from a second, smaller bucket, which keeps a share
+of the RPM/TPM quota free for interactive calls on every replica. Work
+already sent to Gemini is never interrupted; only calls still waiting for a
+permit are reordered.
+"""
+import threading
+import time
+from collections import deque
+
+from utils.config import INTERACTIVE_RESERVE_SHARE, RPM_LIMIT, TPM_LIMIT
+from utils.rate_limit import RateLimiter, gemini_rate_limiter
+from utils.shared_state import state_store
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+BACKGROUND = "background"
+PRIORITY_CLASSES = (INTERACTIVE, BATCH, BACKGROUND)
+
+# Share of permits each class gets while all of them have calls waiting
+WEIGHTS = {INTERACTIVE: 8, BATCH: 3, BACKGROUND: 1}
+
+# Wait times kept per class for the percentile shown on the Settings page
+RECENT_WAITS = 200
+
+
+class _Ticket:
+    __slots__ = ("priority", "tokens", "tag", "enqueued")
+
+    def __init__(self, priority: str, tokens: int, tag: float):
+        self.priority = priority
+        self.tokens = tokens
+        self.tag = tag
+        self.enqueued = time.monotonic()
+
+
+class _ClassStats:
+    __slots__ = ("queue", "blocked_until", "sent", "timed_out", "total_wait", "max_wait",
+                 "recent_waits")
+
+    def __init__(self):
+        self.queue = deque()
+        self.blocked_until = 0.0
+        self.sent = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent_waits = deque(maxlen=RECENT_WAITS)
+
+
+class PriorityScheduler:
+    """Hand out rate-limiter permits to waiting calls by priority class
+
+    Each waiting call gets a virtual finish tag of ``1 / weight`` after the
+    last call queued in its class (or after the last call sent, if its class
+    has nothing queued). The call with the smallest tag among the heads of
+    the class queues is the only one that may take a permit; if the buckets
+    are empty its class is marked blocked until they refill, and the other
+    classes get a turn. A new interactive call gets a smaller tag than a
+    long batch backlog, so it preempts every batch call still in the queue.
+    """
+
+    def __init__(self, limiter: RateLimiter, bulk_limiter: RateLimiter = None, weights: dict = None):
+        self.limiter = limiter
+        self.bulk_limiter = bulk_limiter
+        self.weights = weights or WEIGHTS
+        self._classes = {name: _ClassStats() for name in self.weights}
+        self._virtual_time = 0.0
+        # The ticket whose store round trip is in progress
+        self._taking = None
+        self._changed = threading.Condition()
+
+    def _buckets(self, priority: str, tokens: int) -> list:
+        buckets = self.limiter.buckets(tokens)
+        if priority != INTERACTIVE and self.bulk_limiter is not None:
+            buckets += self.bulk_limiter.buckets(tokens)
+        return buckets
+
+    def _next_ticket(self, now: float):
+        ready = [
+            state.queue[0] for state in self._classes.values()
+            if state.queue and state.blocked_until <= now
+        ]
+        return min(ready, key=lambda ticket: ticket.tag, default=None)
+
+    def _sleep_for(self, now: float) -> float:
+        waits = [state.blocked_until - now for state in self._classes.values() if state.queue]
+        return max(0.01, min(waits, default=1.0))
+
+    def acquire(self, priority: str = INTERACTIVE, timeout: float = None, tokens: int = 0) -> bool:
+        """Wait for a permit in turn; returns False if none was granted within timeout
+
+        The store round trip (SQLite transaction or Redis script) runs outside
+        the condition, so queueing, timeouts and the Settings table never wait
+        on I/O; one call at a time is marked as taking its turn.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            state = self._classes[priority]
+            tag = (state.queue[-1].tag if state.queue else self._virtual_time) + 1.0 / self.weights[priority]
+            ticket = _Ticket(priority, tokens, tag)
+            state.queue.append(ticket)
+        try:
+            while True:
+                with self._changed:
+                    now = time.monotonic()
+                    my_turn = self._taking is None and self._next_ticket(now) is ticket
+                    if my_turn:
+                        self._taking = ticket
+                if my_turn:
+                    try:
+                        wait = self.limiter.store.take(self._buckets(priority, tokens))
+                    finally:
+                        with self._changed:
+                            self._taking = None
+                    with self._changed:
+                        if wait == 0.0:
+                            state.queue.remove(ticket)
+                            self._virtual_time = max(self._virtual_time, tag)
+                            waited = now - ticket.enqueued
+                            state.sent += 1
+                            state.total_wait += waited
+                            state.max_wait = max(state.max_wait, waited)
+                            state.recent_waits.append(waited)
+                            return True
+                        state.blocked_until = now + wait
+                with self._changed:
+                    now = time.monotonic()
+                    if deadline is not None and now >= deadline:
+                        state.queue.remove(ticket)
+                        state.timed_out += 1
+                        return False
+                    if self._taking is not None or self._next_ticket(now) is not ticket:
+                        sleep = self._sleep_for(now)
+                        if deadline is not None:
+                            sleep = min(sleep, deadline - now)
+                        self._changed.wait(sleep)
+        finally:
+            with self._changed:
+                # Whoever is next may be able to go now
+                self._changed.notify_all()
+
+    def try_acquire(self, priority: str = INTERACTIVE, tokens: int = 0) -> bool:
+        """Take a permit only if it is available now and no call is waiting for one"""
+        with self._changed:
+            if self._taking is not None or any(state.queue for state in self._classes.values()):
+                return False
+        if self.limiter.store.take(self._buckets(priority, tokens)) != 0.0:
+            return False
+        with self._changed:
+            self._classes[priority].sent += 1
+        return True
+
+    def limiter_for(self, priority: str) -> "ClassLimiter":
+        """Rate-limiter-compatible view for one class, to pass as generate()'s rate_limiter"""
+        return ClassLimiter(self, priority)
+
+    def class_rows(self) -> list:
+        """Queue depth and wait times per class for the Settings page"""
+        rows = []
+        with self._changed:
+            now = time.monotonic()
+            for name, state in self._classes.items():
+                recent = sorted(state.recent_waits)
+                rows.append({
+                    "Class": name.capitalize(),
+                    "Weight": self.weights[name],
+                    "Queued": len(state.queue),
+                    "Oldest Wait (s)": round(now - state.queue[0].enqueued, 1) if state.queue else 0.0,
+                    "Sent": state.sent,
+                    "Timed Out": state.timed_out,
+                    "Avg Wait (s)": round(state.total_wait / state.sent, 2) if state.sent else 0.0,
+                    "P95 Wait (s)": round(recent[int(len(recent) * 0.95)], 2) if recent else 0.0,
+                    "Max Wait (s)": round(state.max_wait, 2),
+                })
+        return rows
+
+
+class ClassLimiter:
+    """The scheduler seen as a plain rate limiter for one priority class"""
+
+    def __init__(self, scheduler: PriorityScheduler, priority: str):
+        self.scheduler = scheduler
+        self.priority = priority
+
+    def acquire(self, timeout: float = None, tokens: int = 0) -> bool:
+        return self.scheduler.acquire(self.priority, timeout, tokens)
+
+    def try_acquire(self, tokens: int = 0) -> bool:
+        return self.scheduler.try_acquire(self.priority, tokens)
+
+
+# Shared by every Streamlit session in this process; the bulk bucket is shared by every replica
+gemini_scheduler = PriorityScheduler(
+    gemini_rate_limiter,
+    RateLimiter(
+        rpm=max(1, int(RPM_LIMIT * (1 - INTERACTIVE_RESERVE_SHARE))),
+        tpm=int(TPM_LIMIT * (1 - INTERACTIVE_RESERVE_SHARE)),
+        store=state_store,
+        name="gemini-bulk",
+    ) if INTERACTIVE_RESERVE_SHARE > 0 else None,
+)
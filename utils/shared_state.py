@@ -0,0 +1,214 @@
+"""State shared between Streamlit replicas: caches and rate-limit buckets.
+
+The default store is a SQLite file, which is enough for several processes on
+one host (or on a shared volume). Set SMART_ATS_STATE_URL to a redis:// URL
+to share state across hosts; MemoryStore is the in-process stand-in used by
+benchmarks and tests.
+"""
+import sqlite3
+import threading
+import time
+
+from utils.config import CACHE_DIR, STATE_URL
+
+# Expired cache entries are deleted on the first write after this many seconds
+PURGE_INTERVAL_SECONDS = 300
+
+
+class StateStore:
+    """Key/value cache plus atomic token buckets
+
+    ``take`` receives (name, amount, capacity, refill_per_second) tuples and
+    either takes from every bucket or from none, returning 0.0 on success or
+    the number of seconds until the request could succeed.
+    """
+
+    def get(self, namespace: str, key: str):
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value: str, ttl: float = None):
+        raise NotImplementedError
+
+    def take(self, buckets: list) -> float:
+        raise NotImplementedError
+
+
+def _take_from(state: dict, buckets: list, now: float) -> float:
+    """Shared token-bucket arithmetic; ``state`` maps name -> (tokens, updated)"""
+    refilled = {}
+    wait = 0.0
+    for name, amount, capacity, rate in buckets:
+        tokens, updated = state.get(name, (capacity, now))
+        tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+        refilled[name] = tokens
+        if tokens < amount:
+            wait = max(wait, (amount - tokens) / rate if rate else float("inf"))
+
+    for name, amount, capacity, rate in buckets:
+        state[name] = (refilled[name] - (amount if wait == 0.0 else 0.0), now)
+    return wait
+
+
+class MemoryStore(StateStore):
+    """Process-local store (single replica, tests and benchmarks)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+        self._buckets = {}
+        self._last_purge = time.time()
+
+    def get(self, namespace, key):
+        with self._lock:
+            value, expires = self._data.get((namespace, key), (None, None))
+        if expires is not None and expires < time.time():
+            return None
+        return value
+
+    def set(self, namespace, key, value, ttl=None):
+        now = time.time()
+        with self._lock:
+            self._data[(namespace, key)] = (value, now + ttl if ttl else None)
+            if now - self._last_purge >= PURGE_INTERVAL_SECONDS:
+                self._last_purge = now
+                self._data = {item: entry for item, entry in self._data.items()
+                              if entry[1] is None or entry[1] >= now}
+
+    def take(self, buckets):
+        with self._lock:
+            return _take_from(self._buckets, buckets, time.time())
+
+
+class SQLiteStore(StateStore):
+    """File-backed store shared by every process that opens the same path"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._last_purge = 0.0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS kv ("
+                       "namespace TEXT, key TEXT, value TEXT, expires REAL, PRIMARY KEY (namespace, key))")
+            db.execute("CREATE INDEX IF NOT EXISTS kv_expires ON kv (expires)")
+            db.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+
+    def _connection(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, namespace, key):
+        row = self._connection().execute(
+            "SELECT value, expires FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return None
+        return row[0]
+
+    def set(self, namespace, key, value, ttl=None):
+        now = time.time()
+        db = self._connection()
+        db.execute(
+            "INSERT OR REPLACE INTO kv (namespace, key, value, expires) VALUES (?, ?, ?, ?)",
+            (namespace, key, value, now + ttl if ttl else None),
+        )
+        # Each process purges on its own schedule; the delete is idempotent across replicas
+        if now - self._last_purge >= PURGE_INTERVAL_SECONDS:
+            self._last_purge = now
+            db.execute("DELETE FROM kv WHERE expires IS NOT NULL AND expires < ?", (now,))
+
+    def take(self, buckets):
+        db = self._connection()
+        names = [bucket[0] for bucket in buckets]
+        # BEGIN IMMEDIATE takes the write lock up front so replicas cannot interleave
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = db.execute(
+                f"SELECT name, tokens, updated FROM buckets WHERE name IN ({','.join('?' * len(names))})", names
+            ).fetchall()
+            state = {name: (tokens, updated) for name, tokens, updated in rows}
+            wait = _take_from(state, buckets, time.time())
+            db.executemany(
+                "INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                [(name, *state[name]) for name in names],
+            )
+            db.execute("COMMIT")
+            return wait
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+
+# KEYS: bucket names; ARGV: now, then amount/capacity/rate per bucket
+_TAKE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local wait = 0
+local tokens = {}
+for i, name in ipairs(KEYS) do
+    local amount = tonumber(ARGV[3 * i - 1])
+    local capacity = tonumber(ARGV[3 * i])
+    local rate = tonumber(ARGV[3 * i + 1])
+    local state = redis.call('HMGET', name, 'tokens', 'updated')
+    local current = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    current = math.min(capacity, current + math.max(0, now - updated) * rate)
+    tokens[i] = current
+    if current < amount then
+        wait = math.max(wait, (amount - current) / rate)
+    end
+end
+for i, name in ipairs(KEYS) do
+    local remaining = tokens[i]
+    if wait == 0 then
+        remaining = remaining - tonumber(ARGV[3 * i - 1])
+    end
+    redis.call('HSET', name, 'tokens', tostring(remaining), 'updated', tostring(now))
+    redis.call('EXPIRE', name, 3600)
+end
+return tostring(wait)
+"""
+
+
+class RedisStore(StateStore):
+    """Networked store for replicas on different hosts (requires the redis package)"""
+
+    def __init__(self, url: str, prefix: str = "smart_ats"):
+        import redis
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url)
+        self._take_script = self._redis.register_script(_TAKE_SCRIPT)
+
+    def _key(self, *parts):
+        return ":".join((self.prefix,) + parts)
+
+    def get(self, namespace, key):
+        value = self._redis.get(self._key(namespace, key))
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, namespace, key, value, ttl=None):
+        self._redis.set(self._key(namespace, key), value, ex=int(ttl) if ttl else None)
+
+    def take(self, buckets):
+        keys = [self._key("bucket", name) for name, *_ in buckets]
+        args = [time.time()]
+        for _, amount, capacity, rate in buckets:
+            args += [amount, capacity, rate]
+        return float(self._take_script(keys=keys, args=args))
+
+
+def open_store(url: str = STATE_URL) -> StateStore:
+    """Create the store configured by SMART_ATS_STATE_URL"""
+    if url.startswith("memory://"):
+        return MemoryStore()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisStore(url)
+    return SQLiteStore(CACHE_DIR / "shared_state.sqlite3")
+
+
+# Shared by every Streamlit session in this process (and, via the store, other replicas)
+state_store = open_store()
@@ -0,0 +1,103 @@
+"""In-process single-flight: concurrent identical calls share one execution."""
+import hashlib
+import threading
+
+
+def analysis_key(prompt: str, model_name: str) -> str:
+    """Hash identifying an analysis: the same prompt sent to the same model"""
+    return hashlib.sha256(f"{model_name}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "abandoned")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.abandoned = False
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one in-flight call
+
+    The first caller for a key runs the function; callers arriving while it
+    is running wait for it and receive the same result, or the same exception.
+    If the running call is interrupted (e.g. its Streamlit session reruns and
+    the script thread is stopped) waiters are not left hanging: one of them
+    takes over and runs the function itself. The same happens when the
+    leader's result is not ``shareable``, e.g. a refusal that only applies to
+    the leader's own session.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn, *args, timeout: float = None, shareable=None, **kwargs):
+        """Return (result, shared) where shared is True if another caller ran fn
+
+        Raises TimeoutError if a waiter gives up after ``timeout`` seconds; the
+        in-flight call itself keeps running for the remaining callers. When
+        ``shareable(result)`` is false, waiters run fn themselves instead of
+        receiving the leader's result.
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is None:
+                    call = self._calls[key] = _Call()
+                    self.executed += 1
+                    leader = True
+                else:
+                    self.coalesced += 1
+                    leader = False
+
+            if leader:
+                return self._run(key, call, fn, args, kwargs), False
+
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"Timed out waiting for in-flight call {key[:12]}")
+
+            unshareable = call.error is None and shareable is not None and not shareable(call.result)
+            if call.abandoned or unshareable:
+                # The leader was interrupted before producing anything, or its result was its own: retry
+                with self._lock:
+                    self.coalesced -= 1
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+    def _run(self, key, call, fn, args, kwargs):
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            call.abandoned = True
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+# Shared by every Streamlit session in this process
+analysis_flight = SingleFlight()
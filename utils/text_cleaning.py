@@ -0,0 +1,141 @@
+"""Clean up text extracted from PDF resumes before it is sent to Gemini."""
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+# Rough average for English text; good enough for budgeting prompt size
+CHARS_PER_TOKEN = 4
+
+# Only the first/last few lines of a page are checked for running headers/footers
+EDGE_LINES = 3
+
+PAGE_NUMBER_RE = re.compile(r"^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$", re.IGNORECASE)
+BULLET_RE = re.compile(r"^[•●▪■◦‣∙·–—*>-]+\s*")
+INLINE_SPACE_RE = re.compile(r"[ \t\u00a0\u2009\u200b]+")
+HYPHEN_BREAK_RE = re.compile(r"([A-Za-z]+)-$")
+
+# First halves of hyphenated compounds ("self-driven", "cross-functional"): their hyphen is kept when joined
+COMPOUND_HEADS = {
+    "co", "cross", "end", "fast", "full", "hands", "high", "long", "low", "multi", "non", "part", "real",
+    "self", "short", "well",
+}
+
+
+@dataclass
+class NormalizationStats:
+    """Summary of how much text the normalization stage removed"""
+    original_chars: int
+    normalized_chars: int
+    removed_lines: int
+
+    @property
+    def chars_saved(self) -> int:
+        return self.original_chars - self.normalized_chars
+
+    @property
+    def tokens_saved(self) -> int:
+        return estimate_tokens_saved(self.original_chars, self.normalized_chars)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of Gemini input tokens for a piece of text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_tokens_saved(original_chars: int, normalized_chars: int) -> int:
+    return max(0, (original_chars - normalized_chars) // CHARS_PER_TOKEN)
+
+
+def line_key(line: str) -> str:
+    """Key used to spot repeated headers/footers ("Page 2 of 3" == "Page 3 of 3")"""
+    return re.sub(r"\d+", "#", line.lower())
+
+
+def repeated_edge_lines(pages: list) -> set:
+    """Find header/footer lines that show up on most pages"""
+    if len(pages) < 2:
+        return set()
+
+    counts = Counter()
+    for lines in pages:
+        edges = lines[:EDGE_LINES] + lines[-EDGE_LINES:]
+        counts.update({line_key(line) for line in edges if line})
+
+    threshold = max(2, (len(pages) + 1) // 2)
+    return {key for key, count in counts.items() if count >= threshold}
+
+
+def normalize_pages(pages: list) -> tuple:
+    """Normalize per-page PDF text and return (text, NormalizationStats)
+
+    Drops headers/footers repeated across pages and bare page numbers, joins
+    words hyphenated across line breaks (keeping the hyphen of compounds such
+    as "self-driven"), unifies bullet markers, removes duplicated bullet
+    lines and collapses runs of whitespace.
+    """
+    pages = [page or "" for page in pages]
+    original_chars = sum(len(page) for page in pages) + len(pages)
+
+    page_lines = [
+        [INLINE_SPACE_RE.sub(" ", line).strip() for line in page.splitlines()]
+        for page in pages
+    ]
+    repeated = repeated_edge_lines(page_lines)
+
+    seen_repeated = set()
+    seen_bullets = set()
+    removed_lines = 0
+    output = []
+
+    for lines in page_lines:
+        for line in lines:
+            if not line:
+                if output and output[-1]:
+                    output.append("")
+                continue
+
+            if PAGE_NUMBER_RE.match(line):
+                removed_lines += 1
+                continue
+
+            key = line_key(line)
+            if key in repeated:
+                # Keep the first occurrence: it is often the candidate's name/contact line
+                if key in seen_repeated:
+                    removed_lines += 1
+                    continue
+                seen_repeated.add(key)
+
+            bullet = BULLET_RE.match(line)
+            if bullet and len(line) > bullet.end():
+                line = "- " + line[bullet.end():]
+
+            hyphen = HYPHEN_BREAK_RE.search(output[-1]) if output else None
+            if hyphen and line[0].islower():
+                joiner = "-" if hyphen.group(1).lower() in COMPOUND_HEADS else ""
+                output[-1] = output[-1][:-1] + joiner + line
+                continue
+
+            output.append(line)
+
+    # Bullet boilerplate is deduplicated once hyphenated lines have been joined
+    deduped = []
+    for line in output:
+        if line.startswith("- "):
+            if line.lower() in seen_bullets:
+                removed_lines += 1
+                continue
+            seen_bullets.add(line.lower())
+        deduped.append(line)
+
+    text = "\n".join(deduped).strip()
+    return text, NormalizationStats(
+        original_chars=original_chars,
+        normalized_chars=len(text),
+        removed_lines=removed_lines,
+    )
+
+
+def normalize_text(text: str) -> tuple:
+    """Normalize a single block of text (pages separated by form feeds, if any)"""
+    return normalize_pages(text.split("\f"))
@@ -0,0 +1,228 @@
+"""Token/cost accounting for Gemini calls, with session, daily and global budgets."""
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass
+
+from utils.config import (CACHE_DIR, DAILY_TOKEN_BUDGET, EXPECTED_OUTPUT_TOKENS, GLOBAL_TOKEN_BUDGET,
+                          SESSION_TOKEN_BUDGET)
+
+# Approximate list prices in USD per 1M tokens: (input, output)
+MODEL_PRICES = {
+    "gemini-2.0-flash-exp": (0.0, 0.0),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-pro": (1.25, 5.00),
+}
+
+
+# Batch jobs are billed at this share of the interactive per-token prices
+BATCH_PRICE_SHARE = 0.5
+
+
+class BudgetExceeded(Exception):
+    """Raised when a call would exceed a session, daily or global token budget"""
+
+
+@dataclass(frozen=True)
+class Reservation:
+    """Tokens set aside by check_budget for a call that has not been recorded yet"""
+    session_id: str
+    day: str
+    tokens: int
+
+
+@dataclass
+class UsageRecord:
+    timestamp: float
+    session_id: str
+    model: str
+    prompt_tokens: int
+    output_tokens: int
+    total_tokens: int
+    latency: float
+    fallback_used: bool
+    ok: bool
+    # Usage of a whole batch job: no latency sample, batch pricing
+    batch: bool = False
+
+    @property
+    def day(self) -> str:
+        return time.strftime("%Y-%m-%d", time.localtime(self.timestamp))
+
+    @property
+    def cost(self) -> float:
+        input_price, output_price = MODEL_PRICES.get(self.model, (0.0, 0.0))
+        cost = (self.prompt_tokens * input_price + self.output_tokens * output_price) / 1_000_000
+        return cost * BATCH_PRICE_SHARE if self.batch else cost
+
+
+def usage_from_response(response) -> tuple:
+    """(prompt, output, total) token counts from a generate_content response"""
+    metadata = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(metadata, "prompt_token_count", None) or 0
+    output_tokens = getattr(metadata, "candidates_token_count", None) or 0
+    total_tokens = getattr(metadata, "total_token_count", None) or prompt_tokens + output_tokens
+    return prompt_tokens, output_tokens, total_tokens
+
+
+class UsageLedger:
+    """Aggregated usage per model, session and day
+
+    Records are appended to a JSON-lines file so daily and global totals
+    survive restarts; only the most recent records are kept in memory.
+    """
+
+    def __init__(self, path=None, session_budget: int = SESSION_TOKEN_BUDGET,
+                 daily_budget: int = DAILY_TOKEN_BUDGET, global_budget: int = GLOBAL_TOKEN_BUDGET):
+        self.path = path
+        self.session_budget = session_budget
+        self.daily_budget = daily_budget
+        self.global_budget = global_budget
+        self._lock = threading.Lock()
+        self.recent = deque(maxlen=500)
+        self.by_model = defaultdict(lambda: defaultdict(float))
+        self.by_session = defaultdict(int)
+        self.by_day = defaultdict(int)
+        self.total_tokens = 0
+        self.total_cost = 0.0
+        # Estimated tokens of calls that passed check_budget and are still running
+        self._reserved_by_session = defaultdict(int)
+        self._reserved_by_day = defaultdict(int)
+        self._reserved_total = 0
+        if path is not None and path.exists():
+            self._load()
+
+    def _add(self, record: UsageRecord):
+        model = self.by_model[record.model]
+        if not record.batch:
+            model["calls"] += 1
+            model["latency"] += record.latency
+        model["prompt_tokens"] += record.prompt_tokens
+        model["output_tokens"] += record.output_tokens
+        model["fallbacks"] += record.fallback_used
+        model["errors"] += not record.ok
+        model["cost"] += record.cost
+        self.by_session[record.session_id] += record.total_tokens
+        self.by_day[record.day] += record.total_tokens
+        self.total_tokens += record.total_tokens
+        self.total_cost += record.cost
+        self.recent.append(record)
+
+    def record(self, record: UsageRecord):
+        with self._lock:
+            self._add(record)
+            if self.path is not None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as log:
+                    log.write(json.dumps(asdict(record)) + "\n")
+
+    def check_budget(self, session_id: str, prompt_tokens: int,
+                     output_tokens: int = EXPECTED_OUTPUT_TOKENS) -> Reservation:
+        """Reserve the call's estimated tokens, or raise BudgetExceeded if any budget could be exceeded
+
+        Reserved tokens count against every budget until release() is
+        called, which should happen once the call's actual usage has been
+        recorded (or the call was not made). Concurrent calls therefore
+        cannot all pass the check and overshoot a budget together.
+        """
+        needed = prompt_tokens + output_tokens
+        today = time.strftime("%Y-%m-%d")
+        with self._lock:
+            checks = (
+                ("session", self.session_budget,
+                 self.by_session[session_id] + self._reserved_by_session[session_id]),
+                ("daily", self.daily_budget, self.by_day[today] + self._reserved_by_day[today]),
+                ("global", self.global_budget, self.total_tokens + self._reserved_total),
+            )
+            for name, budget, used in checks:
+                if budget and used + needed > budget:
+                    raise BudgetExceeded(
+                        f"The {name} token budget is exhausted ({used:,} of {budget:,} tokens used or "
+                        "reserved). Try again later or raise the limit in the environment settings."
+                    )
+            self._reserved_by_session[session_id] += needed
+            self._reserved_by_day[today] += needed
+            self._reserved_total += needed
+        return Reservation(session_id, today, needed)
+
+    def release(self, reservation: Reservation):
+        """Return tokens reserved by check_budget"""
+        with self._lock:
+            self._reserved_by_session[reservation.session_id] -= reservation.tokens
+            self._reserved_by_day[reservation.day] -= reservation.tokens
+            self._reserved_total -= reservation.tokens
+
+    def today(self) -> int:
+        with self._lock:
+            return self.by_day[time.strftime("%Y-%m-%d")]
+
+    def session(self, session_id: str) -> int:
+        with self._lock:
+            return self.by_session[session_id]
+
+    def model_health(self, model: str, window: int = 50) -> tuple:
+        """(average latency of successful calls, error rate, samples) over recent calls"""
+        with self._lock:
+            records = [record for record in self.recent if record.model == model and not record.batch][-window:]
+        if not records:
+            return None, 0.0, 0
+        ok_latencies = [record.latency for record in records if record.ok]
+        average = sum(ok_latencies) / len(ok_latencies) if ok_latencies else None
+        return average, 1 - len(ok_latencies) / len(records), len(records)
+
+    def latency_percentile(self, model: str, percentile: float = 0.95, window: int = 200):
+        """Latency percentile of recent successful calls, or None with too few samples"""
+        with self._lock:
+            latencies = [record.latency for record in self.recent
+                         if record.model == model and record.ok and not record.batch]
+        latencies = sorted(latencies[-window:])
+        if len(latencies) < 10:
+            return None
+        return latencies[min(len(latencies) - 1, int(percentile * len(latencies)))]
+
+    def model_rows(self) -> list:
+        """Per-model totals for display"""
+        with self._lock:
+            return [
+                {
+                    "Model": name,
+                    "Calls": int(stats["calls"]),
+                    "Prompt Tokens": int(stats["prompt_tokens"]),
+                    "Output Tokens": int(stats["output_tokens"]),
+                    "Avg Latency (s)": round(stats["latency"] / stats["calls"], 2) if stats["calls"] else 0,
+                    "Fallbacks": int(stats["fallbacks"]),
+                    "Errors": int(stats["errors"]),
+                    "Est. Cost ($)": round(stats["cost"], 4),
+                }
+                for name, stats in sorted(self.by_model.items())
+            ]
+
+    def recent_rows(self, limit: int = 20) -> list:
+        with self._lock:
+            records = list(self.recent)[-limit:]
+        return [
+            {
+                "Time": time.strftime("%H:%M:%S", time.localtime(record.timestamp)),
+                "Model": record.model,
+                "Prompt": record.prompt_tokens,
+                "Output": record.output_tokens,
+                "Latency (s)": None if record.batch else round(record.latency, 2),
+                "Fallback": record.fallback_used,
+                "OK": record.ok,
+                "Batch": record.batch,
+            }
+            for record in reversed(records)
+        ]
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as log:
+            for line in log:
+                try:
+                    self._add(UsageRecord(**json.loads(line)))
+                except (ValueError, TypeError):
+                    continue
+
+
+# Shared by every Streamlit session in this process
+usage_ledger = UsageLedger(CACHE_DIR / "usage.jsonl")